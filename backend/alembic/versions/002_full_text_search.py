@@ -0,0 +1,67 @@
+"""Full-text search vectors for receipts and transactions
+
+Revision ID: 002
+Revises: 83606051df21
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "83606051df21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Generated tsvector columns keep the search document in sync with the
+    # row on every write, with no triggers or application code involved.
+    op.add_column(
+        "receipts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(vendor, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(raw_ocr_text, '')), 'C')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "idx_receipts_search",
+        "receipts",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+    op.add_column(
+        "transactions",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+                "setweight(to_tsvector('english', category), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "idx_transactions_search",
+        "transactions",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_transactions_search", table_name="transactions")
+    op.drop_column("transactions", "search_vector")
+    op.drop_index("idx_receipts_search", table_name="receipts")
+    op.drop_column("receipts", "search_vector")
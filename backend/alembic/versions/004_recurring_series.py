@@ -0,0 +1,69 @@
+"""Recurring transaction series
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_series",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("merchant_key", sa.String(128), nullable=False),
+        sa.Column("description", sa.String(512)),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("cadence", sa.String(20)),
+        sa.Column("cadence_streak", sa.Integer(), nullable=False),
+        sa.Column("occurrence_count", sa.Integer(), nullable=False),
+        sa.Column("is_recurring", sa.Boolean(), nullable=False),
+        sa.Column("last_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("next_expected_date", sa.DateTime(timezone=True)),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "idx_recurring_series_user_merchant",
+        "recurring_series",
+        ["user_id", "merchant_key"],
+    )
+    op.add_column(
+        "transactions",
+        sa.Column("recurring_series_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.create_foreign_key(
+        "fk_transactions_recurring_series",
+        "transactions",
+        "recurring_series",
+        ["recurring_series_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_transactions_recurring_series_id", "transactions", ["recurring_series_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_recurring_series_id", table_name="transactions")
+    op.drop_constraint(
+        "fk_transactions_recurring_series", "transactions", type_="foreignkey"
+    )
+    op.drop_column("transactions", "recurring_series_id")
+    op.drop_table("recurring_series")
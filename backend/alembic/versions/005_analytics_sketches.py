@@ -0,0 +1,41 @@
+"""Analytics sketches table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_sketches",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("scope", sa.String(36), nullable=False),
+        sa.Column("bucket", sa.Date(), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()")
+        ),
+    )
+    op.create_index(
+        "idx_analytics_sketches_scope_kind_bucket",
+        "analytics_sketches",
+        ["scope", "kind", "bucket"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_sketches")
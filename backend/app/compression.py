@@ -0,0 +1,168 @@
+"""Response compression middleware (brotli when available, gzip otherwise)."""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from typing import Optional
+import zlib
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Only textual payloads shrink enough to be worth the CPU; images, Parquet
+# and other binary formats are already compressed.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "text/",
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header (q=0 excludes)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # gzip
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    if content_type.startswith("text/event-stream"):
+        # Compressors buffer; SSE events must reach the client immediately
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compress textual responses of at least `minimum_size` bytes.
+
+    Single-message bodies below the threshold pass through untouched;
+    streamed bodies (exports) are compressed chunk by chunk without
+    buffering the whole response. Server-Sent Events and responses that
+    already have a Content-Encoding are never compressed. Strong ETags
+    become weak, since the encoded bytes differ from the identity body.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+    ):
+        self.app = app
+        self.minimum_size = (
+            settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        )
+        self.gzip_level = (
+            settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        )
+        self.brotli_quality = (
+            settings.COMPRESSION_BROTLI_QUALITY
+            if brotli_quality is None
+            else brotli_quality
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if _compressible(headers):
+                    start = message  # Held until the first body chunk
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=list(start["headers"]))
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if not more_body:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send({**start, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send({**start, "headers": headers.raw})
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": more_body}
+                )
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,15 @@
 """Database connection and session management."""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
 
 # Create database engine
 engine = create_engine(
@@ -11,12 +18,167 @@ engine = create_engine(
     echo=False,  # Set to True for SQL query logging
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Optional read replica engine
+replica_engine = (
+    create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": 2},
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+# Create session factory. Each request commits once, at the end of its unit
+# of work; objects stay loaded after commit so responses need no re-SELECT.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 # Base class for models
 Base = declarative_base()
 
+# Id of the authenticated user for the current request, set by the auth
+# dependency. Used for read-your-writes stickiness.
+current_user_id: ContextVar[Optional[str]] = ContextVar(
+    "current_user_id", default=None
+)
+
+# Replay lag in seconds; 0 when fully caught up or when the server is not a
+# standby at all (so a plain Postgres instance works as a stand-in replica).
+REPLICA_LAG_QUERY = text(
+    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+)
+
+
+class ReplicaRouter:
+    """
+    Decide whether a read-only session may be served by the replica.
+
+    Reads go to the replica unless:
+    - the user committed a write within `sticky_seconds` (read-your-writes),
+    - the replica is lagging more than `max_lag_seconds`, or
+    - the last health probe failed.
+
+    The health probe runs at most once per `check_interval` seconds.
+    Write stickiness is tracked per process; with several workers it is
+    best-effort, which is what the lag bound is for.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], float],
+        max_lag_seconds: float,
+        sticky_seconds: float,
+        check_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.probe = probe
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self.clock = clock
+        self._last_write: Dict[str, float] = {}
+        self._healthy = False
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record_write(self, user_key: Optional[str]) -> None:
+        """Pin the user's reads to the primary for the sticky window."""
+        if user_key is None:
+            return
+        now = self.clock()
+        with self._lock:
+            self._last_write[user_key] = now
+            if len(self._last_write) > 10_000:
+                cutoff = now - self.sticky_seconds
+                self._last_write = {
+                    k: t for k, t in self._last_write.items() if t > cutoff
+                }
+
+    def is_sticky(self, user_key: Optional[str]) -> bool:
+        """Whether the user wrote recently enough to need the primary."""
+        if user_key is None:
+            return False
+        written_at = self._last_write.get(user_key)
+        return written_at is not None and self.clock() - written_at < self.sticky_seconds
+
+    def replica_healthy(self) -> bool:
+        """Return the cached health verdict, re-probing when it has expired."""
+        now = self.clock()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._healthy
+        # Only one thread probes; the rest keep using the previous verdict
+        if not self._lock.acquire(blocking=False):
+            return self._healthy
+        try:
+            try:
+                lag = self.probe()
+                self._healthy = lag <= self.max_lag_seconds
+                if not self._healthy:
+                    logger.warning("Replica lag %.1fs; reading from primary", lag)
+            except Exception as e:
+                self._healthy = False
+                logger.warning(f"Replica health check failed: {e}")
+            self._checked_at = self.clock()
+        finally:
+            self._lock.release()
+        return self._healthy
+
+    def use_replica(self, user_key: Optional[str]) -> bool:
+        """Whether a read for this user should go to the replica."""
+        return not self.is_sticky(user_key) and self.replica_healthy()
+
+
+def _probe_replica_lag() -> float:
+    with replica_engine.connect() as conn:
+        return float(conn.execute(REPLICA_LAG_QUERY).scalar())
+
+
+replica_router = (
+    ReplicaRouter(
+        probe=_probe_replica_lag,
+        max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+        sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+        check_interval=settings.REPLICA_HEALTH_CHECK_SECONDS,
+    )
+    if replica_engine is not None
+    else None
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only work to the replica when it is safe.
+
+    The engine is chosen on first use (after authentication has set
+    `current_user_id`) and pinned for the rest of the session so all of a
+    request's reads see one consistent snapshot.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if replica_router is None:
+            return super().get_bind(mapper, clause, **kw)
+        bind = self.info.get("routed_bind")
+        if bind is None:
+            use_replica = replica_router.use_replica(current_user_id.get())
+            bind = replica_engine if use_replica else engine
+            self.info["routed_bind"] = bind
+        return bind
+
+
+ReadOnlySessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session: Session) -> None:
+    """Route the committing user's reads to the primary for a while."""
+    if replica_router is not None:
+        replica_router.record_write(current_user_id.get())
+
 
 def get_db():
     """Dependency for FastAPI to get database session."""
@@ -25,3 +187,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_db_readonly():
+    """Dependency for read-only endpoints; may be served by the read replica."""
+    db = ReadOnlySessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,62 @@
+"""
+Nightly budget alert run.
+
+Evaluates every user's budgets for the current month in batched grouped
+queries and writes one NDJSON line per alert for the notification
+service to consume.
+
+Usage (from backend/):
+    python -m app.jobs.budget_alerts > alerts.ndjson
+    python -m app.jobs.budget_alerts --threshold 0.9 --batch-users 2000 --output alerts.ndjson
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from app.database import ReadOnlySessionLocal
+from app.services.budget_service import DEFAULT_BATCH_USERS, iter_all_budget_alerts
+
+logger = logging.getLogger(__name__)
+
+
+def run(out, alert_threshold: float, batch_users: int) -> int:
+    """Write all alerts as NDJSON to `out` and return how many were written."""
+    count = 0
+    # Read-only session: served by the replica when one is configured
+    with ReadOnlySessionLocal() as db:
+        for user_id, email, alert in iter_all_budget_alerts(
+            db, alert_threshold=alert_threshold, batch_users=batch_users
+        ):
+            record = {
+                "user_id": str(user_id),
+                "email": email,
+                "over_budget": alert.over_by > 0,
+                **alert.model_dump(),
+            }
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Emit budget alerts as NDJSON.")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--batch-users", type=int, default=DEFAULT_BATCH_USERS)
+    parser.add_argument("--output", help="Write to this path instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO", stream=sys.stderr)
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, "w") as out:
+            count = run(out, args.threshold, args.batch_users)
+    else:
+        count = run(sys.stdout, args.threshold, args.batch_users)
+    logger.info(
+        "Wrote %d budget alerts in %.1fs", count, time.perf_counter() - started
+    )
+
+
+if __name__ == "__main__":
+    main()
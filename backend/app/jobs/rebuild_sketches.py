@@ -0,0 +1,79 @@
+"""
+Rebuild the analytics sketches from exact data.
+
+Sketches are normally maintained on ingest; this job recreates them from
+`transactions` and `receipts`, e.g. after enabling the feature on an
+existing database or after a crash lost unflushed deltas. Rows are
+streamed and folded into an in-memory buffer that is persisted every
+--flush-every sketches, so memory stays bounded.
+
+Writes committed while the job runs may be counted twice in their month;
+run it during a quiet period.
+
+Usage (from backend/):
+    python -m app.jobs.rebuild_sketches
+"""
+import argparse
+import logging
+import sys
+import time
+from sqlalchemy import delete, select
+from app.database import SessionLocal
+from app.models import AnalyticsSketch, Receipt, Transaction
+from app.services.sketch_service import SketchBuffer, persist_sketches
+
+logger = logging.getLogger(__name__)
+
+
+def run(flush_every: int, batch_size: int) -> int:
+    """Rebuild every sketch; returns the number of rows folded in."""
+    count = 0
+    buffer = SketchBuffer()
+    with SessionLocal() as db:
+        db.execute(delete(AnalyticsSketch))
+        db.commit()
+
+        sources = (
+            (
+                select(
+                    Transaction.user_id, Transaction.transaction_date, Transaction.amount
+                ),
+                buffer.add_amount,
+            ),
+            (
+                select(Receipt.user_id, Receipt.purchase_date, Receipt.vendor).where(
+                    Receipt.vendor.isnot(None)
+                ),
+                buffer.add_vendor,
+            ),
+        )
+        for query, add in sources:
+            rows = db.execute(query.execution_options(yield_per=batch_size))
+            for user_id, when, value in rows:
+                add(user_id, when, value)
+                count += 1
+                if len(buffer) >= flush_every:
+                    # A separate session, so the streaming cursor stays open
+                    with SessionLocal() as writer:
+                        persist_sketches(writer, buffer.drain())
+        with SessionLocal() as writer:
+            persist_sketches(writer, buffer.drain())
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild analytics sketches.")
+    parser.add_argument("--flush-every", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO", stream=sys.stderr)
+    started = time.perf_counter()
+    count = run(args.flush_every, args.batch_size)
+    logger.info(
+        "Rebuilt sketches from %d rows in %.1fs", count, time.perf_counter() - started
+    )
+
+
+if __name__ == "__main__":
+    main()
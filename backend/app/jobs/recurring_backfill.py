@@ -0,0 +1,71 @@
+"""
+Backfill recurring-transaction series from existing history.
+
+New transactions are matched incrementally as they are created; this job
+covers history that predates the detector or arrived through bulk
+imports. Each user is rebuilt and committed on their own, so the job can
+be interrupted and rerun safely.
+
+Usage (from backend/):
+    python -m app.jobs.recurring_backfill
+    python -m app.jobs.recurring_backfill --user-id 5f1c...  # one user
+"""
+import argparse
+import logging
+import sys
+import time
+import uuid
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models import User
+from app.services.recurring_service import backfill_user
+
+logger = logging.getLogger(__name__)
+
+
+def iter_user_ids(db, batch_users: int):
+    """Yield every user id in keyset-ordered batches."""
+    after = None
+    while True:
+        query = select(User.id).order_by(User.id).limit(batch_users)
+        if after is not None:
+            query = query.where(User.id > after)
+        batch = db.execute(query).scalars().all()
+        if not batch:
+            return
+        yield from batch
+        after = batch[-1]
+
+
+def run(user_ids, batch_users: int) -> int:
+    """Rebuild series for the given users (all users if None); return users processed."""
+    count = 0
+    with SessionLocal() as db:
+        ids = user_ids or iter_user_ids(db, batch_users)
+        for user_id in ids:
+            found = backfill_user(db, user_id)
+            db.commit()
+            count += 1
+            logger.debug("User %s: %d recurring series", user_id, found)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill recurring series.")
+    parser.add_argument("--user-id", type=uuid.UUID, action="append")
+    parser.add_argument("--batch-users", type=int, default=1000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level="DEBUG" if args.verbose else "INFO", stream=sys.stderr)
+    started = time.perf_counter()
+    count = run(args.user_id, args.batch_users)
+    logger.info(
+        "Backfilled recurring series for %d users in %.1fs",
+        count,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Logging setup: queued JSON logs with a sampled access log, or Rich for development."""
+from app.config import settings
+from app.sql_profiler import profile_from_scope
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+
+access_logger = logging.getLogger("app.access")
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed with `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records when the queue is full.
+
+    Logging must never block the event loop; a dropped count is reported
+    when the listener shuts down.
+    """
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge args here; formatting (and tracebacks) happens on the
+        # listener thread. exc_info is kept, which is safe within a process.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        dropped = sum(
+            h.dropped
+            for h in logging.getLogger().handlers
+            if isinstance(h, DroppingQueueHandler)
+        )
+        if dropped:
+            print(f"{dropped} log records dropped (queue full)", file=sys.stderr)
+
+
+def configure_logging(log_format: Optional[str] = None) -> None:
+    """
+    Route all logging through one handler chosen by LOG_FORMAT.
+
+    "json" (default): records are queued by a non-blocking QueueHandler
+    and written as JSON lines to stdout by a QueueListener thread.
+    "rich": colored console output for local development, written
+    synchronously.
+    """
+    global _listener
+    log_format = log_format or settings.LOG_FORMAT
+    _stop_listener()
+
+    if log_format == "rich":
+        from rich.logging import RichHandler
+
+        handler: logging.Handler = RichHandler(rich_tracebacks=True)
+        handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    else:
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonFormatter())
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+            settings.LOG_QUEUE_SIZE
+        )
+        handler = DroppingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(
+            log_queue, output, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.unregister(_stop_listener)
+        atexit.register(_stop_listener)
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI access log: one record per request, emitted after the response.
+
+    Successful requests are sampled at `sample_rate`; client and server
+    errors, unhandled exceptions, requests slower than `slow_ms` and,
+    with the SQL profiler on, requests with likely N+1 queries are always
+    logged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: Optional[float] = None,
+        slow_ms: Optional[float] = None,
+    ):
+        self.app = app
+        self.sample_rate = (
+            settings.ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.slow_ms = settings.ACCESS_LOG_SLOW_MS if slow_ms is None else slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self._log(scope, 500, started, exc_info=True)
+            raise
+        self._log(scope, status_code, started)
+
+    def _log(self, scope: Scope, status_code: int, started: float, exc_info=False):
+        duration_ms = (time.perf_counter() - started) * 1000
+        routine = status_code < 400 and duration_ms < self.slow_ms and not exc_info
+        profile = profile_from_scope(scope)
+        if profile is not None and profile.repeated():
+            routine = False
+        if routine and random.random() >= self.sample_rate:
+            return
+        method, path = scope["method"], scope["path"]
+        client = scope.get("client")
+        fields = {
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "client": client[0] if client else None,
+            "sampled": routine,
+        }
+        if profile is not None:
+            fields.update(profile.log_fields())
+        access_logger.log(
+            logging.ERROR if status_code >= 500 else logging.INFO,
+            "%s %s %d %.1fms",
+            method,
+            path,
+            status_code,
+            duration_ms,
+            exc_info=exc_info,
+            extra=fields,
+        )
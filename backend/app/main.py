@@ -1,81 +1,98 @@
 """FastAPI application entry point."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import auth, users, transactions, receipts, budgets, analytics
+from app.database import engine, replica_engine
+from app.compression import CompressionMiddleware
+from app.logging_config import AccessLogMiddleware, configure_logging
+from app.metrics import (
+    METRICS_ENABLED,
+    MetricsMiddleware,
+    instrument_engine,
+    mark_process_dead,
+    render_metrics,
+)
+from app.rate_limit import RateLimitMiddleware
+from app.responses import DefaultJSONResponse
+from app.sql_profiler import SQLProfilerMiddleware, profile_engine
+from app.services.analytics_backends import (
+    start_columnar_backend,
+    stop_columnar_backend,
+)
+from app.services.sketch_service import start_sketch_flusher, stop_sketch_flusher
+from app.services.analytics_events import start_event_bridge, stop_event_bridge
+from app.routers import (
+    auth,
+    users,
+    transactions,
+    receipts,
+    budgets,
+    analytics,
+    export,
+    search,
+)
+from contextlib import asynccontextmanager
+import logging
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start-up and shutdown work, kept out of import so that importing the
+    app (tests, tooling, worker boot) stays cheap and side-effect free.
+    """
+    # Only the server process installs log handlers and the queue listener
+    configure_logging()
+    # Requests are logged by AccessLogMiddleware instead
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    # Create media directories if they don't exist
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, settings.RECEIPTS_DIR), exist_ok=True)
+    # Columnar refresher (ANALYTICS_BACKEND=duckdb), sketch flusher, and the
+    # LISTEN/NOTIFY bridge (ANALYTICS_EVENTS_PG_NOTIFY)
+    start_columnar_backend(engine)
+    start_sketch_flusher()
+    start_event_bridge(engine)
+    yield
+    stop_event_bridge()
+    stop_sketch_flusher()  # Flushes what is still buffered
+    stop_columnar_backend()
+    mark_process_dead()  # Multiprocess metrics: drop this worker's live gauges
+
+
 # Create FastAPI app
 app = FastAPI(
     title="ReceiptLens API",
     description="Personal Expense Tracker API with OCR capabilities",
     version="1.0.0",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan,
 )
 
-# Add validation error logging
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
-from fastapi import Request
-import time
-from rich.console import Console
-from rich.theme import Theme
-from rich.logging import RichHandler
-import logging
 
-# Setup Rich Console
-custom_theme = Theme({
-    "info": "dim cyan",
-    "warning": "magenta",
-    "error": "bold red",
-    "success": "bold green",
-})
-console = Console(theme=custom_theme)
-
-# Configure Global Logging
-logging.basicConfig(
-    level="INFO",
-    format="%(message)s",
-    datefmt="[%X]",
-    handlers=[RichHandler(console=console, rich_tracebacks=True)]
-)
+logger = logging.getLogger(__name__)
 
-logger = logging.getLogger("uvicorn.access")
-# Suppress duplicate uvicorn access logs since we have our own middleware
-logger.setLevel(logging.WARNING)
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Log request start
-    console.print(f"[info]→ {request.method} {request.url.path}[/info]")
-    
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        status_code = response.status_code
-        status_color = "success" if 200 <= status_code < 300 else "error" if status_code >= 400 else "warning"
-        
-        console.print(
-            f"[{status_color}]← {status_code} {request.method} {request.url.path}[/{status_color}] "
-            f"[dim]({process_time:.3f}s)[/dim]"
-        )
-        return response
-    except Exception as e:
-        process_time = time.time() - start_time
-        console.print(f"[error]! {request.method} {request.url.path} Failed: {str(e)}[/error]")
-        raise e
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
-    console.print(f"[error]Validation Error: {exc.errors()}[/error]")
+    logger.info(
+        "Validation error on %s %s",
+        request.method,
+        request.url.path,
+        extra={"errors": exc.errors()},
+    )
     return JSONResponse(
         status_code=422,
         content=jsonable_encoder({"detail": exc.errors(), "body": exc.body}),
     )
 
+# Rate limiting (inside CORS so 429 responses still carry CORS headers)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -85,8 +102,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create media directories if they don't exist
-os.makedirs(os.path.join(settings.MEDIA_ROOT, settings.RECEIPTS_DIR), exist_ok=True)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine, "primary")
+    if replica_engine is not None:
+        instrument_engine(replica_engine, "replica")
+
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+    profile_engine(engine)
+    if replica_engine is not None:
+        profile_engine(replica_engine)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Outermost, so the logged duration and status cover every other layer
+app.add_middleware(AccessLogMiddleware)
 
 # Register routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
@@ -95,6 +127,8 @@ app.include_router(receipts.router, prefix="/receipts", tags=["receipts"])
 app.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
 app.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+app.include_router(export.router, prefix="/export", tags=["export"])
+app.include_router(search.router, prefix="/search", tags=["search"])
 
 
 @app.get("/")
@@ -107,3 +141,13 @@ async def root():
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+if METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint."""
+        data, content_type = render_metrics()
+        # Passed as a header: media_type would append a second charset
+        return Response(content=data, headers={"Content-Type": content_type})
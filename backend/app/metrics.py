@@ -0,0 +1,253 @@
+"""Prometheus metrics for HTTP routes, database use, OCR stages and uploads."""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+import os
+import time
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+METRICS_ENABLED = PROMETHEUS_AVAILABLE and settings.METRICS_ENABLED
+
+# With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+# directory before start-up: every worker then writes its samples to
+# memory-mapped files there and /metrics aggregates all of them.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# 0.2 s is a bucket boundary so the analytics "<200 ms" SLO is exact
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if METRICS_ENABLED:
+    REQUESTS = Counter(
+        "http_requests_total",
+        "HTTP requests by method, route template and status",
+        ["method", "route", "status"],
+    )
+    REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency, until the response body is sent",
+        ["method", "route"],
+        buckets=LATENCY_BUCKETS,
+    )
+    IN_FLIGHT = Gauge(
+        "http_requests_in_flight",
+        "Requests currently being served (including open streams)",
+        multiprocess_mode="livesum",
+    )
+    REQUEST_DB_QUERIES = Histogram(
+        "http_request_db_queries",
+        "Database statements executed per request",
+        ["method", "route"],
+        buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    )
+    REQUEST_DB_SECONDS = Histogram(
+        "http_request_db_seconds",
+        "Time spent executing database statements per request",
+        ["method", "route"],
+        buckets=LATENCY_BUCKETS,
+    )
+    OCR_STAGE_SECONDS = Histogram(
+        "ocr_stage_duration_seconds",
+        "Receipt OCR time by pipeline stage",
+        ["stage"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0),
+    )
+    UPLOAD_BYTES = Histogram(
+        "receipt_upload_bytes",
+        "Size of uploaded receipt images",
+        buckets=(2**14, 2**16, 2**18, 2**19, 2**20, 2**21, 2**22, 2**23, 2**24),
+    )
+    POOL_OPEN = Gauge(
+        "db_pool_connections",
+        "Open DBAPI connections by engine",
+        ["engine"],
+        multiprocess_mode="livesum",
+    )
+    POOL_CHECKED_OUT = Gauge(
+        "db_pool_connections_checked_out",
+        "Pooled connections currently checked out by engine",
+        ["engine"],
+        multiprocess_mode="livesum",
+    )
+    POOL_CHECKOUTS = Counter(
+        "db_pool_checkouts_total", "Pool checkouts by engine", ["engine"]
+    )
+
+
+class RequestDbStats:
+    """Statement count and time for the current request."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set by MetricsMiddleware; shared with threadpool workers because the
+# context is copied by reference to the same stats object.
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - context._metrics_started
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Count statements per request and track pool usage for `engine`."""
+    if not METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    open_connections = POOL_OPEN.labels(name)
+    checked_out = POOL_CHECKED_OUT.labels(name)
+    checkouts = POOL_CHECKOUTS.labels(name)
+
+    @event.listens_for(engine.pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        open_connections.inc()
+
+    @event.listens_for(engine.pool, "close")
+    def _close(dbapi_connection, connection_record):
+        open_connections.dec()
+
+    @event.listens_for(engine.pool, "detach")
+    def _detach(dbapi_connection, connection_record):
+        # Detached connections leave the pool's accounting for good
+        open_connections.dec()
+        checked_out.dec()
+
+    @event.listens_for(engine.pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+        checkouts.inc()
+
+    @event.listens_for(engine.pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+
+@contextmanager
+def ocr_stage(stage: str) -> Iterator[None]:
+    """Time one OCR pipeline stage."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        OCR_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+def observe_upload(size: int) -> None:
+    if METRICS_ENABLED:
+        UPLOAD_BYTES.observe(size)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request metrics.
+
+    Routes are labelled by their path template ("/receipts/{receipt_id}"),
+    never the raw path, so label cardinality stays bounded. Labelled
+    children are cached per (method, route, status) to skip the registry's
+    label lookup on every request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._children: Dict[Tuple[str, str, int], tuple] = {}
+
+    def _metrics_for(self, method: str, route: str, status_code: int) -> tuple:
+        key = (method, route, status_code)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                REQUESTS.labels(method, route, str(status_code)),
+                REQUEST_SECONDS.labels(method, route),
+                REQUEST_DB_QUERIES.labels(method, route),
+                REQUEST_DB_SECONDS.labels(method, route),
+            )
+        return children
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            request_db_stats.reset(token)
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            count, latency, queries, db_seconds = self._metrics_for(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+            )
+            count.inc()
+            latency.observe(elapsed)
+            queries.observe(stats.queries)
+            db_seconds.observe(stats.seconds)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition-format metrics for this process, or all workers in multiprocess mode."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory."""
+    if METRICS_ENABLED and MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
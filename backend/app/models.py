@@ -4,13 +4,17 @@ from sqlalchemy import (
     String,
     Float,
     Boolean,
+    Integer,
+    Date,
     DateTime,
     ForeignKey,
+    LargeBinary,
     Text,
     Index,
+    Computed,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import uuid
 from app.database import Base
@@ -36,6 +40,9 @@ class User(Base):
     budgets = relationship(
         "Budget", back_populates="user", cascade="all, delete-orphan"
     )
+    recurring_series = relationship(
+        "RecurringSeries", back_populates="user", cascade="all, delete-orphan"
+    )
 
 
 class Receipt(Base):
@@ -54,15 +61,33 @@ class Receipt(Base):
     tax_amount = Column(Float, default=0.0)
     currency = Column(String(10), default="USD")
     category = Column(String(100))
-    raw_ocr_text = Column(Text)
+    # Deferred: OCR text can be kilobytes per row and list views never need it
+    raw_ocr_text = deferred(Column(Text))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Full-text search document, maintained by Postgres (see migration 002).
+    # Not mapped on the ORM side so inserts never RETURN the whole vector;
+    # queries use Receipt.__table__.c.search_vector.
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(vendor, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(raw_ocr_text, '')), 'C')",
+            persisted=True,
+        ),
+    )
+
     # Relationships
     user = relationship("User", back_populates="receipts")
     transactions = relationship("Transaction", back_populates="receipt")
 
-    # Indexes for analytics queries
-    __table_args__ = (Index("idx_receipts_user_date", "user_id", "purchase_date"),)
+    # Indexes for analytics and search queries
+    __table_args__ = (
+        Index("idx_receipts_user_date", "user_id", "purchase_date"),
+        Index("idx_receipts_search", "search_vector", postgresql_using="gin"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
 
 class Transaction(Base):
@@ -80,11 +105,30 @@ class Transaction(Base):
     description = Column(String(512))
     transaction_date = Column(DateTime(timezone=True), nullable=False, index=True)
     is_recurring = Column(Boolean, default=False)
+    # Series this transaction was matched to by the recurring detector
+    recurring_series_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("recurring_series.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Full-text search document, maintained by Postgres (see migration 002).
+    # Unmapped for the same reason as Receipt.search_vector.
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('english', category), 'B')",
+            persisted=True,
+        ),
+    )
+
     # Relationships
     user = relationship("User", back_populates="transactions")
     receipt = relationship("Receipt", back_populates="transactions")
+    recurring_series = relationship("RecurringSeries")
 
     # Indexes for analytics queries (optimized for 12-month aggregation)
     __table_args__ = (
@@ -95,7 +139,9 @@ class Transaction(Base):
             "category",
             "transaction_date",
         ),
+        Index("idx_transactions_search", "search_vector", postgresql_using="gin"),
     )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
 
 class Budget(Base):
@@ -119,3 +165,82 @@ class Budget(Base):
     __table_args__ = (
         Index("idx_budgets_user_category", "user_id", "category", unique=True),
     )
+    # Fetch created_at/updated_at with RETURNING on INSERT and UPDATE too
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class RecurringSeries(Base):
+    """Transactions from one merchant at a similar amount, tracked for periodicity."""
+
+    __tablename__ = "recurring_series"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    merchant_key = Column(String(128), nullable=False)  # Normalized description
+    description = Column(String(512))  # Latest raw description, for display
+    category = Column(String(100), nullable=False)
+    amount = Column(Float, nullable=False)  # Running mean of matched amounts
+    cadence = Column(String(20))  # "weekly" | "monthly" | "annual" | None
+    cadence_streak = Column(Integer, nullable=False, default=0)
+    occurrence_count = Column(Integer, nullable=False, default=1)
+    is_recurring = Column(Boolean, nullable=False, default=False)
+    last_date = Column(DateTime(timezone=True), nullable=False)
+    next_expected_date = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="recurring_series")
+
+    # Candidate series for a new transaction are found by (user, merchant)
+    __table_args__ = (
+        Index("idx_recurring_series_user_merchant", "user_id", "merchant_key"),
+    )
+
+
+class AnalyticsSketch(Base):
+    """A serialized streaming sketch for one scope, month and kind."""
+
+    __tablename__ = "analytics_sketches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # A user id, or "platform" for the all-users aggregate
+    scope = Column(String(36), nullable=False)
+    bucket = Column(Date, nullable=False)  # First day of the month (UTC)
+    kind = Column(String(20), nullable=False)  # vendors | distinct_vendors | amounts
+    data = Column(LargeBinary, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # One sketch per scope, month and kind; reads scan a scope's month range
+    __table_args__ = (
+        Index(
+            "idx_analytics_sketches_scope_kind_bucket",
+            "scope",
+            "kind",
+            "bucket",
+            unique=True,
+        ),
+    )
+
+
+class IdempotencyKey(Base):
+    """Stored outcome of a request sent with an Idempotency-Key header."""
+
+    __tablename__ = "idempotency_keys"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False)  # "in_progress" or "completed"
+    response_status = Column(Integer)
+    response_body = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    # One record per user per key
+    __table_args__ = (
+        Index("idx_idempotency_user_key", "user_id", "key", unique=True),
+    )
@@ -6,23 +6,13 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Try to import transformers (optional - not required for basic functionality)
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
-
-    # Using a small NER model - this is a placeholder that can be replaced
-    # with a fine-tuned model for receipt extraction
-    ner_model_name = "dbmdz/bert-large-cased-finetuned-conll03-english"
-    USE_TRANSFORMER = False  # Set to True if you want to use transformer model
-except ImportError:
-    # Transformers not installed - use rule-based extraction only
-    USE_TRANSFORMER = False
-    logger.info("Transformers not installed. Using rule-based extraction only.")
-except Exception as e:
-    logger.warning(
-        f"Could not load transformer model: {e}. Using rule-based extraction only."
-    )
-    USE_TRANSFORMER = False
+# Transformer NER is optional and not required for basic functionality.
+# transformers is not imported here: probing it at import time cost seconds
+# of start-up whenever it was installed, even though extraction is rule-based.
+# Using a small NER model - this is a placeholder that can be replaced
+# with a fine-tuned model for receipt extraction
+ner_model_name = "dbmdz/bert-large-cased-finetuned-conll03-english"
+USE_TRANSFORMER = False  # Set to True if you want to use transformer model
 
 
 def extract_vendor(raw_text: str) -> Optional[str]:
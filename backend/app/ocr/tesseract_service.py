@@ -1,7 +1,6 @@
 """Tesseract OCR service for extracting text from receipt images."""
-import pytesseract
-from PIL import Image
 from app.config import settings
+from app.metrics import ocr_stage
 import os
 import logging
 
@@ -18,6 +17,11 @@ def run_tesseract(image_path: str) -> str:
     Returns:
         Raw text extracted from the image
     """
+    # Imported on first use: pytesseract and Pillow are slow to import and
+    # only this endpoint needs them
+    import pytesseract
+    from PIL import Image
+
     # Configure Tesseract command path if specified
     if settings.TESSERACT_PATH:
         pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_PATH
@@ -26,7 +30,9 @@ def run_tesseract(image_path: str) -> str:
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
 
-    image = Image.open(image_path)
+    with ocr_stage("image_load"):
+        image = Image.open(image_path)
+        image.load()
 
     # Run OCR with optimized settings for receipts
     # Use PSM 6 (Assume a single uniform block of text) for better receipt parsing
@@ -34,7 +40,8 @@ def run_tesseract(image_path: str) -> str:
     custom_config = r"--oem 3 --psm 6"
     
     try:
-        raw_text = pytesseract.image_to_string(image, config=custom_config)
+        with ocr_stage("image_to_string"):
+            raw_text = pytesseract.image_to_string(image, config=custom_config)
         logger.info(f"OCR completed. Extracted {len(raw_text)} characters.")
         logger.debug(f"Raw Text Preview: {raw_text[:100]}...")
         return raw_text.strip()
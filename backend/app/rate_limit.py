@@ -0,0 +1,334 @@
+"""Token-bucket rate limiting middleware with per-IP and per-user buckets."""
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import settings
+from app.services.auth_cache import principal_cache
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import inspect
+import logging
+import math
+import threading
+import time
+
+# Shared (multi-worker) limiting is optional and needs the redis package
+try:
+    import redis
+    import redis.asyncio
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Token cost per request, by method and path prefix (first match wins).
+# Costs roughly track server work: an Argon2 verify or an OCR run is worth
+# dozens of ordinary reads. Unlisted routes cost 1; a cost of 0 is exempt.
+ROUTE_COSTS: Sequence[Tuple[str, str, int]] = (
+    ("GET", "/health", 0),
+    ("GET", "/metrics", 0),
+    ("POST", "/auth/login", 10),
+    ("POST", "/auth/register", 10),
+    ("POST", "/receipts/upload", 20),
+    ("POST", "/transactions/import", 20),
+    ("GET", "/export", 10),
+    ("GET", "/analytics", 2),
+    ("GET", "/search", 2),
+)
+
+
+@dataclass(frozen=True)
+class BucketRule:
+    """Bucket size and refill rate (tokens per second)."""
+
+    capacity: float
+    refill_rate: float
+
+
+def route_cost(method: str, path: str) -> int:
+    """Look up the token cost of a request."""
+    for route_method, prefix, cost in ROUTE_COSTS:
+        if method == route_method and (
+            path == prefix or path.startswith(prefix + "/")
+        ):
+            return cost
+    return 1
+
+
+class InMemoryRateLimiter:
+    """
+    Token buckets held in a dict of key -> (tokens, last_refill).
+
+    Each bucket is a two-float tuple. Dict order doubles as LRU order
+    (entries are re-inserted on use), so the oldest buckets are evicted
+    first when `max_buckets` is exceeded. A periodic sweep drops buckets
+    that have refilled completely, since they are identical to a fresh one.
+    """
+
+    def __init__(
+        self,
+        max_buckets: int = 100_000,
+        sweep_interval: float = 60.0,
+        clock=time.monotonic,
+    ):
+        self.max_buckets = max_buckets
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._rules: Dict[str, BucketRule] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+
+    def acquire(self, keys: List[Tuple[str, BucketRule]], cost: float) -> float:
+        """
+        Take `cost` tokens from every bucket, or from none.
+
+        Returns 0 when allowed, otherwise the seconds until enough tokens
+        will be available in all buckets.
+        """
+        with self._lock:
+            now = self._clock()
+            levels = []
+            wait = 0.0
+            for key, rule in keys:
+                tokens = self._level(key, rule, now)
+                needed = min(cost, rule.capacity)
+                if tokens < needed:
+                    wait = max(wait, (needed - tokens) / rule.refill_rate)
+                levels.append((key, rule, tokens - needed))
+            if wait > 0:
+                return wait
+
+            for key, rule, remaining in levels:
+                self._buckets.pop(key, None)
+                self._buckets[key] = (remaining, now)
+                self._rules[key] = rule
+            while len(self._buckets) > self.max_buckets:
+                oldest = next(iter(self._buckets))
+                del self._buckets[oldest]
+                self._rules.pop(oldest, None)
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            return 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _level(self, key: str, rule: BucketRule, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return rule.capacity
+        tokens, last = bucket
+        return min(rule.capacity, tokens + (now - last) * rule.refill_rate)
+
+    def _sweep(self, now: float) -> None:
+        """Drop buckets that have refilled to capacity."""
+        self._last_sweep = now
+        full = [
+            key
+            for key, rule in self._rules.items()
+            if self._level(key, rule, now) >= rule.capacity
+        ]
+        for key in full:
+            self._buckets.pop(key, None)
+            self._rules.pop(key, None)
+
+
+# Refills, checks and debits all buckets atomically on the Redis server,
+# using the server clock so app instances with skewed clocks agree.
+# KEYS: bucket keys. ARGV: cost, then capacity and refill rate per key.
+# Returns the wait in seconds as a string ("0" when allowed).
+_REDIS_ACQUIRE = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i])
+  local rate = tonumber(ARGV[2 * i + 1])
+  local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(bucket[1]) or capacity
+  local ts = tonumber(bucket[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  local needed = math.min(cost, capacity)
+  if tokens < needed then
+    wait = math.max(wait, (needed - tokens) / rate)
+  end
+  levels[i] = tokens - needed
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i])
+  local rate = tonumber(ARGV[2 * i + 1])
+  redis.call('HSET', key, 'tokens', levels[i], 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return '0'
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token buckets shared across workers in any Redis-protocol server.
+
+    Buckets expire once they would have refilled, so Redis does the
+    eviction. Calls go through the asyncio client, so a slow server never
+    blocks the event loop. After a failure, requests are limited by the
+    in-process fallback for `retry_seconds` before Redis is tried again
+    (by a single request), and the outage is logged once, not per request.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        fallback: InMemoryRateLimiter,
+        prefix: str = "rl:",
+        retry_seconds: Optional[float] = None,
+        client=None,
+        clock=time.monotonic,
+    ):
+        if client is None:
+            client = redis.asyncio.Redis.from_url(
+                url, socket_timeout=0.25, socket_connect_timeout=0.25
+            )
+        self._client = client
+        self._script = self._client.register_script(_REDIS_ACQUIRE)
+        self._fallback = fallback
+        self._prefix = prefix
+        self.retry_seconds = (
+            settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+            if retry_seconds is None
+            else retry_seconds
+        )
+        self._clock = clock
+        self._down_until = 0.0  # Use the fallback until then
+        self._outage = False
+
+    async def acquire(self, keys: List[Tuple[str, BucketRule]], cost: float) -> float:
+        now = self._clock()
+        if now < self._down_until:
+            return self._fallback.acquire(keys, cost)
+        if self._outage:
+            # Let this request probe Redis; others stay on the fallback meanwhile
+            self._down_until = now + self.retry_seconds
+
+        args: List[float] = [cost]
+        for _, rule in keys:
+            args.extend((rule.capacity, rule.refill_rate))
+        try:
+            wait = float(
+                await self._script(
+                    keys=[self._prefix + key for key, _ in keys], args=args
+                )
+            )
+        except redis.RedisError:
+            self._down_until = self._clock() + self.retry_seconds
+            if not self._outage:
+                self._outage = True
+                logger.warning(
+                    "Redis rate limiter unavailable; using in-process buckets, "
+                    "retrying every %.0fs",
+                    self.retry_seconds,
+                    exc_info=True,
+                )
+            return self._fallback.acquire(keys, cost)
+
+        if self._outage:
+            self._outage = False
+            self._down_until = 0.0
+            logger.info("Redis rate limiter reachable again")
+        return wait
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware charging each request against per-IP and per-user buckets.
+
+    The user is taken from the bearer token: the principal cache is tried
+    first and the JWT signature is verified otherwise, so a forged token
+    cannot drain another user's bucket. Requests over the limit get `429`
+    with a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter=None,
+        ip_rule: Optional[BucketRule] = None,
+        user_rule: Optional[BucketRule] = None,
+    ):
+        self.app = app
+        self.limiter = limiter if limiter is not None else build_limiter()
+        self._acquire_is_async = inspect.iscoroutinefunction(self.limiter.acquire)
+        self.ip_rule = ip_rule or BucketRule(
+            settings.RATE_LIMIT_IP_CAPACITY, settings.RATE_LIMIT_IP_REFILL_PER_SECOND
+        )
+        self.user_rule = user_rule or BucketRule(
+            settings.RATE_LIMIT_USER_CAPACITY,
+            settings.RATE_LIMIT_USER_REFILL_PER_SECOND,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        cost = route_cost(scope["method"], scope["path"])
+        if cost == 0:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        keys = [(f"ip:{client[0] if client else 'unknown'}", self.ip_rule)]
+        user_id = _user_from_scope(scope)
+        if user_id:
+            keys.append((f"user:{user_id}", self.user_rule))
+
+        if self._acquire_is_async:
+            wait = await self.limiter.acquire(keys, cost)
+        else:
+            wait = self.limiter.acquire(keys, cost)
+        if wait > 0:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def _user_from_scope(scope: Scope) -> Optional[str]:
+    """Resolve the user id from a valid bearer token, if any."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            principal = principal_cache.get(token)
+            if principal is not None:
+                return str(principal.id)
+            try:
+                payload = jwt.decode(
+                    token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+                )
+            except JWTError:
+                return None
+            return payload.get("sub")
+    return None
+
+
+def build_limiter():
+    """Create the configured limiter (Redis when RATE_LIMIT_REDIS_URL is set)."""
+    local = InMemoryRateLimiter(max_buckets=settings.RATE_LIMIT_MAX_BUCKETS)
+    if settings.RATE_LIMIT_REDIS_URL:
+        if REDIS_AVAILABLE:
+            return RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL, fallback=local)
+        logger.warning("RATE_LIMIT_REDIS_URL is set but redis is not installed")
+    return local
@@ -0,0 +1,56 @@
+"""Fast JSON response helpers: orjson rendering, cached TypeAdapters, row serialization."""
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from starlette.responses import Response
+from functools import lru_cache
+from typing import Any, Iterable
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Default response class for the app; response_model validation still applies
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """One TypeAdapter per type; building the validator and serializer is costly."""
+    return TypeAdapter(tp)
+
+
+def dump_json(value: Any) -> bytes:
+    """
+    Serialize Pydantic models (or containers of them) straight to JSON bytes.
+
+    Output matches FastAPI's response_model serialization, without the
+    intermediate jsonable_encoder pass.
+    """
+    return to_json(value)
+
+
+def model_response(tp: Any, value: Any, **kwargs) -> Response:
+    """Validate ORM objects against `tp` (from attributes) and render them in one pass each."""
+    adapter = type_adapter(tp)
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(body, media_type="application/json", **kwargs)
+
+
+def rows_response(rows: Iterable[Any], **kwargs) -> Response:
+    """
+    Render column-projected SQL rows as a JSON array of objects.
+
+    Rows go straight from the driver to JSON: no ORM objects, no Pydantic
+    models. UUIDs and datetimes render as response_model would (UTC as "Z").
+    """
+    items = [row._asdict() for row in rows]
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(items, option=orjson.OPT_UTC_Z)
+    else:
+        body = to_json(items)
+    return Response(body, media_type="application/json", **kwargs)
@@ -1,64 +1,389 @@
 """Analytics router for spending insights and aggregations."""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import User
-from app.schemas import MonthlySpendPoint, CategorySpend, BudgetAlert
-from app.routers.auth import get_current_user
+from typing import List, Optional
+from datetime import date
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from app.config import settings
+from app.database import get_db_readonly
+from app.schemas import (
+    MonthlySpendPoint,
+    CategorySpend,
+    BudgetAlert,
+    DashboardSummary,
+    SpendAnomaly,
+    SpendForecast,
+    TimeSeries,
+    TopVendors,
+    AmountPercentiles,
+    DistinctVendors,
+)
+from app.routers.auth import get_current_principal
+from app.services.auth_cache import Principal
+from app.services.analytics_cache import cached_json_response
+from app.services.analytics_events import event_bus, stream_changes
 from app.services.analytics_service import (
     get_monthly_spend,
     get_category_breakdown,
     get_budget_alerts,
     get_current_month_spend,
+    get_dashboard,
+)
+from app.services.forecast_service import (
+    DEFAULT_ANOMALY_THRESHOLD,
+    DEFAULT_BASELINE_MONTHS,
+    get_anomalies,
+    get_forecast,
 )
+from app.services.sketch_service import (
+    get_amount_percentiles,
+    get_distinct_vendors,
+    get_top_vendors,
+)
+from app.services.timeseries_service import MAX_POINTS, count_buckets, get_timeseries
 
+# Every endpoint here is served through the per-user analytics cache:
+# responses carry an ETag, and If-None-Match gets 304 Not Modified.
 router = APIRouter()
 
 
+@router.get("/dashboard", response_model=DashboardSummary)
+async def get_dashboard_endpoint(
+    request: Request,
+    months: int = Query(12, ge=1, le=60),
+    alert_threshold: float = Query(0.8, ge=0.0, le=1.0),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Get the dashboard summary in one round-trip.
+
+    Returns monthly spend, category breakdown, budget alerts and the
+    current month's spend, all computed from a single aggregate query.
+    """
+    return cached_json_response(
+        request,
+        current_user.id,
+        "dashboard",
+        (months, alert_threshold),
+        lambda: get_dashboard(
+            db, current_user.id, months=months, alert_threshold=alert_threshold
+        ),
+    )
+
+
+@router.get("/stream")
+async def stream_analytics(
+    alert_threshold: float = Query(0.8, ge=0.0, le=1.0),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Stream budget-alert and monthly-total changes as Server-Sent Events.
+
+    Sends a `snapshot` event first, then `month-total` and `budget-alerts`
+    deltas whenever a committed write changes the user's numbers, with a
+    heartbeat comment while idle. Replaces polling `/budget-alerts`.
+    """
+    # The body takes the stream slot itself, so a response that never
+    # starts streaming cannot leak one; this check only picks the status
+    if event_bus.is_full(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open analytics streams",
+        )
+    return StreamingResponse(
+        stream_changes(current_user.id, alert_threshold),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/timeseries", response_model=TimeSeries)
+async def get_timeseries_endpoint(
+    request: Request,
+    start: date,
+    end: date,
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
+    category: Optional[str] = Query(None),
+    tz: str = Query("UTC", description="IANA timezone used for day boundaries"),
+    compare: bool = Query(False, description="Include the previous period"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Get a dense spend time series between two dates (inclusive).
+
+    Buckets follow the caller's timezone, empty buckets are zero-filled,
+    and `compare=true` adds the same-length period just before `start`.
+    """
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown timezone: {tz}",
+        )
+    if count_buckets(start, end, granularity) > MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large for {granularity} granularity "
+            f"(max {MAX_POINTS} points)",
+        )
+
+    return cached_json_response(
+        request,
+        current_user.id,
+        "timeseries",
+        (start, end, granularity, category, tz, compare),
+        lambda: get_timeseries(
+            db,
+            current_user.id,
+            start,
+            end,
+            granularity=granularity,
+            timezone=tz,
+            category=category,
+            compare=compare,
+        ),
+    )
+
+
+@router.get("/forecast", response_model=SpendForecast)
+async def get_forecast_endpoint(
+    request: Request,
+    baseline_months: int = Query(DEFAULT_BASELINE_MONTHS, ge=1, le=60),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Project this month's end-of-month spend per category.
+
+    Blends the current run rate with the average of the last
+    `baseline_months` full months, and flags categories projected to
+    exceed their budget.
+    """
+    return cached_json_response(
+        request,
+        current_user.id,
+        "forecast",
+        (baseline_months,),
+        lambda: get_forecast(db, current_user.id, baseline_months=baseline_months),
+    )
+
+
+@router.get("/anomalies", response_model=List[SpendAnomaly])
+async def get_anomalies_endpoint(
+    request: Request,
+    days: int = Query(90, ge=1, le=365),
+    threshold: float = Query(DEFAULT_ANOMALY_THRESHOLD, gt=0.0),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Get unusually large transactions from the last N days.
+
+    Each transaction is scored against the median and MAD of the preceding
+    transactions in its category; scores above `threshold` are returned.
+    """
+    return cached_json_response(
+        request,
+        current_user.id,
+        "anomalies",
+        (days, threshold),
+        lambda: get_anomalies(db, current_user.id, days=days, threshold=threshold),
+    )
+
+
+# Sketch-backed aggregates. `scope=platform` covers all users; estimates
+# carry the error bounds documented in app/services/sketches.py.
+SCOPE_PATTERN = "^(user|platform)$"
+
+
+def platform_scope(scope: str = Query("user", pattern=SCOPE_PATTERN)) -> bool:
+    """
+    Resolve `scope`; True for platform-wide sketches.
+
+    Platform aggregates are built from every user's data, so they are
+    refused with 403 unless SKETCH_PLATFORM_SCOPE_ENABLED is set.
+    """
+    if scope == "platform" and not settings.SKETCH_PLATFORM_SCOPE_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Platform-wide analytics are disabled",
+        )
+    return scope == "platform"
+
+
+@router.get("/top-vendors", response_model=TopVendors)
+async def get_top_vendors_endpoint(
+    request: Request,
+    months: int = Query(12, ge=1, le=60),
+    limit: int = Query(10, ge=1, le=100),
+    platform: bool = Depends(platform_scope),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Get the most frequent receipt vendors.
+
+    Counts are Space-Saving estimates: never below the true count, and
+    over it by at most `max_overcount`. Every vendor with more than
+    `guaranteed_above` receipts is included.
+
+    `scope=platform` needs SKETCH_PLATFORM_SCOPE_ENABLED (403 otherwise),
+    and lists only vendors with at least SKETCH_PLATFORM_MIN_VENDOR_COUNT
+    receipts across all users, so rare merchants from other users'
+    receipts are never exposed.
+    """
+    return cached_json_response(
+        request,
+        current_user.id,
+        "top-vendors",
+        (months, limit, platform),
+        lambda: get_top_vendors(
+            db,
+            current_user.id,
+            months=months,
+            limit=limit,
+            platform=platform,
+        ),
+    )
+
+
+@router.get("/amount-percentiles", response_model=AmountPercentiles)
+async def get_amount_percentiles_endpoint(
+    request: Request,
+    months: int = Query(12, ge=1, le=60),
+    q: List[float] = Query([0.5, 0.9, 0.99]),
+    platform: bool = Depends(platform_scope),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Get transaction amount percentiles (t-digest estimates).
+
+    Rank error is typically well under 1%, smallest in the tails.
+    `scope=platform` needs SKETCH_PLATFORM_SCOPE_ENABLED (403 otherwise).
+    """
+    if not q or len(q) > 20 or any(not 0.0 <= value <= 1.0 for value in q):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="q must be 1-20 quantiles between 0 and 1",
+        )
+    return cached_json_response(
+        request,
+        current_user.id,
+        "amount-percentiles",
+        (months, tuple(q), platform),
+        lambda: get_amount_percentiles(
+            db, current_user.id, q, months=months, platform=platform
+        ),
+    )
+
+
+@router.get("/distinct-vendors", response_model=DistinctVendors)
+async def get_distinct_vendors_endpoint(
+    request: Request,
+    months: int = Query(12, ge=1, le=60),
+    platform: bool = Depends(platform_scope),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Get the number of distinct receipt vendors (HyperLogLog estimate).
+
+    The relative standard error is about 1.6%.
+    `scope=platform` needs SKETCH_PLATFORM_SCOPE_ENABLED (403 otherwise).
+    """
+    return cached_json_response(
+        request,
+        current_user.id,
+        "distinct-vendors",
+        (months, platform),
+        lambda: get_distinct_vendors(
+            db, current_user.id, months=months, platform=platform
+        ),
+    )
+
+
 @router.get("/monthly-spend", response_model=List[MonthlySpendPoint])
 async def get_monthly_spend_endpoint(
-    months: int = Query(12, ge=1, le=24),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    request: Request,
+    months: int = Query(12, ge=1, le=60),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """
     Get monthly spend aggregation for the last N months.
 
     Optimized query targeting sub-200ms response time with proper indexes.
     """
-    return get_monthly_spend(db, current_user.id, months=months)
+    return cached_json_response(
+        request,
+        current_user.id,
+        "monthly-spend",
+        (months,),
+        lambda: get_monthly_spend(db, current_user.id, months=months),
+    )
 
 
 @router.get("/category-breakdown", response_model=List[CategorySpend])
 async def get_category_breakdown_endpoint(
-    months: int = Query(12, ge=1, le=24),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    request: Request,
+    months: int = Query(12, ge=1, le=60),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """
     Get category-wise spend aggregation for the last N months.
 
     Optimized query targeting sub-200ms response time.
     """
-    return get_category_breakdown(db, current_user.id, months=months)
+    return cached_json_response(
+        request,
+        current_user.id,
+        "category-breakdown",
+        (months,),
+        lambda: get_category_breakdown(db, current_user.id, months=months),
+    )
 
 
 @router.get("/budget-alerts", response_model=List[BudgetAlert])
 async def get_budget_alerts_endpoint(
+    request: Request,
     alert_threshold: float = Query(0.8, ge=0.0, le=1.0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """Get budget alerts for categories where user is near or over budget."""
-    return get_budget_alerts(db, current_user.id, alert_threshold=alert_threshold)
+    return cached_json_response(
+        request,
+        current_user.id,
+        "budget-alerts",
+        (alert_threshold,),
+        lambda: get_budget_alerts(
+            db, current_user.id, alert_threshold=alert_threshold
+        ),
+    )
 
 
 @router.get("/current-month-spend")
 async def get_current_month_spend_endpoint(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """Get total spend for the current month."""
-    spend = get_current_month_spend(db, current_user.id)
-    return {"total_spend": spend}
+    return cached_json_response(
+        request,
+        current_user.id,
+        "current-month-spend",
+        (),
+        lambda: {"total_spend": get_current_month_spend(db, current_user.id)},
+    )
@@ -3,14 +3,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+import uuid
 from jose import JWTError, jwt
-from app.database import get_db
+from app.database import get_db, current_user_id
 from app.schemas import UserCreate, UserRead, Token
+from app.models import User
 from app.services.user_service import (
     create_user,
     get_user_by_email,
-    verify_password,
+    get_user_by_id,
+    hash_password_async,
+    verify_and_update_password,
 )
+from app.services.auth_cache import Principal, principal_cache
 from app.config import settings
 
 router = APIRouter()
@@ -32,31 +37,54 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    """Dependency to get the current authenticated user."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
 
-    from app.services.user_service import get_user_by_id
 
-    user = get_user_by_id(db, user_id)
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    Dependency to get the authenticated caller's id and email.
+
+    Verified tokens are cached in-process, so a cache hit costs neither a
+    JWT decode nor a database round-trip. Use this for endpoints that only
+    need `user_id`; `get_current_user` loads the full ORM `User`.
+    """
+    principal = principal_cache.get(token)
+    if principal is None:
+        try:
+            payload = jwt.decode(
+                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+            )
+            user_id = uuid.UUID(payload.get("sub") or "")
+        except (JWTError, ValueError):
+            raise _credentials_exception()
+
+        row = db.query(User.id, User.email).filter(User.id == user_id).first()
+        if row is None:
+            raise _credentials_exception()
+        principal = Principal(id=row.id, email=row.email)
+        principal_cache.put(token, principal, float(payload.get("exp", 0)))
+
+    # Lets read-only sessions apply read-your-writes routing for this user
+    current_user_id.set(str(principal.id))
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+) -> User:
+    """Dependency to get the current authenticated user as an ORM object."""
+    user = get_user_by_id(db, principal.id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
@@ -71,7 +99,9 @@ async def register(user_create: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered",
         )
 
-    user = create_user(db, user_create)
+    password_hash = await hash_password_async(user_create.password)
+    user = create_user(db, user_create, password_hash=password_hash)
+    db.commit()
     return user
 
 
@@ -84,13 +114,23 @@ async def login(
     user = get_user_by_email(
         db, form_data.username
     )  # OAuth2 uses 'username' field for email
-    if not user or not verify_password(form_data.password, user.password_hash):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(
+            form_data.password, user.password_hash
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Upgrade hashes created with older Argon2 parameters
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+
     access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
@@ -3,10 +3,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
-from app.database import get_db
-from app.models import Budget, User
+from app.database import get_db, get_db_readonly
+from app.models import Budget
 from app.schemas import BudgetCreate, BudgetRead
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_principal
+from app.services.auth_cache import Principal
 
 router = APIRouter()
 
@@ -14,7 +15,7 @@ router = APIRouter()
 @router.post("", response_model=BudgetRead, status_code=status.HTTP_201_CREATED)
 async def create_or_update_budget(
     budget_create: BudgetCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Create or update a monthly budget for a category."""
@@ -31,7 +32,6 @@ async def create_or_update_budget(
         # Update existing budget
         existing_budget.monthly_limit = budget_create.monthly_limit
         db.commit()
-        db.refresh(existing_budget)
         return existing_budget
     else:
         # Create new budget
@@ -43,14 +43,13 @@ async def create_or_update_budget(
         )
         db.add(db_budget)
         db.commit()
-        db.refresh(db_budget)
         return db_budget
 
 
 @router.get("", response_model=List[BudgetRead])
 async def list_budgets(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """List all budgets for the current user."""
     budgets = (
@@ -65,7 +64,7 @@ async def list_budgets(
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_budget(
     budget_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete a budget."""
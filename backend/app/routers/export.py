@@ -0,0 +1,99 @@
+"""Export router for streaming bulk data exports."""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Iterator, Optional
+from datetime import datetime
+from app.database import get_db_readonly
+from app.routers.auth import get_current_principal
+from app.services.auth_cache import Principal
+from app.services.export_service import (
+    PARQUET_AVAILABLE,
+    MEDIA_TYPES,
+    SERIALIZERS,
+    TRANSACTION_EXPORT_COLUMNS,
+    RECEIPT_EXPORT_COLUMNS,
+    column_names,
+    gzip_stream,
+    receipt_batches,
+    transaction_batches,
+)
+
+router = APIRouter()
+
+FORMAT_QUERY = Query("csv", pattern="^(csv|ndjson|parquet)$")
+
+FILE_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "parquet": "parquet"}
+
+
+def _export_response(
+    request: Request, name: str, file_format: str, chunks: Iterator[bytes]
+) -> StreamingResponse:
+    """Wrap serialized chunks in a streaming (optionally gzipped) response."""
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{FILE_EXTENSIONS[file_format]}"',
+        "Vary": "Accept-Encoding",
+    }
+    # Parquet pages are already compressed; gzipping them again wastes CPU
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    if accepts_gzip and file_format != "parquet":
+        chunks = gzip_stream(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        chunks, media_type=MEDIA_TYPES[file_format], headers=headers
+    )
+
+
+def _check_format(file_format: str) -> None:
+    """Reject Parquet exports when pyarrow is not installed."""
+    if file_format == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available on this server",
+        )
+
+
+@router.get("/transactions")
+async def export_transactions(
+    request: Request,
+    format: str = FORMAT_QUERY,
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    category: Optional[str] = Query(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Stream all of the user's transactions as CSV, NDJSON or Parquet.
+
+    Rows are read through a server-side cursor and written out batch by
+    batch, so memory stays flat regardless of history size.
+    """
+    _check_format(format)
+    batches = transaction_batches(
+        db,
+        current_user.id,
+        start_date=start_date,
+        end_date=end_date,
+        category=category,
+    )
+    chunks = SERIALIZERS[format](column_names(TRANSACTION_EXPORT_COLUMNS), batches)
+    return _export_response(request, "transactions", format, chunks)
+
+
+@router.get("/receipts")
+async def export_receipts(
+    request: Request,
+    format: str = FORMAT_QUERY,
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """Stream all of the user's receipts, including OCR text, as CSV, NDJSON or Parquet."""
+    _check_format(format)
+    batches = receipt_batches(
+        db, current_user.id, start_date=start_date, end_date=end_date
+    )
+    chunks = SERIALIZERS[format](column_names(RECEIPT_EXPORT_COLUMNS), batches)
+    return _export_response(request, "receipts", format, chunks)
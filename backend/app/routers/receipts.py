@@ -1,17 +1,31 @@
 """Receipt router for uploading and managing receipts."""
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    UploadFile,
+    File,
+    Query,
+    Header,
+)
+from sqlalchemy.orm import Session, undefer
+from typing import List, Optional
 import os
 import uuid
-from app.database import get_db
-from app.models import Receipt, User
-from app.schemas import ReceiptRead
-from app.routers.auth import get_current_user
+from app.database import get_db, get_db_readonly
+from app.models import Receipt
+from app.schemas import ReceiptRead, ReceiptSummary
+from app.routers.auth import get_current_principal
+from app.services.auth_cache import Principal
 from app.config import settings
 from app.ocr.tesseract_service import run_tesseract
 from app.ocr.nlp_extractor import extract_fields
+from app.metrics import observe_upload, ocr_stage
 from app.services.transaction_service import create_transaction
+from app.services.projection_service import parse_fields, schema_columns
+from app.responses import rows_response
+from app.services import idempotency_service
 from app.schemas import TransactionCreate
 import logging
 
@@ -33,6 +47,7 @@ async def save_receipt_image(file: UploadFile, user_id: uuid.UUID) -> str:
 
     # Save file
     content = await file.read()
+    observe_upload(len(content))
     with open(file_path, "wb") as buffer:
         buffer.write(content)
 
@@ -43,10 +58,18 @@ async def save_receipt_image(file: UploadFile, user_id: uuid.UUID) -> str:
 @router.post("/upload", response_model=ReceiptRead, status_code=status.HTTP_201_CREATED)
 async def upload_receipt(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    """Upload a receipt image, run OCR, and create receipt + transaction."""
+    """
+    Upload a receipt image, run OCR, and create receipt + transaction.
+
+    The receipt and its transaction are written in a single database
+    transaction, so a failure never leaves a receipt without a transaction.
+    With an `Idempotency-Key` header, retries return the original response
+    without re-running OCR.
+    """
     # Validate file type
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(
@@ -54,6 +77,34 @@ async def upload_receipt(
             detail="File must be an image",
         )
 
+    if idempotency_key:
+        content = await file.read()
+        await file.seek(0)
+        request_hash = idempotency_service.request_fingerprint(
+            b"POST /receipts/upload", content
+        )
+        stored = await idempotency_service.begin(
+            current_user.id, idempotency_key, request_hash
+        )
+        if stored is not None:
+            return stored.to_response()
+
+    failed = True
+    try:
+        receipt = await _process_receipt(file, current_user, db, idempotency_key)
+        failed = False
+    finally:
+        if idempotency_key:
+            await idempotency_service.release(
+                current_user.id, idempotency_key, failed
+            )
+    return receipt
+
+
+async def _process_receipt(
+    file: UploadFile, current_user: Principal, db: Session, idempotency_key: Optional[str]
+) -> Receipt:
+    """Save the image, run OCR and commit the receipt with its transaction."""
     # Save image
     image_path = await save_receipt_image(file, current_user.id)
     full_image_path = os.path.join(settings.MEDIA_ROOT, image_path)
@@ -66,7 +117,8 @@ async def upload_receipt(
         raw_text = run_tesseract(full_image_path)
 
         # Extract fields
-        extracted_fields = extract_fields(raw_text)
+        with ocr_stage("extract_fields"):
+            extracted_fields = extract_fields(raw_text)
 
         # Create receipt
         db_receipt = Receipt(
@@ -82,8 +134,6 @@ async def upload_receipt(
             raw_ocr_text=raw_text,
         )
         db.add(db_receipt)
-        db.commit()
-        db.refresh(db_receipt)
 
         # Create associated transaction
         if extracted_fields.get("total", 0.0) > 0:
@@ -98,9 +148,21 @@ async def upload_receipt(
                 db, current_user.id, transaction_create, receipt_id=db_receipt.id
             )
 
+        if idempotency_key:
+            db.flush()
+            idempotency_service.complete(
+                db,
+                current_user.id,
+                idempotency_key,
+                status.HTTP_201_CREATED,
+                ReceiptRead.model_validate(db_receipt).model_dump_json(),
+            )
+
+        db.commit()
         return db_receipt
 
     except Exception as e:
+        db.rollback()
         # Clean up saved image on error
         if os.path.exists(full_image_path):
             os.remove(full_image_path)
@@ -110,34 +172,44 @@ async def upload_receipt(
         )
 
 
-@router.get("", response_model=List[ReceiptRead])
+@router.get("", response_model=List[ReceiptSummary])
 async def list_receipts(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. vendor,total_amount"
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
-    """List receipts for the current user."""
+    """
+    List receipts for the current user.
+
+    Returns lightweight summaries without the raw OCR text; use `fields`
+    to select specific columns (including `raw_ocr_text`) in SQL.
+    """
+    columns = parse_fields(fields, Receipt, ReceiptRead.model_fields)
     receipts = (
-        db.query(Receipt)
+        db.query(*(columns or schema_columns(Receipt, ReceiptSummary)))
         .filter(Receipt.user_id == current_user.id)
         .order_by(Receipt.purchase_date.desc())
         .offset(skip)
         .limit(limit)
         .all()
     )
-    return receipts
+    return rows_response(receipts)
 
 
 @router.get("/{receipt_id}", response_model=ReceiptRead)
 async def get_receipt(
     receipt_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """Get a specific receipt by ID."""
     receipt = (
         db.query(Receipt)
+        .options(undefer(Receipt.raw_ocr_text))
         .filter(Receipt.id == receipt_id, Receipt.user_id == current_user.id)
         .first()
     )
@@ -0,0 +1,48 @@
+"""Search router for full-text search across receipts and transactions."""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+from app.database import get_db_readonly
+from app.schemas import SearchResults
+from app.routers.auth import get_current_principal
+from app.services.auth_cache import Principal
+from app.services.search_service import search
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResults)
+async def search_endpoint(
+    q: str = Query(..., min_length=1, max_length=256),
+    kind: Optional[str] = Query(None, pattern="^(receipt|transaction)$"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    category: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    Search receipts and transactions by vendor, description and OCR text.
+
+    Supports web-search syntax (quoted phrases, `or`, `-term`) and filters
+    on date range, amount range and category. Results are ranked by
+    relevance and include highlighted snippets.
+    """
+    return search(
+        db,
+        current_user.id,
+        q,
+        kind=kind,
+        start_date=start_date,
+        end_date=end_date,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        category=category,
+        skip=skip,
+        limit=limit,
+    )
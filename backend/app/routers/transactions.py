@@ -1,19 +1,45 @@
 """Transaction router for managing transactions."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    UploadFile,
+    File,
+    Header,
+)
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
+import io
 import uuid
-from app.database import get_db
-from app.models import User
-from app.schemas import TransactionCreate, TransactionRead
-from app.routers.auth import get_current_user
+from app.database import get_db, get_db_readonly
+from app.models import Transaction
+from app.schemas import (
+    TransactionCreate,
+    TransactionRead,
+    TransactionImportResult,
+    RecurringSeriesRead,
+)
+from app.routers.auth import get_current_principal
+from app.services.auth_cache import Principal
 from app.services.transaction_service import (
     create_transaction,
     get_transactions,
     get_transaction_by_id,
     delete_transaction,
 )
+from app.services.projection_service import parse_fields, schema_columns
+from app.responses import model_response, rows_response
+from app.services import idempotency_service
+from app.services.recurring_service import get_recurring_series
+from app.services.import_service import (
+    IMPORT_FORMATS,
+    detect_format,
+    import_transactions,
+)
 
 router = APIRouter()
 
@@ -21,14 +47,93 @@ router = APIRouter()
 @router.post("", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
 async def create_transaction_endpoint(
     transaction_create: TransactionCreate,
-    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    """Create a new transaction."""
-    transaction = create_transaction(db, current_user.id, transaction_create)
+    """
+    Create a new transaction.
+
+    With an `Idempotency-Key` header, retries of the same request return
+    the original response instead of inserting a duplicate.
+    """
+    if idempotency_key:
+        request_hash = idempotency_service.request_fingerprint(
+            b"POST /transactions", transaction_create.model_dump_json().encode()
+        )
+        stored = await idempotency_service.begin(
+            current_user.id, idempotency_key, request_hash
+        )
+        if stored is not None:
+            return stored.to_response()
+
+    failed = True
+    try:
+        transaction = create_transaction(db, current_user.id, transaction_create)
+        if idempotency_key:
+            idempotency_service.complete(
+                db,
+                current_user.id,
+                idempotency_key,
+                status.HTTP_201_CREATED,
+                TransactionRead.model_validate(transaction).model_dump_json(),
+            )
+        db.commit()
+        failed = False
+    finally:
+        if idempotency_key:
+            await idempotency_service.release(
+                current_user.id, idempotency_key, failed
+            )
     return transaction
 
 
+@router.post("/import", response_model=TransactionImportResult)
+async def import_transactions_endpoint(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ofx|qif)$"),
+    default_category: str = Query("other", min_length=1, max_length=100),
+    expense_sign: str = Query(
+        "negative",
+        pattern="^(negative|positive)$",
+        description="How a CSV signs expenses; OFX and QIF are always negative",
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk import transactions from a bank export (CSV, OFX/QFX or QIF).
+
+    The file is stream-parsed and inserted in committed chunks; rows that
+    fail to parse or validate are skipped and listed in the error report.
+    Credits (deposits, refunds, reversals) are never stored as spending:
+    they are counted in `skipped` and listed in the report too.
+    """
+    file_format = format or detect_format(file.filename)
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported import format; expected one of: csv, ofx, qif",
+        )
+
+    stream = io.TextIOWrapper(
+        file.file, encoding="utf-8-sig", errors="replace", newline=""
+    )
+    try:
+        # Parsing and inserting are blocking; keep them off the event loop
+        return await run_in_threadpool(
+            import_transactions,
+            db,
+            current_user.id,
+            stream,
+            file_format,
+            default_category=default_category,
+            expense_sign=expense_sign,
+        )
+    finally:
+        stream.detach()
+
+
 @router.get("", response_model=List[TransactionRead])
 async def list_transactions(
     skip: int = Query(0, ge=0),
@@ -36,10 +141,19 @@ async def list_transactions(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     category: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. amount,category"
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
-    """List transactions with optional filters."""
+    """
+    List transactions with optional filters and field selection.
+
+    Rows are selected as columns and serialized directly, without ORM
+    objects or per-row Pydantic models.
+    """
+    columns = parse_fields(fields, Transaction, TransactionRead.model_fields)
     transactions = get_transactions(
         db,
         current_user.id,
@@ -48,15 +162,32 @@ async def list_transactions(
         start_date=start_date,
         end_date=end_date,
         category=category,
+        columns=columns or schema_columns(Transaction, TransactionRead),
+    )
+    return rows_response(transactions)
+
+
+@router.get("/recurring", response_model=List[RecurringSeriesRead])
+async def list_recurring(
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
+):
+    """
+    List detected recurring charges with their predicted next occurrence.
+
+    Series are maintained as transactions are created; imported history
+    is picked up by `python -m app.jobs.recurring_backfill`.
+    """
+    return model_response(
+        List[RecurringSeriesRead], get_recurring_series(db, current_user.id)
     )
-    return transactions
 
 
 @router.get("/{transaction_id}", response_model=TransactionRead)
 async def get_transaction(
     transaction_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db_readonly),
 ):
     """Get a specific transaction by ID."""
     transaction = get_transaction_by_id(db, transaction_id, current_user.id)
@@ -71,7 +202,7 @@ async def get_transaction(
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction_endpoint(
     transaction_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete a transaction."""
@@ -81,3 +212,4 @@ async def delete_transaction_endpoint(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
+    db.commit()
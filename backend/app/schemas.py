@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation."""
 from pydantic import BaseModel, EmailStr, Field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from uuid import UUID
 
@@ -46,8 +46,8 @@ class ReceiptUpload(BaseModel):
     pass  # File upload handled via multipart/form-data
 
 
-class ReceiptRead(BaseModel):
-    """Schema for receipt response."""
+class ReceiptSummary(BaseModel):
+    """Schema for receipt list items (omits the raw OCR text)."""
 
     id: UUID
     user_id: UUID
@@ -58,13 +58,18 @@ class ReceiptRead(BaseModel):
     tax_amount: float
     currency: str
     category: Optional[str]
-    raw_ocr_text: Optional[str]
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class ReceiptRead(ReceiptSummary):
+    """Schema for receipt response."""
+
+    raw_ocr_text: Optional[str]
+
+
 # Transaction Schemas
 class TransactionCreate(BaseModel):
     """Schema for creating a transaction."""
@@ -93,6 +98,41 @@ class TransactionRead(BaseModel):
         from_attributes = True
 
 
+class RecurringSeriesRead(BaseModel):
+    """Schema for a detected recurring charge."""
+
+    id: UUID
+    description: Optional[str]
+    category: str
+    amount: float  # Mean of the matched transactions
+    cadence: Optional[str]  # weekly | monthly | annual
+    occurrence_count: int
+    last_date: datetime
+    next_expected_date: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    """Schema for a single rejected row in a bulk import."""
+
+    row: int  # 1-based row/record number within the uploaded file
+    message: str
+
+
+class TransactionImportResult(BaseModel):
+    """Schema for bulk transaction import response."""
+
+    format: str
+    total_rows: int
+    imported: int
+    failed: int
+    skipped: int = 0  # Credits, refunds and deposits; listed in `errors`
+    errors: list[ImportRowError]
+    errors_truncated: bool = False
+
+
 # Budget Schemas
 class BudgetCreate(BaseModel):
     """Schema for creating or updating a budget."""
@@ -138,3 +178,137 @@ class BudgetAlert(BaseModel):
     limit: float
     percentage: float  # (spent / limit) * 100
     over_by: float  # spent - limit (negative if under budget)
+
+
+class DashboardSummary(BaseModel):
+    """All dashboard analytics, computed together in one round-trip."""
+
+    current_month_spend: float
+    monthly_spend: list[MonthlySpendPoint]
+    category_breakdown: list[CategorySpend]
+    budget_alerts: list[BudgetAlert]
+
+
+class TimeSeriesPoint(BaseModel):
+    """Schema for one bucket of a spend time series."""
+
+    period_start: date  # First local day of the bucket
+    total_amount: float
+    transaction_count: int
+
+
+class TimeSeriesPeriod(BaseModel):
+    """Schema for a dense, gap-filled series over one date range."""
+
+    start: date
+    end: date
+    total_amount: float
+    points: list[TimeSeriesPoint]
+
+
+class TimeSeries(BaseModel):
+    """Schema for the time-series analytics response."""
+
+    granularity: str  # day | week | month
+    timezone: str
+    category: Optional[str]
+    current: TimeSeriesPeriod
+    previous: Optional[TimeSeriesPeriod] = None  # Same-length period just before
+    change_amount: Optional[float] = None
+    change_pct: Optional[float] = None  # None when the previous total is 0
+
+
+class CategoryForecast(BaseModel):
+    """Schema for one category's end-of-month spend projection."""
+
+    category: str
+    spent_to_date: float
+    projected_total: float
+    baseline_monthly: float  # Average monthly spend over the baseline months
+    monthly_limit: Optional[float]
+    projected_over_budget: bool
+
+
+class SpendForecast(BaseModel):
+    """Schema for the current month's spend forecast."""
+
+    month: str  # YYYY-MM
+    days_elapsed: float
+    days_in_month: int
+    spent_to_date: float
+    projected_total: float
+    categories: list[CategoryForecast]
+
+
+class SpendAnomaly(BaseModel):
+    """Schema for an unusually large transaction."""
+
+    transaction_id: UUID
+    transaction_date: datetime
+    amount: float
+    category: str
+    description: Optional[str]
+    typical_amount: float  # Median of the category's preceding transactions
+    score: float  # Modified z-score against that history
+
+
+class VendorCount(BaseModel):
+    """Schema for one heavy-hitter vendor estimate."""
+
+    vendor: str  # Normalized (case-folded) vendor name
+    count: int  # Estimated receipts; never below the true count
+    max_overcount: int  # count - max_overcount <= true count
+
+
+class TopVendors(BaseModel):
+    """Schema for sketch-backed top vendors."""
+
+    scope: str  # user | platform
+    months: int
+    total_receipts: int
+    guaranteed_above: float  # Every vendor with more receipts than this is listed
+    vendors: list[VendorCount]
+
+
+class AmountPercentiles(BaseModel):
+    """Schema for sketch-backed transaction amount percentiles."""
+
+    scope: str  # user | platform
+    months: int
+    count: int
+    min: Optional[float]
+    max: Optional[float]
+    percentiles: dict[str, Optional[float]]  # e.g. {"p50": 23.1, "p99": 412.0}
+
+
+class DistinctVendors(BaseModel):
+    """Schema for a sketch-backed distinct vendor count."""
+
+    scope: str  # user | platform
+    months: int
+    estimate: int
+    relative_standard_error: float  # 1.04 / sqrt(registers)
+
+
+# Search Schemas
+class SearchResult(BaseModel):
+    """Schema for a single full-text search hit."""
+
+    kind: str  # "receipt" or "transaction"
+    id: UUID
+    title: Optional[str]  # Vendor for receipts, description for transactions
+    date: datetime
+    amount: float
+    category: Optional[str]
+    rank: float
+    snippet: Optional[str] = Field(
+        description="HTML-escaped excerpt; the only markup is <b>...</b> around "
+        "matched terms, so it can be inserted as HTML as-is"
+    )
+
+
+class SearchResults(BaseModel):
+    """Schema for a page of search results."""
+
+    results: list[SearchResult]
+    has_more: bool
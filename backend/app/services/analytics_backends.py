@@ -0,0 +1,495 @@
+"""
+Analytics query backends.
+
+Postgres is the default (and fallback) backend. The optional DuckDB backend
+answers long-range aggregations from a columnar Parquet copy of the
+`transactions` table, so multi-year trend queries no longer compete with
+ingest traffic on the OLTP database.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import event, func, and_
+from sqlalchemy.engine import Engine
+from app.models import Transaction
+from app.config import settings
+from app.database import SessionLocal
+from typing import List, Optional, Set, Tuple
+from datetime import datetime
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# DuckDB is optional - only needed when ANALYTICS_BACKEND=duckdb, so it is
+# imported where used rather than at start-up
+DUCKDB_AVAILABLE = importlib.util.find_spec("duckdb") is not None
+
+MonthlyTotals = List[Tuple[datetime, float]]
+CategoryTotals = List[Tuple[str, float]]
+
+
+class PostgresAnalyticsBackend:
+    """Run analytics aggregations directly against the primary database."""
+
+    name = "postgres"
+
+    def monthly_totals(
+        self, db: Session, user_id: uuid.UUID, start_date: datetime, end_date: datetime
+    ) -> MonthlyTotals:
+        """Sum spend per calendar month, using date_trunc for efficient grouping."""
+        results = (
+            db.query(
+                func.date_trunc("month", Transaction.transaction_date).label("month"),
+                func.sum(Transaction.amount).label("total_amount"),
+            )
+            .filter(
+                and_(
+                    Transaction.user_id == user_id,
+                    Transaction.transaction_date >= start_date,
+                    Transaction.transaction_date <= end_date,
+                )
+            )
+            .group_by(func.date_trunc("month", Transaction.transaction_date))
+            .order_by("month")
+            .all()
+        )
+        return [(row.month, float(row.total_amount or 0.0)) for row in results]
+
+    def category_totals(
+        self, db: Session, user_id: uuid.UUID, start_date: datetime, end_date: datetime
+    ) -> CategoryTotals:
+        """Sum spend per category, largest first."""
+        results = (
+            db.query(
+                Transaction.category, func.sum(Transaction.amount).label("total_amount")
+            )
+            .filter(
+                and_(
+                    Transaction.user_id == user_id,
+                    Transaction.transaction_date >= start_date,
+                    Transaction.transaction_date <= end_date,
+                )
+            )
+            .group_by(Transaction.category)
+            .order_by(func.sum(Transaction.amount).desc())
+            .all()
+        )
+        return [(row.category, float(row.total_amount or 0.0)) for row in results]
+
+
+# Columns copied into the columnar store. Timestamps are normalized to UTC
+# so DuckDB's date_trunc buckets match Postgres running with TimeZone=UTC.
+EXPORT_QUERY = (
+    "COPY (SELECT user_id::text, transaction_date AT TIME ZONE 'UTC', amount, "
+    "category, created_at AT TIME ZONE 'UTC' FROM transactions {where} "
+    "ORDER BY user_id, transaction_date) TO STDOUT WITH (FORMAT csv)"
+)
+
+CSV_COLUMNS = (
+    "{'user_id': 'VARCHAR', 'transaction_date': 'TIMESTAMP', 'amount': 'DOUBLE', "
+    "'category': 'VARCHAR', 'created_at': 'TIMESTAMP'}"
+)
+
+
+class ColumnarStore:
+    """
+    A Parquet snapshot of `transactions`, described by a manifest file.
+
+    A full refresh rewrites the table into one Parquet file sorted by
+    (user_id, transaction_date), so row-group statistics let DuckDB skip
+    everything but the requested user's rows. Incremental refreshes append
+    a small part file with rows created since the last watermark.
+
+    The manifest is replaced atomically, so readers in any worker process
+    always see a consistent set of files. A file lock ensures only one
+    process refreshes at a time.
+
+    Appends only ever add rows, so a user whose transactions were deleted
+    or edited gets a marker file under `stale/`. Until a full refresh that
+    started after the marker lands, that user's queries go to Postgres,
+    and the next refresh is a full one.
+    """
+
+    def __init__(self, directory: str, engine: Engine):
+        self.directory = directory
+        self.engine = engine
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.lock_path = os.path.join(directory, "refresh.lock")
+        self.stale_dir = os.path.join(directory, "stale")
+        os.makedirs(self.stale_dir, exist_ok=True)
+
+    def read_manifest(self) -> Optional[dict]:
+        """Load the current manifest, or None if no snapshot exists yet."""
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def mark_stale(self, user_id: uuid.UUID) -> None:
+        """Record that rows already in the snapshot changed for `user_id`."""
+        path = os.path.join(self.stale_dir, str(user_id))
+        with open(path, "a"):
+            pass
+        # Explicit times: the filesystem's own clock can trail time.time()
+        now = time.time()
+        os.utime(path, (now, now))
+
+    def is_stale(self, user_id: uuid.UUID, manifest: dict) -> bool:
+        """Whether `user_id` changed since the last full refresh started."""
+        try:
+            marked = os.path.getmtime(os.path.join(self.stale_dir, str(user_id)))
+        except FileNotFoundError:
+            return False
+        return marked >= manifest["full_refreshed_at"]
+
+    def _has_stale_users(self, manifest: dict) -> bool:
+        return any(
+            entry.stat().st_mtime >= manifest["full_refreshed_at"]
+            for entry in os.scandir(self.stale_dir)
+        )
+
+    def _remove_stale_markers(self, before: float) -> None:
+        """Drop markers that a full refresh started at `before` has covered."""
+        for entry in os.scandir(self.stale_dir):
+            try:
+                if entry.stat().st_mtime < before:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _export_part(self, since: Optional[str]) -> Tuple[Optional[str], int, str]:
+        """Copy rows out of Postgres into a new Parquet part file."""
+        where = ""
+        if since:
+            # Watermark comes from our own manifest, never from user input
+            where = f"WHERE created_at AT TIME ZONE 'UTC' > '{since}'"
+
+        part_name = f"part-{time.time_ns()}.parquet"
+        part_path = os.path.join(self.directory, part_name)
+        with tempfile.NamedTemporaryFile(
+            "w+b", suffix=".csv", dir=self.directory, delete=False
+        ) as csv_file:
+            raw = self.engine.raw_connection()
+            try:
+                with raw.cursor() as cursor:
+                    cursor.copy_expert(EXPORT_QUERY.format(where=where), csv_file)
+            finally:
+                raw.close()
+
+        import duckdb
+
+        try:
+            con = duckdb.connect()
+            try:
+                rows, watermark = con.execute(
+                    f"SELECT count(*), max(created_at) FROM read_csv("
+                    f"'{csv_file.name}', header=false, columns={CSV_COLUMNS})"
+                ).fetchone()
+                if not rows:
+                    return None, 0, since
+                con.execute(
+                    f"COPY (SELECT * FROM read_csv('{csv_file.name}', header=false, "
+                    f"columns={CSV_COLUMNS})) TO '{part_path}' "
+                    f"(FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE 122880)"
+                )
+            finally:
+                con.close()
+        finally:
+            os.remove(csv_file.name)
+
+        return part_name, rows, watermark.isoformat(sep=" ")
+
+    def refresh(
+        self, full: bool = False, min_interval: float = 0, full_interval: float = 0
+    ) -> bool:
+        """
+        Refresh the snapshot; returns False if nothing was done.
+
+        Every worker runs a refresher, so the lock plus `min_interval`
+        check make sure only one of them does the work each period. Full
+        refreshes (forced, every `full_interval` seconds, or as soon as a
+        user is marked stale) pick up deletes, edits and late-committed rows
+        that an incremental append keyed on created_at can miss.
+        """
+        import fcntl  # Unix-only; the columnar backend targets the Docker image
+
+        with open(self.lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+            manifest = self.read_manifest()
+            now = time.time()
+            if manifest is None:
+                full = True
+            elif full_interval and now - manifest["full_refreshed_at"] >= full_interval:
+                full = True
+            elif self._has_stale_users(manifest):
+                full = True
+            elif not full and now - manifest["refreshed_at"] < min_interval:
+                return False
+
+            started = time.time()
+            since = None if full else manifest["watermark"]
+            part, rows, watermark = self._export_part(since)
+
+            files = [] if full else list(manifest["files"])
+            if part:
+                files.append(part)
+            self._write_manifest(
+                {
+                    "files": files,
+                    "watermark": watermark,
+                    "refreshed_at": started,
+                    "full_refreshed_at": started
+                    if full
+                    else manifest["full_refreshed_at"],
+                }
+            )
+            self._remove_unreferenced(files)
+            if full:
+                self._remove_stale_markers(started)
+            logger.info(
+                "Columnar store %s refresh: %d rows in %.2fs",
+                "full" if full else "incremental",
+                rows,
+                time.time() - started,
+            )
+            return True
+
+    def _remove_unreferenced(self, files: List[str], grace_seconds: int = 120) -> None:
+        """Delete part files no longer in the manifest once readers are done."""
+        keep = set(files)
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.endswith(".parquet") and name not in keep:
+                path = os.path.join(self.directory, name)
+                if now - os.path.getmtime(path) > grace_seconds:
+                    os.remove(path)
+
+
+class DuckDBAnalyticsBackend:
+    """Answer analytics aggregations from the columnar store with DuckDB."""
+
+    name = "duckdb"
+
+    def __init__(self, store: ColumnarStore, max_staleness_seconds: int):
+        self.store = store
+        self.max_staleness_seconds = max_staleness_seconds
+        self._local = threading.local()
+        self._manifest: Optional[dict] = None
+        self._manifest_mtime = 0.0
+
+    def _current_manifest(self) -> Optional[dict]:
+        """Reload the manifest only when the file has changed."""
+        try:
+            mtime = os.path.getmtime(self.store.manifest_path)
+        except FileNotFoundError:
+            return None
+        if mtime != self._manifest_mtime:
+            self._manifest = self.store.read_manifest()
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def is_fresh(self) -> bool:
+        """Whether the snapshot is recent enough to serve queries."""
+        manifest = self._current_manifest()
+        return (
+            manifest is not None
+            and bool(manifest["files"])
+            and time.time() - manifest["refreshed_at"] < self.max_staleness_seconds
+        )
+
+    def serves(self, user_id: uuid.UUID) -> bool:
+        """Whether the snapshot still matches `user_id`'s existing rows."""
+        return not self.store.is_stale(user_id, self._current_manifest())
+
+    def _connection(self):
+        """
+        Get this thread's DuckDB connection with a view over the snapshot.
+
+        Connections are per-thread (DuckDB connections are not safe to share
+        across threads) and the view is rebuilt when the manifest changes.
+        """
+        manifest = self._current_manifest()
+        con = getattr(self._local, "con", None)
+        if con is None:
+            import duckdb
+
+            con = duckdb.connect()
+            self._local.con = con
+            self._local.files = None
+        if self._local.files != manifest["files"]:
+            paths = ", ".join(
+                "'" + os.path.join(self.store.directory, name) + "'"
+                for name in manifest["files"]
+            )
+            con.execute(
+                f"CREATE OR REPLACE VIEW transactions AS "
+                f"SELECT * FROM read_parquet([{paths}])"
+            )
+            self._local.files = manifest["files"]
+        return con
+
+    def monthly_totals(
+        self, db: Session, user_id: uuid.UUID, start_date: datetime, end_date: datetime
+    ) -> MonthlyTotals:
+        """Sum spend per calendar month from the columnar store."""
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT date_trunc('month', transaction_date) AS month, sum(amount) "
+                "FROM transactions WHERE user_id = ? "
+                "AND transaction_date BETWEEN ? AND ? "
+                "GROUP BY month ORDER BY month",
+                [str(user_id), start_date, end_date],
+            )
+            .fetchall()
+        )
+        return [(month, float(total or 0.0)) for month, total in rows]
+
+    def category_totals(
+        self, db: Session, user_id: uuid.UUID, start_date: datetime, end_date: datetime
+    ) -> CategoryTotals:
+        """Sum spend per category from the columnar store, largest first."""
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT category, sum(amount) AS total FROM transactions "
+                "WHERE user_id = ? AND transaction_date BETWEEN ? AND ? "
+                "GROUP BY category ORDER BY total DESC",
+                [str(user_id), start_date, end_date],
+            )
+            .fetchall()
+        )
+        return [(category, float(total or 0.0)) for category, total in rows]
+
+
+postgres_backend = PostgresAnalyticsBackend()
+_columnar_backend: Optional[DuckDBAnalyticsBackend] = None
+_refresher: Optional[threading.Thread] = None
+_stop_refresher = threading.Event()
+
+
+def get_backend(months: int, user_id: Optional[uuid.UUID] = None):
+    """
+    Pick the backend for an aggregation spanning `months` months.
+
+    Short windows stay on Postgres so the current month reflects writes
+    immediately; longer windows use the columnar store when it is fresh
+    and has not been marked stale for `user_id`.
+    """
+    if (
+        _columnar_backend is not None
+        and months >= settings.ANALYTICS_COLUMNAR_MIN_MONTHS
+        and _columnar_backend.is_fresh()
+        and (user_id is None or _columnar_backend.serves(user_id))
+    ):
+        return _columnar_backend
+    return postgres_backend
+
+
+def run_aggregation(method: str, db: Session, months: int, user_id: uuid.UUID, *args):
+    """Run an aggregation on the chosen backend, falling back to Postgres on error."""
+    backend = get_backend(months, user_id)
+    if backend is not postgres_backend:
+        try:
+            return getattr(backend, method)(db, user_id, *args)
+        except Exception:
+            logger.exception("Columnar analytics query failed; using Postgres")
+    return getattr(postgres_backend, method)(db, user_id, *args)
+
+
+_STALE_USERS = "columnar_stale_users"
+
+
+def _mark_stale(users) -> None:
+    if _columnar_backend is None:
+        return
+    for user_id in users:
+        try:
+            _columnar_backend.store.mark_stale(user_id)
+        except OSError:
+            logger.exception("Could not mark the columnar store stale")
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_stale_users(session: Session, flush_context) -> None:
+    # New rows reach the snapshot by append; edited or deleted ones do not.
+    # Marked on flush, so no request reads the snapshot between commit and
+    # marker, and again on commit, so a full refresh that started before
+    # the commit cannot clear the marker.
+    stale: Set[uuid.UUID] = session.info.setdefault(_STALE_USERS, set())
+    flushed = {
+        obj.user_id
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, Transaction) and obj.user_id is not None
+    }
+    _mark_stale(flushed - stale)
+    stale |= flushed
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_stale_users(session: Session) -> None:
+    _mark_stale(session.info.pop(_STALE_USERS, ()))
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_stale_users(session: Session, previous_transaction) -> None:
+    session.info.pop(_STALE_USERS, None)
+
+
+def _refresh_loop(store: ColumnarStore) -> None:
+    """Background loop: incremental refreshes with periodic full rebuilds."""
+    while not _stop_refresher.is_set():
+        try:
+            store.refresh(
+                min_interval=settings.ANALYTICS_REFRESH_SECONDS * 0.9,
+                full_interval=settings.ANALYTICS_FULL_REFRESH_SECONDS,
+            )
+        except Exception:
+            logger.exception("Columnar store refresh failed")
+        _stop_refresher.wait(settings.ANALYTICS_REFRESH_SECONDS)
+
+
+def start_columnar_backend(engine: Engine) -> None:
+    """Enable the DuckDB backend and start its refresher thread, if configured."""
+    global _columnar_backend, _refresher
+    if settings.ANALYTICS_BACKEND != "duckdb":
+        return
+    if not DUCKDB_AVAILABLE:
+        logger.warning("ANALYTICS_BACKEND=duckdb but duckdb is not installed")
+        return
+
+    store = ColumnarStore(settings.ANALYTICS_STORE_DIR, engine)
+    _columnar_backend = DuckDBAnalyticsBackend(
+        store, max_staleness_seconds=3 * settings.ANALYTICS_REFRESH_SECONDS
+    )
+    _stop_refresher.clear()
+    _refresher = threading.Thread(
+        target=_refresh_loop, args=(store,), name="analytics-refresh", daemon=True
+    )
+    _refresher.start()
+
+
+def stop_columnar_backend() -> None:
+    """Stop the refresher thread and route everything back to Postgres."""
+    global _columnar_backend, _refresher
+    _stop_refresher.set()
+    if _refresher is not None:
+        _refresher.join(timeout=5)
+    _columnar_backend = None
+    _refresher = None
@@ -0,0 +1,224 @@
+"""Per-user versioned cache of analytics responses with ETag support."""
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.responses import dump_json
+from app.models import Budget, Receipt, Transaction
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, List, Optional, Set, Tuple
+import hashlib
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Writes to these models change a user's analytics
+ANALYTICS_MODELS = (Transaction, Receipt, Budget)
+
+_DIRTY_USERS = "analytics_dirty_users"
+
+
+class UserVersions:
+    """
+    Bounded map of user_id -> data version, bumped on every committed write.
+
+    Versions come from one process-wide counter. When the map overflows,
+    the least recently bumped user is dropped and the floor (the version
+    reported for unknown users) is raised to the current counter, so a
+    forgotten user can never match a cache entry computed before a write.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._versions: "OrderedDict[uuid.UUID, int]" = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: uuid.UUID) -> int:
+        with self._lock:
+            return self._versions.get(user_id, self._floor)
+
+    def bump(self, user_id: uuid.UUID) -> int:
+        with self._lock:
+            self._counter += 1
+            self._versions[user_id] = self._counter
+            self._versions.move_to_end(user_id)
+            while len(self._versions) > self.maxsize:
+                self._versions.popitem(last=False)
+                self._floor = self._counter
+            return self._counter
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized analytics response and its strong ETag."""
+
+    version: int
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class AnalyticsCache:
+    """
+    LRU cache of (user_id, endpoint, params) -> CachedResponse.
+
+    An entry is served only while the user's version is unchanged and its
+    TTL has not passed. The TTL bounds staleness from time-relative
+    windows ("last 12 months") and from writes made in other workers.
+    """
+
+    def __init__(
+        self,
+        versions: UserVersions,
+        maxsize: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.versions = versions
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[Hashable, ...], CachedResponse]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(
+        self, user_id: uuid.UUID, name: str, params: Tuple[Hashable, ...]
+    ) -> Optional[CachedResponse]:
+        key = (user_id, name, params)
+        version = self.versions.get(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version or entry.expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(
+        self,
+        user_id: uuid.UUID,
+        name: str,
+        params: Tuple[Hashable, ...],
+        version: int,
+        body: bytes,
+    ) -> CachedResponse:
+        entry = CachedResponse(
+            version=version,
+            body=body,
+            etag='"%s"' % hashlib.sha256(body).hexdigest()[:32],
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        if self.maxsize <= 0:
+            return entry
+        with self._lock:
+            self._entries[(user_id, name, params)] = entry
+            self._entries.move_to_end((user_id, name, params))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_versions = UserVersions(maxsize=settings.ANALYTICS_CACHE_MAX_USERS)
+analytics_cache = AnalyticsCache(
+    user_versions,
+    maxsize=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cached_json_response(
+    request: Request,
+    user_id: uuid.UUID,
+    name: str,
+    params: Tuple[Hashable, ...],
+    compute: Callable[[], Any],
+) -> Response:
+    """
+    Serve an analytics result from the cache, computing it on a miss.
+
+    Responses carry a strong ETag; a matching If-None-Match gets `304`.
+    Cache hits touch neither the database nor the serializer.
+    """
+    entry = analytics_cache.get(user_id, name, params)
+    if entry is None:
+        version = user_versions.get(user_id)
+        body = dump_json(compute())
+        entry = analytics_cache.put(user_id, name, params, version, body)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+# Called with each user id whose analytics changed, after the commit
+_change_listeners: List[Callable[[uuid.UUID], None]] = []
+
+
+def on_analytics_change(listener: Callable[[uuid.UUID], None]):
+    """Register `listener(user_id)` to run after a commit changes a user's data."""
+    _change_listeners.append(listener)
+    return listener
+
+
+def mark_analytics_dirty(db: Session, user_id: uuid.UUID) -> None:
+    """
+    Bump the user's analytics version when `db` commits.
+
+    Needed only for writes that bypass the ORM unit of work, such as
+    bulk `insert()` statements; ORM flushes are tracked automatically.
+    """
+    db.info.setdefault(_DIRTY_USERS, set()).add(user_id)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty_users(session: Session, flush_context) -> None:
+    dirty: Set[uuid.UUID] = session.info.setdefault(_DIRTY_USERS, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, ANALYTICS_MODELS) and obj.user_id is not None:
+            dirty.add(obj.user_id)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_versions(session: Session) -> None:
+    for user_id in session.info.pop(_DIRTY_USERS, ()):
+        user_versions.bump(user_id)
+        for listener in _change_listeners:
+            try:
+                listener(user_id)
+            except Exception:
+                logger.exception("Analytics change listener failed")
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_dirty_users(session: Session, previous_transaction) -> None:
+    session.info.pop(_DIRTY_USERS, None)
@@ -0,0 +1,285 @@
+"""Server-pushed analytics changes: in-process pub/sub with optional Postgres fan-out."""
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.services.analytics_cache import on_analytics_change, user_versions
+from app.services.analytics_service import get_current_month_spend
+from app.services.budget_service import evaluate_budgets
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "analytics_changes"
+
+
+@dataclass(eq=False, slots=True)
+class Subscription:
+    """
+    One open stream. Changes only set a flag: the stream recomputes from
+    the database when it wakes, so bursts of writes coalesce into one
+    update and an idle subscription holds no queued payloads.
+    """
+
+    user_id: uuid.UUID
+    loop: asyncio.AbstractEventLoop
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    changed: bool = False
+
+    def notify(self) -> None:
+        """Mark the user's data changed and wake the stream (loop thread only)."""
+        self.changed = True
+        self.wakeup.set()
+
+
+class AnalyticsEventBus:
+    """Per-user fan-out of "your analytics changed" signals to open streams."""
+
+    def __init__(self, max_per_user: int):
+        self.max_per_user = max_per_user
+        self._subscriptions: Dict[uuid.UUID, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: uuid.UUID) -> Optional[Subscription]:
+        """Subscribe on the running loop; None if the user has too many streams."""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            subscriptions = self._subscriptions.setdefault(user_id, set())
+            if len(subscriptions) >= self.max_per_user:
+                return None
+            subscriptions.add(subscription)
+        return subscription
+
+    def is_full(self, user_id: uuid.UUID) -> bool:
+        """Whether `subscribe` would currently turn `user_id` away."""
+        with self._lock:
+            return len(self._subscriptions.get(user_id, ())) >= self.max_per_user
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id: uuid.UUID) -> int:
+        """Wake every stream of `user_id`; safe to call from any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.notify)
+            except RuntimeError:  # Loop already closed
+                self.unsubscribe(subscription)
+        return len(subscriptions)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscriptions.values())
+
+
+event_bus = AnalyticsEventBus(settings.SSE_MAX_STREAMS_PER_USER)
+
+
+class PgNotifyBridge:
+    """
+    Fan changes out across workers with Postgres LISTEN/NOTIFY.
+
+    One thread owns one dedicated connection: it sends NOTIFY for local
+    changes and dispatches other workers' notifications to the local bus
+    (also bumping the local analytics cache version for that user).
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._outgoing: "queue.Queue[uuid.UUID]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def send(self, user_id: uuid.UUID) -> None:
+        self._outgoing.put(user_id)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="analytics-notify", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("LISTEN/NOTIFY bridge failed; reconnecting")
+                self._stop.wait(5)
+
+    def _listen(self) -> None:
+        raw = self.engine.raw_connection()
+        # Never return a LISTENing autocommit connection to the pool
+        raw.detach()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while not self._stop.is_set():
+                self._send_pending(cursor)
+                if select.select([conn], [], [], 0.2)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+        finally:
+            raw.close()
+
+    def _send_pending(self, cursor) -> None:
+        pending = set()
+        while True:
+            try:
+                pending.add(self._outgoing.get_nowait())
+            except queue.Empty:
+                break
+        for user_id in pending:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)",
+                (NOTIFY_CHANNEL, f"{self.origin}:{user_id}"),
+            )
+
+    def _dispatch(self, payload: str) -> None:
+        origin, _, user = payload.partition(":")
+        if origin == self.origin:
+            return
+        try:
+            user_id = uuid.UUID(user)
+        except ValueError:
+            return
+        user_versions.bump(user_id)
+        event_bus.publish(user_id)
+
+
+_bridge: Optional[PgNotifyBridge] = None
+
+
+@on_analytics_change
+def _publish_change(user_id: uuid.UUID) -> None:
+    event_bus.publish(user_id)
+    if _bridge is not None:
+        _bridge.send(user_id)
+
+
+def start_event_bridge(engine: Engine) -> None:
+    """Start the cross-worker LISTEN/NOTIFY bridge when configured."""
+    global _bridge
+    if not settings.ANALYTICS_EVENTS_PG_NOTIFY:
+        return
+    _bridge = PgNotifyBridge(engine)
+    _bridge.start()
+
+
+def stop_event_bridge() -> None:
+    global _bridge
+    if _bridge is not None:
+        _bridge.stop()
+        _bridge = None
+
+
+def compute_state(user_id: uuid.UUID, alert_threshold: float) -> dict:
+    """Current budget alerts (by category) and month-to-date spend."""
+    # Primary, not the replica: this runs right after the user's own write
+    with SessionLocal() as db:
+        alerts = evaluate_budgets(db, user_id, alert_threshold=alert_threshold)
+        total = get_current_month_spend(db, user_id)
+    return {
+        "budget_alerts": {a.category: a.model_dump() for a in alerts},
+        "current_month_spend": total,
+    }
+
+
+def diff_state(previous: dict, current: dict) -> list:
+    """(event, data) pairs describing what changed between two states."""
+    events = []
+    old_total = previous["current_month_spend"]
+    new_total = current["current_month_spend"]
+    if new_total != old_total:
+        events.append(
+            (
+                "month-total",
+                {"current_month_spend": new_total, "delta": new_total - old_total},
+            )
+        )
+    old_alerts, new_alerts = previous["budget_alerts"], current["budget_alerts"]
+    changed = [a for c, a in new_alerts.items() if old_alerts.get(c) != a]
+    cleared = sorted(old_alerts.keys() - new_alerts.keys())
+    if changed or cleared:
+        events.append(("budget-alerts", {"changed": changed, "cleared": cleared}))
+    return events
+
+
+def format_event(event: str, data, event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_changes(
+    user_id: uuid.UUID,
+    alert_threshold: float,
+    compute: Callable[[uuid.UUID, float], dict] = compute_state,
+) -> AsyncIterator[str]:
+    """
+    SSE body: a snapshot, then deltas whenever the user's data changes.
+
+    Heartbeat comments keep proxies from closing idle connections. The
+    subscription is taken when the body starts and released when it ends,
+    so a response that is never sent holds no stream slot. A client that
+    loses the race for the last slot gets an `error` event and the stream
+    ends.
+    """
+    subscription = event_bus.subscribe(user_id)
+    if subscription is None:
+        yield format_event("error", {"detail": "Too many open analytics streams"})
+        return
+    event_id = 0
+    try:
+        state = await run_in_threadpool(compute, user_id, alert_threshold)
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+        yield format_event("snapshot", state, event_id)
+        loop = asyncio.get_running_loop()
+        while True:
+            # A timer handle rather than wait_for, which would allocate a
+            # task per wait on every idle connection
+            heartbeat = loop.call_later(
+                settings.SSE_HEARTBEAT_SECONDS, subscription.wakeup.set
+            )
+            await subscription.wakeup.wait()
+            heartbeat.cancel()
+            subscription.wakeup.clear()
+            if not subscription.changed:
+                yield ": ping\n\n"
+                continue
+            subscription.changed = False
+            current = await run_in_threadpool(compute, user_id, alert_threshold)
+            for event, data in diff_state(state, current):
+                event_id += 1
+                yield format_event(event, data, event_id)
+            state = current
+    finally:
+        event_bus.unsubscribe(subscription)
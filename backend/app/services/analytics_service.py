@@ -1,9 +1,11 @@
 """Analytics service for generating spending insights and aggregations."""
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, null, select, union_all
 from app.models import Transaction, Budget
-from app.schemas import MonthlySpendPoint, CategorySpend, BudgetAlert
-from typing import List
+from app.schemas import MonthlySpendPoint, CategorySpend, BudgetAlert, DashboardSummary
+from app.services.analytics_backends import run_aggregation
+from app.services.budget_service import evaluate_budgets, is_alert, to_alert
+from typing import Dict, List
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import uuid
@@ -18,40 +20,21 @@ def get_monthly_spend(
     Get monthly spend aggregation for the last N months.
 
     Optimized query using date_trunc for fast monthly aggregation.
-    Target: sub-200ms response time with proper indexes.
+    Target: sub-200ms response time with proper indexes. Windows of
+    ANALYTICS_COLUMNAR_MIN_MONTHS or more are served from the columnar
+    store when it is enabled.
     """
     end_date = datetime.now()
     start_date = end_date - relativedelta(months=months)
 
-    # Use date_trunc for efficient monthly grouping
-    results = (
-        db.query(
-            func.date_trunc("month", Transaction.transaction_date).label("month"),
-            func.sum(Transaction.amount).label("total_amount"),
-        )
-        .filter(
-            and_(
-                Transaction.user_id == user_id,
-                Transaction.transaction_date >= start_date,
-                Transaction.transaction_date <= end_date,
-            )
-        )
-        .group_by(func.date_trunc("month", Transaction.transaction_date))
-        .order_by("month")
-        .all()
+    results = run_aggregation(
+        "monthly_totals", db, months, user_id, start_date, end_date
     )
 
-    # Format results
-    monthly_spend = []
-    for row in results:
-        month_str = row.month.strftime("%Y-%m")
-        monthly_spend.append(
-            MonthlySpendPoint(
-                month=month_str, total_amount=float(row.total_amount or 0.0)
-            )
-        )
-
-    return monthly_spend
+    return [
+        MonthlySpendPoint(month=month.strftime("%Y-%m"), total_amount=total)
+        for month, total in results
+    ]
 
 
 def get_category_breakdown(
@@ -63,32 +46,18 @@ def get_category_breakdown(
     Get category-wise spend aggregation for the last N months.
 
     Optimized query with proper WHERE clause and GROUP BY.
-    Target: sub-200ms response time.
+    Target: sub-200ms response time. Routed like get_monthly_spend.
     """
     end_date = datetime.now()
     start_date = end_date - relativedelta(months=months)
 
-    results = (
-        db.query(
-            Transaction.category, func.sum(Transaction.amount).label("total_amount")
-        )
-        .filter(
-            and_(
-                Transaction.user_id == user_id,
-                Transaction.transaction_date >= start_date,
-                Transaction.transaction_date <= end_date,
-            )
-        )
-        .group_by(Transaction.category)
-        .order_by(func.sum(Transaction.amount).desc())
-        .all()
+    results = run_aggregation(
+        "category_totals", db, months, user_id, start_date, end_date
     )
 
     return [
-        CategorySpend(
-            category=row.category, total_amount=float(row.total_amount or 0.0)
-        )
-        for row in results
+        CategorySpend(category=category, total_amount=total)
+        for category, total in results
     ]
 
 
@@ -103,51 +72,10 @@ def get_budget_alerts(
     Returns alerts for categories where:
     - Spent >= 80% of limit (warning)
     - Spent > limit (over budget)
-    """
-    # Get current month start
-    now = datetime.now()
-    month_start = datetime(now.year, now.month, 1)
-
-    # Get all budgets for user
-    budgets = db.query(Budget).filter(Budget.user_id == user_id).all()
-
-    alerts = []
-    for budget in budgets:
-        # Calculate spend for this month in this category
-        total_spent = (
-            db.query(func.sum(Transaction.amount))
-            .filter(
-                and_(
-                    Transaction.user_id == user_id,
-                    Transaction.category == budget.category,
-                    Transaction.transaction_date >= month_start,
-                    Transaction.transaction_date <= now,
-                )
-            )
-            .scalar()
-            or 0.0
-        )
-
-        percentage = (
-            (total_spent / budget.monthly_limit) * 100
-            if budget.monthly_limit > 0
-            else 0
-        )
-        over_by = total_spent - budget.monthly_limit
-
-        # Only include if over threshold or over budget
-        if percentage >= (alert_threshold * 100) or over_by > 0:
-            alerts.append(
-                BudgetAlert(
-                    category=budget.category,
-                    spent=float(total_spent),
-                    limit=float(budget.monthly_limit),
-                    percentage=float(percentage),
-                    over_by=float(over_by),
-                )
-            )
 
-    return alerts
+    All budgets are evaluated in a single grouped query.
+    """
+    return evaluate_budgets(db, user_id, alert_threshold=alert_threshold)
 
 
 def get_current_month_spend(db: Session, user_id: uuid.UUID) -> float:
@@ -168,3 +96,83 @@ def get_current_month_spend(db: Session, user_id: uuid.UUID) -> float:
     )
 
     return float(result or 0.0)
+
+
+def get_dashboard(
+    db: Session,
+    user_id: uuid.UUID,
+    months: int = 12,
+    alert_threshold: float = 0.8,
+) -> DashboardSummary:
+    """
+    Get everything the dashboard shows in one query.
+
+    A single scan aggregates the window by (month, category); the user's
+    budgets ride along in the same round-trip via UNION ALL. Monthly and
+    category totals, the current month's spend and budget alerts are all
+    derived from those rows, so the current month is never rescanned.
+    """
+    end_date = datetime.now()
+    start_date = end_date - relativedelta(months=months)
+    month = func.date_trunc("month", Transaction.transaction_date)
+
+    totals = (
+        select(
+            month.label("month"),
+            Transaction.category,
+            func.sum(Transaction.amount).label("total_amount"),
+            null().label("monthly_limit"),
+        )
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.transaction_date >= start_date,
+            Transaction.transaction_date <= end_date,
+        )
+        .group_by(month, Transaction.category)
+    )
+    budgets = select(
+        null().label("month"),
+        Budget.category,
+        null().label("total_amount"),
+        Budget.monthly_limit,
+    ).where(Budget.user_id == user_id)
+    rows = db.execute(union_all(totals, budgets)).all()
+
+    current_key = end_date.strftime("%Y-%m")
+    by_month: Dict[str, float] = {}
+    by_category: Dict[str, float] = {}
+    current_by_category: Dict[str, float] = {}
+    limits: Dict[str, float] = {}
+    for row in rows:
+        if row.month is None:
+            limits[row.category] = float(row.monthly_limit)
+            continue
+        total = float(row.total_amount or 0.0)
+        key = row.month.strftime("%Y-%m")
+        by_month[key] = by_month.get(key, 0.0) + total
+        by_category[row.category] = by_category.get(row.category, 0.0) + total
+        if key == current_key:
+            current_by_category[row.category] = (
+                current_by_category.get(row.category, 0.0) + total
+            )
+
+    alerts = []
+    for category in sorted(limits):
+        spent = current_by_category.get(category, 0.0)
+        if is_alert(spent, limits[category], alert_threshold):
+            alerts.append(to_alert(category, limits[category], spent))
+
+    return DashboardSummary(
+        current_month_spend=sum(current_by_category.values()),
+        monthly_spend=[
+            MonthlySpendPoint(month=key, total_amount=total)
+            for key, total in sorted(by_month.items())
+        ],
+        category_breakdown=[
+            CategorySpend(category=category, total_amount=total)
+            for category, total in sorted(
+                by_category.items(), key=lambda item: item[1], reverse=True
+            )
+        ],
+        budget_alerts=alerts,
+    )
@@ -0,0 +1,111 @@
+"""In-process cache of verified access tokens to authenticated principals."""
+from sqlalchemy import event, inspect
+from app.models import User
+from app.config import settings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set, Tuple
+import threading
+import time
+import uuid
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, without loading the ORM `User`."""
+
+    id: uuid.UUID
+    email: str
+
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU map of token -> Principal.
+
+    An entry lives until the earlier of its TTL and the token's own expiry.
+    Entries are indexed by user so a password change or deletion can drop
+    every cached token for that user at once.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[uuid.UUID, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for a token, if present and fresh."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= self._clock():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_expires_at: float) -> None:
+        """Cache a principal for a verified token."""
+        if self.maxsize <= 0:
+            return
+        expires_at = min(self._clock() + self.ttl_seconds, token_expires_at)
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Drop every cached token belonging to a user."""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[0].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+# Invalidation is per process; in multi-worker deployments other workers
+# pick up a password change or deletion within AUTH_CACHE_TTL_SECONDS.
+@event.listens_for(User, "after_update")
+def _invalidate_on_password_change(mapper, connection, target: User) -> None:
+    if inspect(target).attrs.password_hash.history.has_changes():
+        principal_cache.invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,129 @@
+"""Set-based budget evaluation: spend versus limit for many budgets per query."""
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, literal, or_, select
+from app.models import Budget, Transaction, User
+from app.schemas import BudgetAlert
+from typing import Any, Iterator, List, Optional, Tuple
+from datetime import datetime
+import uuid
+
+# Users evaluated per query in the batch run
+DEFAULT_BATCH_USERS = 1000
+
+
+def _month_window(as_of: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Current calendar month up to `as_of` (default: now)."""
+    now = as_of or datetime.now()
+    return datetime(now.year, now.month, 1), now
+
+
+def _alerts_query(
+    where: List[Any], alert_threshold: float, month_start: datetime, now: datetime
+):
+    """
+    Build one grouped query evaluating every budget matched by `where`.
+
+    Budgets are LEFT JOINed to the month's transactions on
+    (user_id, category), which idx_transactions_user_category_date covers,
+    and only budgets at or over the threshold are returned.
+    """
+    spent = func.coalesce(func.sum(Transaction.amount), 0.0).label("spent")
+    # Same rule as before: percentage >= threshold, or any overspend.
+    # A zero limit has a percentage of 0.
+    near_limit = case(
+        (Budget.monthly_limit > 0, spent >= Budget.monthly_limit * alert_threshold),
+        else_=literal(alert_threshold <= 0),
+    )
+    return (
+        select(
+            Budget.user_id,
+            User.email,
+            Budget.category,
+            Budget.monthly_limit,
+            spent,
+        )
+        .join(User, User.id == Budget.user_id)
+        .outerjoin(
+            Transaction,
+            and_(
+                Transaction.user_id == Budget.user_id,
+                Transaction.category == Budget.category,
+                Transaction.transaction_date >= month_start,
+                Transaction.transaction_date <= now,
+            ),
+        )
+        .where(*where)
+        .group_by(Budget.id, User.email)
+        .having(or_(near_limit, spent > Budget.monthly_limit))
+        .order_by(Budget.user_id, Budget.category)
+    )
+
+
+def is_alert(spent: float, limit: float, alert_threshold: float) -> bool:
+    """The alert rule applied in SQL by `_alerts_query`, for in-memory totals."""
+    percentage = (spent / limit) * 100 if limit > 0 else 0
+    return percentage >= alert_threshold * 100 or spent > limit
+
+
+def to_alert(category: str, limit: float, spent: float) -> BudgetAlert:
+    """Build a BudgetAlert from a budget's limit and spend."""
+    percentage = (spent / limit) * 100 if limit > 0 else 0
+    return BudgetAlert(
+        category=category,
+        spent=float(spent),
+        limit=float(limit),
+        percentage=float(percentage),
+        over_by=float(spent - limit),
+    )
+
+
+def evaluate_budgets(
+    db: Session,
+    user_id: uuid.UUID,
+    alert_threshold: float = 0.8,
+    as_of: Optional[datetime] = None,
+) -> List[BudgetAlert]:
+    """Evaluate all of a user's budgets for the current month in one query."""
+    month_start, now = _month_window(as_of)
+    rows = db.execute(
+        _alerts_query(
+            [Budget.user_id == user_id], alert_threshold, month_start, now
+        )
+    )
+    return [to_alert(row.category, row.monthly_limit, row.spent) for row in rows]
+
+
+def iter_all_budget_alerts(
+    db: Session,
+    alert_threshold: float = 0.8,
+    batch_users: int = DEFAULT_BATCH_USERS,
+    as_of: Optional[datetime] = None,
+) -> Iterator[Tuple[uuid.UUID, str, BudgetAlert]]:
+    """
+    Stream (user_id, email, alert) for every user's budgets.
+
+    Users are walked in keyset order over budgets.user_id: each step finds
+    the id `batch_users` users ahead, then evaluates that whole id range
+    with a single grouped query. Memory stays bounded by one batch.
+    """
+    month_start, now = _month_window(as_of)
+    after: Optional[uuid.UUID] = None
+
+    while True:
+        users = select(Budget.user_id).distinct().order_by(Budget.user_id)
+        if after is not None:
+            users = users.where(Budget.user_id > after)
+        batch_ids = users.limit(batch_users).subquery()
+        upper = db.execute(select(func.max(batch_ids.c.user_id))).scalar()
+        if upper is None:
+            return
+
+        where = [Budget.user_id <= upper]
+        if after is not None:
+            where.append(Budget.user_id > after)
+        rows = db.execute(_alerts_query(where, alert_threshold, month_start, now))
+        for row in rows:
+            yield row.user_id, row.email, to_alert(
+                row.category, row.monthly_limit, row.spent
+            )
+        after = upper
@@ -0,0 +1,245 @@
+"""Export service for streaming bulk transaction and receipt exports."""
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from app.models import Transaction, Receipt
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Sequence
+from datetime import date, datetime
+import csv
+import importlib.util
+import io
+import json
+import uuid
+import zlib
+
+# Parquet export is optional and only available when pyarrow is installed.
+# pyarrow is imported on the first Parquet export, not at start-up.
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows fetched per round-trip from the server-side cursor. Each batch is
+# serialized and flushed to the client before the next one is fetched,
+# so memory stays constant no matter how many rows a user has.
+EXPORT_BATCH_SIZE = 2000
+
+TRANSACTION_EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.receipt_id,
+    Transaction.amount,
+    Transaction.category,
+    Transaction.description,
+    Transaction.transaction_date,
+    Transaction.is_recurring,
+    Transaction.created_at,
+)
+
+RECEIPT_EXPORT_COLUMNS = (
+    Receipt.id,
+    Receipt.vendor,
+    Receipt.purchase_date,
+    Receipt.total_amount,
+    Receipt.tax_amount,
+    Receipt.currency,
+    Receipt.category,
+    Receipt.image_path,
+    Receipt.raw_ocr_text,
+    Receipt.created_at,
+)
+
+
+def _fetch_batches(
+    db: Session, columns: Sequence[Any], where: List[Any], order_by: Any
+) -> Iterator[Sequence[tuple]]:
+    """
+    Yield plain row tuples in batches from a server-side cursor.
+
+    Selecting columns (rather than entities) skips ORM hydration and the
+    identity map entirely; `yield_per` streams results instead of
+    buffering the full result set client-side.
+    """
+    stmt = (
+        select(*columns)
+        .where(*where)
+        .order_by(order_by)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    result = db.execute(stmt)
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def transaction_batches(
+    db: Session,
+    user_id: uuid.UUID,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    category: Optional[str] = None,
+) -> Iterator[Sequence[tuple]]:
+    """Stream a user's transactions as row tuples, oldest first."""
+    where = [Transaction.user_id == user_id]
+    if start_date:
+        where.append(Transaction.transaction_date >= start_date)
+    if end_date:
+        where.append(Transaction.transaction_date <= end_date)
+    if category:
+        where.append(Transaction.category == category)
+    return _fetch_batches(
+        db, TRANSACTION_EXPORT_COLUMNS, where, Transaction.transaction_date
+    )
+
+
+def receipt_batches(
+    db: Session,
+    user_id: uuid.UUID,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Iterator[Sequence[tuple]]:
+    """Stream a user's receipts as row tuples, oldest first."""
+    where = [Receipt.user_id == user_id]
+    if start_date:
+        where.append(Receipt.purchase_date >= start_date)
+    if end_date:
+        where.append(Receipt.purchase_date <= end_date)
+    return _fetch_batches(db, RECEIPT_EXPORT_COLUMNS, where, Receipt.purchase_date)
+
+
+def column_names(columns: Sequence[Any]) -> List[str]:
+    """Get the output field names for a column tuple."""
+    return [column.key for column in columns]
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the stdlib JSON encoder does not handle."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    """Format a value for CSV output."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def serialize_csv(
+    names: List[str], batches: Iterable[Sequence[tuple]]
+) -> Iterator[bytes]:
+    """Serialize row batches as CSV, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue().encode()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(v) for v in row] for row in batch)
+        yield buffer.getvalue().encode()
+
+
+def serialize_ndjson(
+    names: List[str], batches: Iterable[Sequence[tuple]]
+) -> Iterator[bytes]:
+    """Serialize row batches as newline-delimited JSON, one chunk per batch."""
+    encoder = json.JSONEncoder(default=_json_default, separators=(",", ":"))
+    for batch in batches:
+        lines = [encoder.encode(dict(zip(names, row))) for row in batch]
+        lines.append("")
+        yield "\n".join(lines).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that collects bytes until they are drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema(names: List[str]) -> "pa.Schema":
+    """Build an explicit Parquet schema so all-null batches keep stable types."""
+    import pyarrow as pa
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    types = {
+        "amount": pa.float64(),
+        "total_amount": pa.float64(),
+        "tax_amount": pa.float64(),
+        "is_recurring": pa.bool_(),
+        "transaction_date": timestamp,
+        "purchase_date": timestamp,
+        "created_at": timestamp,
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in names])
+
+
+def serialize_parquet(
+    names: List[str], batches: Iterable[Sequence[tuple]]
+) -> Iterator[bytes]:
+    """Serialize row batches as a Parquet file, one row group per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(names)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for batch in batches:
+        columns = list(zip(*batch))
+        arrays = [
+            pa.array(
+                [str(v) if isinstance(v, uuid.UUID) else v for v in values],
+                type=field.type,
+            )
+            for field, values in zip(schema, columns)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+SERIALIZERS = {
+    "csv": serialize_csv,
+    "ndjson": serialize_ndjson,
+    "parquet": serialize_parquet,
+}
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip a byte stream incrementally.
+
+    Each chunk is sync-flushed so the client receives data as soon as a
+    batch is serialized instead of waiting for the compressor to fill up.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,314 @@
+"""Vectorized spend forecasting and anomaly detection over transaction history."""
+from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, Float, Text, cast, func, literal, select
+from numpy.lib.stride_tricks import sliding_window_view
+from app.models import Budget, Transaction
+from app.schemas import CategoryForecast, SpendAnomaly, SpendForecast
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from dateutil.relativedelta import relativedelta
+from typing import List, Optional
+import numpy as np
+import uuid
+
+SECONDS_PER_DAY = 86400.0
+
+# Full months of history behind the forecast's baseline
+DEFAULT_BASELINE_MONTHS = 6
+
+# Anomalies: a transaction is compared with the previous ANOMALY_WINDOW
+# transactions in its category; at least MIN_HISTORY of them are needed.
+ANOMALY_WINDOW = 50
+MIN_HISTORY = 8
+DEFAULT_ANOMALY_THRESHOLD = 3.5  # Modified z-score (Iglewicz & Hoaglin)
+HISTORY_YEARS = 5
+
+
+@dataclass
+class SpendHistory:
+    """A user's transactions as parallel NumPy arrays."""
+
+    ids: np.ndarray  # object (str)
+    dates: np.ndarray  # int64 epoch seconds
+    amounts: np.ndarray  # float64
+    codes: np.ndarray  # int64 index into `categories`
+    categories: np.ndarray  # str, sorted
+    end: int  # epoch seconds of the `end` boundary, as Postgres read it
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+
+def _epoch(value: datetime):
+    """Epoch seconds of a naive boundary, interpreted by Postgres like other filters."""
+    as_timestamptz = cast(literal(value), DateTime(timezone=True))
+    return cast(func.extract("epoch", as_timestamptz), Float)
+
+
+def fetch_history(
+    db: Session, user_id: uuid.UUID, start: datetime, end: datetime
+) -> SpendHistory:
+    """
+    Load a user's transactions in [start, end] as compact arrays.
+
+    Each column is aggregated into one Postgres array, so the whole
+    history arrives as a single row instead of one Python tuple per
+    transaction.
+    """
+    row = db.execute(
+        select(
+            func.array_agg(cast(Transaction.id, Text)),
+            func.array_agg(
+                cast(func.extract("epoch", Transaction.transaction_date), Float)
+            ),
+            func.array_agg(Transaction.amount),
+            func.array_agg(Transaction.category),
+            _epoch(end),
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.transaction_date >= start,
+            Transaction.transaction_date <= end,
+        )
+    ).one()
+    ids, dates, amounts, categories, end_epoch = row
+
+    categories, codes = np.unique(
+        np.asarray(categories or [], dtype=str), return_inverse=True
+    )
+    return SpendHistory(
+        ids=np.asarray(ids or [], dtype=object),
+        dates=np.asarray(dates or [], dtype=np.float64).astype(np.int64),
+        amounts=np.asarray(amounts or [], dtype=np.float64),
+        codes=codes.astype(np.int64),
+        categories=categories,
+        end=int(end_epoch),
+    )
+
+
+def project_month_end(
+    spent_to_date: np.ndarray,
+    baseline_monthly: np.ndarray,
+    days_elapsed: float,
+    days_in_month: int,
+) -> np.ndarray:
+    """
+    Project end-of-month spend per category.
+
+    The remaining spend is a blend of the current run rate and the
+    historical monthly baseline, weighted by how much of the month has
+    elapsed: early in the month the baseline dominates, late in the month
+    the run rate does.
+    """
+    elapsed_fraction = min(max(days_elapsed / days_in_month, 0.0), 1.0)
+    remaining_days = days_in_month - days_elapsed
+    run_rate_remaining = spent_to_date / max(days_elapsed, 1.0) * remaining_days
+    baseline_remaining = baseline_monthly * (1.0 - elapsed_fraction)
+    remaining = (
+        elapsed_fraction * run_rate_remaining
+        + (1.0 - elapsed_fraction) * baseline_remaining
+    )
+    return spent_to_date + np.maximum(remaining, 0.0)
+
+
+def get_forecast(
+    db: Session,
+    user_id: uuid.UUID,
+    baseline_months: int = DEFAULT_BASELINE_MONTHS,
+    as_of: Optional[datetime] = None,
+) -> SpendForecast:
+    """Project this month's end-of-month spend per category."""
+    now = as_of or datetime.now()
+    month_start = datetime(now.year, now.month, 1)
+    next_month = month_start + relativedelta(months=1)
+    baseline_start = month_start - relativedelta(months=baseline_months)
+
+    history = fetch_history(db, user_id, baseline_start, now)
+    month_start_epoch = history.end - int(
+        (now - month_start).total_seconds()
+    )
+    days_in_month = (next_month - month_start).days
+    days_elapsed = (now - month_start).total_seconds() / SECONDS_PER_DAY
+    n_categories = len(history.categories)
+
+    current = history.dates >= month_start_epoch
+    spent_to_date = np.bincount(
+        history.codes[current],
+        weights=history.amounts[current],
+        minlength=n_categories,
+    )
+    baseline_monthly = (
+        np.bincount(
+            history.codes[~current],
+            weights=history.amounts[~current],
+            minlength=n_categories,
+        )
+        / baseline_months
+    )
+    projected = project_month_end(
+        spent_to_date, baseline_monthly, days_elapsed, days_in_month
+    )
+
+    limits = dict(
+        db.query(Budget.category, Budget.monthly_limit).filter(
+            Budget.user_id == user_id
+        )
+    )
+    order = np.argsort(-projected, kind="stable")
+    categories = [
+        CategoryForecast(
+            category=str(history.categories[i]),
+            spent_to_date=float(spent_to_date[i]),
+            projected_total=float(projected[i]),
+            baseline_monthly=float(baseline_monthly[i]),
+            monthly_limit=limits.get(str(history.categories[i])),
+            projected_over_budget=(
+                str(history.categories[i]) in limits
+                and float(projected[i]) > limits[str(history.categories[i])]
+            ),
+        )
+        for i in order
+    ]
+    return SpendForecast(
+        month=month_start.strftime("%Y-%m"),
+        days_elapsed=round(days_elapsed, 2),
+        days_in_month=days_in_month,
+        spent_to_date=float(spent_to_date.sum()),
+        projected_total=float(projected.sum()),
+        categories=categories,
+    )
+
+
+def _row_medians(rows: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Median of the non-NaN values in each row, `counts[i]` of them in row i.
+
+    Sorting pushes NaNs to the end of each row, so the median sits at a
+    known index. This avoids np.nanmedian, which falls back to a Python
+    loop over rows whenever NaNs are present.
+    """
+    ordered = np.sort(rows, axis=1)
+    idx = np.arange(len(rows))
+    low = ordered[idx, np.maximum(counts - 1, 0) // 2]
+    high = ordered[idx, np.minimum(counts // 2, rows.shape[1] - 1)]
+    return np.where(counts > 0, (low + high) / 2.0, np.nan)
+
+
+def rolling_robust_scores(
+    amounts: np.ndarray,
+    window: int = ANOMALY_WINDOW,
+    min_history: int = MIN_HISTORY,
+    first: int = 0,
+):
+    """
+    Modified z-scores of each amount against the preceding `window` amounts.
+
+    Uses the median and median absolute deviation (MAD) of the prior
+    values, which a single huge outlier cannot drag around the way it
+    would a mean and standard deviation. Only amounts from index `first`
+    on are scored (earlier ones still serve as history). Returns
+    (scores, medians) for those amounts; scores are NaN where fewer than
+    `min_history` prior values exist.
+    """
+    n = len(amounts)
+    if n <= first:
+        return np.empty(0), np.empty(0)
+    # windows[i] holds the `window` values before amounts[first + i], NaN-padded
+    padded = np.concatenate([np.full(window, np.nan), amounts[:-1]])
+    windows = sliding_window_view(padded, window)[first:]
+    counts = np.minimum(np.arange(first, n), window)
+    amounts = amounts[first:]
+    medians = _row_medians(windows, counts)
+    mad = _row_medians(np.abs(windows - medians[:, None]), counts)
+    deviation = amounts - medians
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(
+            mad > 0,
+            0.6745 * deviation / mad,
+            # Identical history: any increase is maximally unusual
+            np.where(deviation > 0, np.inf, 0.0),
+        )
+    scores = np.where(counts >= min_history, scores, np.nan)
+    return scores, medians
+
+
+def score_by_category(
+    codes: np.ndarray, amounts: np.ndarray, targets: Optional[np.ndarray] = None
+):
+    """
+    Rolling robust scores within each category.
+
+    `codes` must be grouped (e.g. lexsorted by category, then date); each
+    contiguous run of a code is scored independently. With a boolean
+    `targets` mask that is a suffix of each run (e.g. "in the last N
+    days"), only those rows are scored and the rest are left NaN.
+    """
+    scores = np.full(len(amounts), np.nan)
+    medians = np.full(len(amounts), np.nan)
+    if targets is None:
+        targets = np.ones(len(amounts), dtype=bool)
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(codes)]])
+    for start, end in zip(starts, ends):
+        wanted = np.flatnonzero(targets[start:end])
+        if len(wanted) == 0:
+            continue
+        first = start + wanted[0]
+        scores[first:end], medians[first:end] = rolling_robust_scores(
+            amounts[start:end], first=wanted[0]
+        )
+    return scores, medians
+
+
+def get_anomalies(
+    db: Session,
+    user_id: uuid.UUID,
+    days: int = 90,
+    threshold: float = DEFAULT_ANOMALY_THRESHOLD,
+    as_of: Optional[datetime] = None,
+) -> List[SpendAnomaly]:
+    """
+    Flag unusually large transactions from the last `days` days.
+
+    Each recent transaction is scored against the ones before it in the
+    same category, drawn from up to HISTORY_YEARS of history. The arrays
+    are sorted once by (category, date) and scored one category slice at
+    a time.
+    """
+    now = as_of or datetime.now()
+    history = fetch_history(
+        db, user_id, now - relativedelta(years=HISTORY_YEARS), now
+    )
+    if len(history) == 0:
+        return []
+
+    order = np.lexsort((history.dates, history.codes))
+    codes = history.codes[order]
+    dates = history.dates[order]
+    amounts = history.amounts[order]
+    recent = dates >= history.end - days * SECONDS_PER_DAY
+    scores, medians = score_by_category(codes, amounts, recent)
+    flagged = np.flatnonzero(np.nan_to_num(scores) > threshold)
+    if len(flagged) == 0:
+        return []
+
+    flagged_ids = [uuid.UUID(i) for i in history.ids[order][flagged]]
+    descriptions = dict(
+        db.query(Transaction.id, Transaction.description).filter(
+            Transaction.id.in_(flagged_ids)
+        )
+    )
+    anomalies = [
+        SpendAnomaly(
+            transaction_id=transaction_id,
+            transaction_date=datetime.fromtimestamp(int(dates[i]), tz=timezone.utc),
+            amount=float(amounts[i]),
+            category=str(history.categories[codes[i]]),
+            description=descriptions.get(transaction_id),
+            typical_amount=float(medians[i]),
+            score=float(min(scores[i], 1e6)),
+        )
+        for transaction_id, i in zip(flagged_ids, flagged)
+    ]
+    anomalies.sort(key=lambda anomaly: anomaly.transaction_date, reverse=True)
+    return anomalies
@@ -0,0 +1,234 @@
+"""Idempotency-Key support for retried write requests."""
+from fastapi import HTTPException, Response, status
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from app.database import SessionLocal
+from app.models import IdempotencyKey
+from app.config import settings
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+# Expired keys are deleted opportunistically, at most this often per process
+PURGE_INTERVAL_SECONDS = 300
+PURGE_BATCH_SIZE = 1000
+
+# Polling backoff while a request in another worker holds the key
+POLL_INITIAL_SECONDS = 0.05
+POLL_MAX_SECONDS = 1.0
+
+# Requests in flight in this process, so same-process duplicates are woken
+# as soon as the original finishes instead of waiting for the next poll.
+_inflight: Dict[Tuple[uuid.UUID, str], asyncio.Event] = {}
+_last_purge = 0.0
+
+
+@dataclass
+class StoredResponse:
+    """A completed response saved under an idempotency key."""
+
+    status_code: int
+    body: str
+
+    def to_response(self) -> Response:
+        """Build the replayed HTTP response."""
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+def request_fingerprint(*parts: bytes) -> str:
+    """Hash the request payload so a reused key with a different body is caught."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def _claim(user_id: uuid.UUID, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+    """
+    Try to claim a key in its own committed transaction.
+
+    Returns None when the key was claimed (new, or expired and taken over),
+    otherwise the existing record. The claim is a short lease; `complete`
+    extends it to the replay window, so a key whose worker died before
+    finishing can be taken over once the lease runs out.
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    stmt = insert(IdempotencyKey).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        status=IN_PROGRESS,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status": IN_PROGRESS,
+            "response_status": None,
+            "response_body": None,
+            "created_at": func.now(),
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at < func.now(),
+    ).returning(IdempotencyKey.id)
+
+    with SessionLocal() as db:
+        claimed = db.execute(stmt).scalar()
+        db.commit()
+        if claimed is not None:
+            return None
+        return db.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+            )
+        ).scalar_one_or_none()
+
+
+def _maybe_purge() -> None:
+    """Delete a batch of expired keys if the purge interval has elapsed."""
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = now
+    try:
+        with SessionLocal() as db:
+            purge_expired(db)
+            db.commit()
+    except Exception:
+        logger.warning("Idempotency key purge failed", exc_info=True)
+
+
+def purge_expired(db: Session, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete up to `batch_size` expired idempotency keys."""
+    expired = (
+        select(IdempotencyKey.id)
+        .where(IdempotencyKey.expires_at < func.now())
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired)))
+    return result.rowcount
+
+
+async def begin(
+    user_id: uuid.UUID, key: str, request_hash: str
+) -> Optional[StoredResponse]:
+    """
+    Claim an idempotency key before doing any work.
+
+    Returns None when the caller owns the key and should process the
+    request, or the stored response when it already completed. A
+    duplicate that arrives while the original is still running waits for
+    its result instead of racing it.
+    """
+    # Claims and purges are blocking round-trips; keep them off the event loop
+    await run_in_threadpool(_maybe_purge)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = POLL_INITIAL_SECONDS
+
+    while True:
+        existing = await run_in_threadpool(_claim, user_id, key, request_hash)
+        if existing is None:
+            _inflight[(user_id, key)] = asyncio.Event()
+            return None
+
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if existing.status == COMPLETED:
+            return StoredResponse(existing.response_status, existing.response_body)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        event = _inflight.get((user_id, key))
+        if event is not None:
+            # Same process: wake up as soon as the original finishes
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+
+
+def complete(
+    db: Session, user_id: uuid.UUID, key: str, status_code: int, body: str
+) -> None:
+    """
+    Store the response for a claimed key.
+
+    Runs in the request's own session so the stored response commits
+    atomically with the rows it describes. The record is then kept for
+    the full replay window instead of the in-progress lease.
+    """
+    expires_at = datetime.now(timezone.utc) + timedelta(
+        seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS
+    )
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+    ).update(
+        {
+            "status": COMPLETED,
+            "response_status": status_code,
+            "response_body": body,
+            "expires_at": expires_at,
+        },
+        synchronize_session=False,
+    )
+
+
+def _delete_claim(user_id: uuid.UUID, key: str) -> None:
+    """Delete an unfinished claim in its own committed transaction."""
+    with SessionLocal() as db:
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == IN_PROGRESS,
+            )
+        )
+        db.commit()
+
+
+async def release(user_id: uuid.UUID, key: str, failed: bool) -> None:
+    """
+    Finish a claimed key and wake same-process waiters.
+
+    On failure the claim is deleted so a retry can run the request again.
+    """
+    event = _inflight.pop((user_id, key), None)
+    try:
+        if failed:
+            # Failures often mean a slow database; keep the delete off the loop
+            await run_in_threadpool(_delete_claim, user_id, key)
+    finally:
+        if event is not None:
+            event.set()
@@ -0,0 +1,361 @@
+"""Bulk transaction import from bank export files (CSV, OFX, QIF)."""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from pydantic import TypeAdapter, ValidationError
+from dateutil import parser as date_parser
+from app.models import Transaction
+from app.schemas import TransactionCreate, TransactionImportResult, ImportRowError
+from app.services.analytics_cache import mark_analytics_dirty
+from app.services.sketch_service import record_transactions
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+from datetime import datetime
+import csv
+import re
+import uuid
+
+IMPORT_FORMATS = ("csv", "ofx", "qif")
+
+# How a file signs money going out. OFX and QIF always use negative
+# amounts for debits; CSV exports vary, so the caller says which applies.
+FORMAT_EXPENSE_SIGNS = {"ofx": "negative", "qif": "negative"}
+
+# OFX transaction types that bring money in, whatever the amount's sign
+OFX_CREDIT_TYPES = {"CREDIT", "DEP", "DIRECTDEP", "INT", "DIV"}
+
+# Rows are validated and inserted in chunks so memory stays bounded
+# regardless of the size of the uploaded file.
+DEFAULT_CHUNK_SIZE = 1000
+
+# Cap the error report so a completely malformed file cannot blow up the response.
+MAX_REPORTED_ERRORS = 1000
+
+_transaction_batch = TypeAdapter(List[TransactionCreate])
+
+# Header aliases seen in common bank CSV exports, mapped to our field names.
+CSV_HEADER_ALIASES = {
+    "transaction_date": "date",
+    "transaction date": "date",
+    "date": "date",
+    "posted date": "date",
+    "posting date": "date",
+    "amount": "amount",
+    "category": "category",
+    "description": "description",
+    "memo": "description",
+    "payee": "description",
+    "name": "description",
+    "is_recurring": "is_recurring",
+    "recurring": "is_recurring",
+}
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+_AMOUNT_CLEANUP = re.compile(r"[^\d.\-]")
+
+RawRow = Tuple[int, Dict[str, str]]
+
+
+class CreditRow(ValueError):
+    """A deposit, refund or reversal; only expenses are imported."""
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Infer the import format from a file extension."""
+    if not filename or "." not in filename:
+        return None
+    ext = filename.rsplit(".", 1)[1].lower()
+    if ext == "qfx":
+        return "ofx"
+    return ext if ext in IMPORT_FORMATS else None
+
+
+def parse_csv(stream: TextIO) -> Iterator[RawRow]:
+    """
+    Stream rows from a CSV export.
+
+    Headers are matched case-insensitively against CSV_HEADER_ALIASES;
+    unknown columns are ignored. Row numbers are 1-based data rows.
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [CSV_HEADER_ALIASES.get(h.strip().lower()) for h in header]
+
+    for row_number, values in enumerate(reader, start=1):
+        if not any(v.strip() for v in values):
+            continue
+        raw = {}
+        for column, value in zip(columns, values):
+            if column and column not in raw:
+                raw[column] = value.strip()
+        yield row_number, raw
+
+
+def parse_ofx(stream: TextIO) -> Iterator[RawRow]:
+    """
+    Stream <STMTTRN> records from an OFX/QFX file.
+
+    Handles both SGML-style (unclosed tags) and XML-style OFX.
+    """
+    row_number = 0
+    current: Optional[Dict[str, str]] = None
+
+    for line in stream:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing:
+                    if current is not None:
+                        row_number += 1
+                        yield row_number, _ofx_to_raw(current)
+                    current = None
+                else:
+                    current = {}
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+
+def _ofx_to_raw(fields: Dict[str, str]) -> Dict[str, str]:
+    """Map OFX transaction tags to our raw field names."""
+    posted = fields.get("DTPOSTED", "")
+    # OFX dates look like 20240115 or 20240115120000.000[-5:EST]
+    digits = re.match(r"\d{8}(\d{6})?", posted)
+    description = fields.get("NAME") or fields.get("MEMO") or ""
+    if fields.get("NAME") and fields.get("MEMO"):
+        description = f"{fields['NAME']} {fields['MEMO']}"
+    return {
+        "date": digits.group(0) if digits else posted,
+        "amount": fields.get("TRNAMT", ""),
+        "description": description,
+        "type": fields.get("TRNTYPE", "").upper(),
+    }
+
+
+def parse_qif(stream: TextIO) -> Iterator[RawRow]:
+    """Stream records from a Quicken Interchange Format (QIF) file."""
+    row_number = 0
+    current: Dict[str, str] = {}
+
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if current:
+                row_number += 1
+                yield row_number, current
+            current = {}
+        elif code == "D":
+            current["date"] = value.replace("'", "/")
+        elif code in ("T", "U"):
+            current.setdefault("amount", value)
+        elif code == "P":
+            current["description"] = value
+        elif code == "M":
+            current.setdefault("description", value)
+        elif code == "L" and not value.startswith("["):
+            # "[Account]" entries are transfers, not categories
+            current["category"] = value.split(":", 1)[0]
+
+    if current:
+        row_number += 1
+        yield row_number, current
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+    "qif": parse_qif,
+}
+
+
+def _parse_amount(value: str) -> float:
+    """Parse a signed bank-formatted amount such as "-$1,234.50" or "(12.00)"."""
+    cleaned = _AMOUNT_CLEANUP.sub("", value)
+    try:
+        amount = float(cleaned)
+    except ValueError:
+        raise ValueError(f"invalid amount: {value!r}")
+    stripped = value.strip()
+    if stripped.startswith("(") and stripped.endswith(")"):
+        amount = -abs(amount)  # Accounting notation for negatives
+    return amount
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse a transaction date in any of the formats banks commonly export."""
+    value = value.strip()
+    if not value:
+        raise ValueError("missing date")
+    if re.fullmatch(r"\d{8}(\d{6})?", value):
+        fmt = "%Y%m%d%H%M%S" if len(value) == 14 else "%Y%m%d"
+        return datetime.strptime(value, fmt)
+    return date_parser.parse(value)
+
+
+def normalize_row(
+    raw: Dict[str, str], default_category: str, expense_sign: str = "negative"
+) -> Dict[str, Any]:
+    """
+    Convert raw parsed fields into TransactionCreate input.
+
+    `expense_sign` is how the file signs expenses. Rows with the opposite
+    sign (and OFX credit types) raise CreditRow rather than being stored
+    as spending.
+    """
+    if raw.get("type") in OFX_CREDIT_TYPES:
+        raise CreditRow(
+            f"{raw['type']} transaction skipped; only expenses are imported"
+        )
+    amount = _parse_amount(raw.get("amount", ""))
+    if expense_sign == "negative":
+        amount = -amount
+    if amount < 0:
+        raise CreditRow(
+            f"credit of {abs(amount):.2f} skipped; only expenses are imported"
+        )
+    description = raw.get("description")
+    return {
+        "amount": amount,
+        "category": (raw.get("category") or default_category).lower()[:100],
+        "description": description[:512] if description else None,
+        "transaction_date": _parse_date(raw.get("date", "")),
+        "is_recurring": raw.get("is_recurring", "").lower() in ("1", "true", "yes"),
+    }
+
+
+def _validate_chunk(
+    chunk: List[Tuple[int, Dict[str, Any]]],
+) -> Tuple[List[Tuple[int, TransactionCreate]], List[ImportRowError]]:
+    """
+    Validate a chunk of rows against TransactionCreate in a single call.
+
+    On failure the offending rows are dropped and the remainder is
+    re-validated, so a chunk costs at most two validation passes.
+    """
+    errors: List[ImportRowError] = []
+    try:
+        models = _transaction_batch.validate_python([data for _, data in chunk])
+        return [(row, m) for (row, _), m in zip(chunk, models)], errors
+    except ValidationError as exc:
+        bad: Dict[int, str] = {}
+        for error in exc.errors():
+            index, *field = error["loc"]
+            message = error["msg"]
+            if field:
+                message = f"{field[0]}: {message}"
+            bad.setdefault(index, message)
+        for index, message in bad.items():
+            errors.append(ImportRowError(row=chunk[index][0], message=message))
+        remaining = [item for i, item in enumerate(chunk) if i not in bad]
+        if not remaining:
+            return [], errors
+        models = _transaction_batch.validate_python([data for _, data in remaining])
+        return [(row, m) for (row, _), m in zip(remaining, models)], errors
+
+
+def _insert_chunk(
+    db: Session, user_id: uuid.UUID, rows: List[Tuple[int, TransactionCreate]]
+) -> int:
+    """Insert a validated chunk with a single multi-row INSERT and commit it."""
+    if not rows:
+        return 0
+    db.execute(
+        insert(Transaction),
+        [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "receipt_id": None,
+                "amount": t.amount,
+                "category": t.category,
+                "description": t.description,
+                "transaction_date": t.transaction_date,
+                "is_recurring": t.is_recurring,
+            }
+            for _, t in rows
+        ],
+    )
+    # Bulk INSERT bypasses the unit of work, so flag the write explicitly
+    mark_analytics_dirty(db, user_id)
+    record_transactions(
+        db, user_id, ((t.transaction_date, t.amount) for _, t in rows)
+    )
+    db.commit()
+    return len(rows)
+
+
+def import_transactions(
+    db: Session,
+    user_id: uuid.UUID,
+    stream: TextIO,
+    file_format: str,
+    default_category: str = "other",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    expense_sign: str = "negative",
+) -> TransactionImportResult:
+    """
+    Import transactions from a bank export stream.
+
+    The file is parsed lazily, validated and inserted chunk by chunk, and
+    each chunk is committed on its own so a 100k-row import never holds
+    more than `chunk_size` rows in memory. Rows that fail to parse or
+    validate are reported as failed, and credits (refunds, deposits,
+    reversals) as skipped, each with their row number. `expense_sign`
+    applies to CSV only; OFX and QIF always sign expenses negative.
+    """
+    parser = PARSERS[file_format]
+    expense_sign = FORMAT_EXPENSE_SIGNS.get(file_format, expense_sign)
+    total_rows = 0
+    imported = 0
+    failed = 0
+    skipped = 0
+    errors: List[ImportRowError] = []
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+
+    def report(new_errors: List[ImportRowError]) -> None:
+        room = MAX_REPORTED_ERRORS - len(errors)
+        if room > 0:
+            errors.extend(new_errors[:room])
+
+    def record(new_errors: List[ImportRowError]) -> None:
+        nonlocal failed
+        failed += len(new_errors)
+        report(new_errors)
+
+    def flush() -> None:
+        nonlocal imported
+        valid, chunk_errors = _validate_chunk(chunk)
+        record(chunk_errors)
+        imported += _insert_chunk(db, user_id, valid)
+        chunk.clear()
+
+    for row_number, raw in parser(stream):
+        total_rows += 1
+        try:
+            chunk.append(
+                (row_number, normalize_row(raw, default_category, expense_sign))
+            )
+        except CreditRow as e:
+            skipped += 1
+            report([ImportRowError(row=row_number, message=str(e))])
+            continue
+        except (ValueError, OverflowError) as e:
+            record([ImportRowError(row=row_number, message=str(e))])
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+
+    return TransactionImportResult(
+        format=file_format,
+        total_rows=total_rows,
+        imported=imported,
+        failed=failed,
+        skipped=skipped,
+        errors=errors,
+        errors_truncated=failed + skipped > len(errors),
+    )
@@ -0,0 +1,38 @@
+"""Projection helpers for selecting a subset of columns on list endpoints."""
+from fastapi import HTTPException, status
+from typing import Any, Iterable, List, Optional
+
+
+def parse_fields(
+    fields: Optional[str], model: Any, allowed: Iterable[str]
+) -> Optional[List[Any]]:
+    """
+    Turn a `fields=a,b,c` query value into mapped columns to SELECT.
+
+    The primary key is always included so clients can address rows.
+    Returns None when no field selection was requested.
+    """
+    if not fields:
+        return None
+
+    allowed = set(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+
+    names = ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+    return [getattr(model, name) for name in names]
+
+
+def schema_columns(model: Any, schema: Any) -> List[Any]:
+    """
+    Mapped columns for every field of a response schema.
+
+    Selecting these instead of the entity returns plain rows, skipping
+    ORM object construction and identity-map bookkeeping on read paths.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
@@ -0,0 +1,265 @@
+"""Recurring-transaction detection, incremental per insert with a batch backfill."""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from dateutil.relativedelta import relativedelta
+from app.models import RecurringSeries, Transaction
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+import re
+import uuid
+
+# Cadence name -> (min days, max days, step to the next occurrence)
+CADENCES = {
+    "weekly": (6, 8, relativedelta(weeks=1)),
+    "monthly": (26, 35, relativedelta(months=1)),
+    "annual": (355, 375, relativedelta(years=1)),
+}
+
+# Amounts within this fraction of the series' mean (or AMOUNT_TOLERANCE_MIN,
+# whichever is larger) count as the same charge
+AMOUNT_TOLERANCE_PCT = 0.10
+AMOUNT_TOLERANCE_MIN = 1.0
+
+# Consecutive on-cadence intervals before a series is marked recurring
+# (2 intervals = 3 occurrences)
+MIN_CADENCE_STREAK = 2
+
+# Words that vary between charges from the same merchant
+_NOISE_WORDS = {"pos", "debit", "credit", "card", "purchase", "payment", "ach", "ref"}
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+
+def normalize_merchant(description: Optional[str]) -> str:
+    """Grouping key for a description: lowercase letters only, noise words removed."""
+    if not description:
+        return ""
+    words = _NON_LETTERS.sub(" ", description.lower()).split()
+    return " ".join(w for w in words if w not in _NOISE_WORDS and len(w) > 1)[:128]
+
+
+def classify_interval(days: float) -> Optional[str]:
+    """Cadence whose interval range contains `days`, if any."""
+    for name, (low, high, _) in CADENCES.items():
+        if low <= days <= high:
+            return name
+    return None
+
+
+def amount_matches(series_amount: float, amount: float) -> bool:
+    """Whether `amount` is close enough to a series' mean amount."""
+    tolerance = max(abs(series_amount) * AMOUNT_TOLERANCE_PCT, AMOUNT_TOLERANCE_MIN)
+    return abs(amount - series_amount) <= tolerance
+
+
+def _aware(value: datetime) -> datetime:
+    # Naive datetimes are stored as UTC, so compare them as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _pick_series(
+    candidates: List[RecurringSeries], amount: float
+) -> Optional[RecurringSeries]:
+    matches = [s for s in candidates if amount_matches(s.amount, amount)]
+    return min(matches, key=lambda s: abs(s.amount - amount), default=None)
+
+
+def _new_series(
+    user_id: uuid.UUID,
+    merchant_key: str,
+    description: Optional[str],
+    category: str,
+    amount: float,
+    when: datetime,
+) -> RecurringSeries:
+    return RecurringSeries(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        merchant_key=merchant_key,
+        description=description,
+        category=category,
+        amount=amount,
+        cadence=None,
+        cadence_streak=0,
+        occurrence_count=1,
+        is_recurring=False,
+        last_date=when,
+    )
+
+
+def observe(
+    series: RecurringSeries,
+    amount: float,
+    when: datetime,
+    description: Optional[str] = None,
+) -> bool:
+    """
+    Fold one more transaction into a series, in constant time.
+
+    Updates the running mean amount and, for transactions after the
+    series' last one, the cadence streak and next expected date. Returns
+    True if this transaction made the series recurring.
+    """
+    when = _aware(when)
+    series.occurrence_count += 1
+    series.amount += (amount - series.amount) / series.occurrence_count
+    if description:
+        series.description = description
+
+    days = (when - _aware(series.last_date)).total_seconds() / 86400
+    if days < 1:
+        # Same-day duplicate or an older, back-dated transaction: it belongs
+        # to the series but says nothing about the interval.
+        return False
+
+    cadence = classify_interval(days)
+    if cadence is None:
+        series.cadence_streak = 0
+    elif cadence == series.cadence:
+        series.cadence_streak += 1
+    else:
+        series.cadence = cadence
+        series.cadence_streak = 1
+    series.last_date = when
+
+    became_recurring = False
+    if not series.is_recurring and series.cadence_streak >= MIN_CADENCE_STREAK:
+        series.is_recurring = True
+        became_recurring = True
+    if series.is_recurring and series.cadence:
+        series.next_expected_date = when + CADENCES[series.cadence][2]
+    return became_recurring
+
+
+def detect_recurring(db: Session, transaction: Transaction) -> None:
+    """
+    Match a new transaction to a series and mark it recurring if the series is.
+
+    Per-user state lives in `recurring_series`, so this is one indexed
+    lookup of the user's series for the merchant plus constant work,
+    whatever the length of the history. When a series first becomes
+    recurring, its earlier transactions are flagged in one UPDATE.
+    """
+    merchant_key = normalize_merchant(transaction.description)
+    if not merchant_key:
+        return
+
+    candidates = (
+        db.query(RecurringSeries)
+        .filter(
+            RecurringSeries.user_id == transaction.user_id,
+            RecurringSeries.merchant_key == merchant_key,
+        )
+        .all()
+    )
+    series = _pick_series(candidates, transaction.amount)
+    if series is None:
+        series = _new_series(
+            transaction.user_id,
+            merchant_key,
+            transaction.description,
+            transaction.category,
+            transaction.amount,
+            _aware(transaction.transaction_date),
+        )
+        db.add(series)
+    elif observe(
+        series,
+        transaction.amount,
+        transaction.transaction_date,
+        transaction.description,
+    ):
+        db.execute(
+            update(Transaction)
+            .where(Transaction.recurring_series_id == series.id)
+            .values(is_recurring=True)
+        )
+
+    transaction.recurring_series = series
+    if series.is_recurring:
+        transaction.is_recurring = True
+
+
+def get_recurring_series(db: Session, user_id: uuid.UUID) -> List[RecurringSeries]:
+    """Get a user's established recurring series, soonest next occurrence first."""
+    return (
+        db.query(RecurringSeries)
+        .filter(
+            RecurringSeries.user_id == user_id,
+            RecurringSeries.is_recurring.is_(True),
+        )
+        .order_by(RecurringSeries.next_expected_date.asc().nulls_last())
+        .all()
+    )
+
+
+def backfill_user(db: Session, user_id: uuid.UUID, batch_size: int = 5000) -> int:
+    """
+    Rebuild a user's series from their full history.
+
+    Replays transactions in date order through the same `observe` logic
+    with all series held in memory, then writes series and transaction
+    links in bulk. Flags set by hand are never cleared. Only flushes; the
+    caller commits. Returns the number of recurring series found.
+    """
+    db.execute(
+        update(Transaction)
+        .where(Transaction.user_id == user_id)
+        .values(recurring_series_id=None)
+    )
+    db.query(RecurringSeries).filter(RecurringSeries.user_id == user_id).delete(
+        synchronize_session=False
+    )
+
+    by_merchant: Dict[str, List[RecurringSeries]] = {}
+    members: Dict[uuid.UUID, List[uuid.UUID]] = {}
+    rows = db.execute(
+        select(
+            Transaction.id,
+            Transaction.description,
+            Transaction.category,
+            Transaction.amount,
+            Transaction.transaction_date,
+        )
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.transaction_date, Transaction.created_at)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        merchant_key = normalize_merchant(row.description)
+        if not merchant_key:
+            continue
+        candidates = by_merchant.setdefault(merchant_key, [])
+        series = _pick_series(candidates, row.amount)
+        if series is None:
+            series = _new_series(
+                user_id,
+                merchant_key,
+                row.description,
+                row.category,
+                row.amount,
+                _aware(row.transaction_date),
+            )
+            candidates.append(series)
+        else:
+            observe(series, row.amount, row.transaction_date, row.description)
+        members.setdefault(series.id, []).append(row.id)
+
+    all_series = [s for candidates in by_merchant.values() for s in candidates]
+    db.add_all(all_series)
+    db.flush()
+
+    links = [
+        {
+            "id": transaction_id,
+            "recurring_series_id": series.id,
+            **({"is_recurring": True} if series.is_recurring else {}),
+        }
+        for series in all_series
+        for transaction_id in members[series.id]
+    ]
+    # Bulk UPDATE by primary key: one executemany per key set
+    for with_flag in (True, False):
+        batch = [link for link in links if ("is_recurring" in link) == with_flag]
+        for start in range(0, len(batch), batch_size):
+            db.execute(update(Transaction), batch[start : start + batch_size])
+    return sum(1 for s in all_series if s.is_recurring)
@@ -0,0 +1,166 @@
+"""Search service for ranked full-text search over receipts and transactions."""
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, literal, literal_column, select, union_all
+from app.models import Receipt, Transaction
+from app.schemas import SearchResult, SearchResults
+from typing import Optional
+from datetime import datetime
+import html
+import uuid
+
+SEARCH_CONFIG = "english"
+
+# ts_headline options: a couple of short fragments around the matched terms.
+# ts_headline does not escape the source text, so matches are marked with
+# control characters and the snippet is escaped before they become <b> tags.
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    "MaxFragments=2, MaxWords=18, MinWords=6, "
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}"
+)
+
+RECEIPT_VECTOR = Receipt.__table__.c.search_vector
+TRANSACTION_VECTOR = Transaction.__table__.c.search_vector
+
+
+def render_snippet(headline: Optional[str]) -> Optional[str]:
+    """HTML-escape a ts_headline fragment, keeping only its <b> highlights."""
+    if headline is None:
+        return None
+    return (
+        html.escape(headline)
+        .replace(HIGHLIGHT_START, "<b>")
+        .replace(HIGHLIGHT_STOP, "</b>")
+    )
+
+
+def search(
+    db: Session,
+    user_id: uuid.UUID,
+    q: str,
+    kind: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    category: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> SearchResults:
+    """
+    Full-text search a user's receipts and transactions.
+
+    Matching uses the GIN-indexed generated `search_vector` columns and
+    `websearch_to_tsquery`, so queries like `"home depot" -paint` work and
+    malformed input never raises. Results are ranked with `ts_rank_cd`.
+
+    Snippets are generated only for the requested page: `ts_headline` has
+    to re-parse the source text, so running it on every match would
+    dominate query time for common terms. They are HTML-escaped, with
+    matched terms in <b>...</b>.
+
+    Transactions created from a receipt are represented by that receipt
+    when both kinds are searched, to avoid duplicate hits.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    branches = []
+
+    if kind in (None, "receipt"):
+        where = [Receipt.user_id == user_id, RECEIPT_VECTOR.op("@@")(query)]
+        if start_date:
+            where.append(Receipt.purchase_date >= start_date)
+        if end_date:
+            where.append(Receipt.purchase_date <= end_date)
+        if min_amount is not None:
+            where.append(Receipt.total_amount >= min_amount)
+        if max_amount is not None:
+            where.append(Receipt.total_amount <= max_amount)
+        if category:
+            where.append(Receipt.category == category)
+        branches.append(
+            select(
+                literal("receipt").label("kind"),
+                Receipt.id.label("id"),
+                Receipt.vendor.label("title"),
+                Receipt.purchase_date.label("date"),
+                Receipt.total_amount.label("amount"),
+                Receipt.category.label("category"),
+                func.ts_rank_cd(RECEIPT_VECTOR, query).label("rank"),
+            ).where(*where)
+        )
+
+    if kind in (None, "transaction"):
+        where = [Transaction.user_id == user_id, TRANSACTION_VECTOR.op("@@")(query)]
+        if kind is None:
+            where.append(Transaction.receipt_id.is_(None))
+        if start_date:
+            where.append(Transaction.transaction_date >= start_date)
+        if end_date:
+            where.append(Transaction.transaction_date <= end_date)
+        if min_amount is not None:
+            where.append(Transaction.amount >= min_amount)
+        if max_amount is not None:
+            where.append(Transaction.amount <= max_amount)
+        if category:
+            where.append(Transaction.category == category)
+        branches.append(
+            select(
+                literal("transaction").label("kind"),
+                Transaction.id.label("id"),
+                Transaction.description.label("title"),
+                Transaction.transaction_date.label("date"),
+                Transaction.amount.label("amount"),
+                Transaction.category.label("category"),
+                func.ts_rank_cd(TRANSACTION_VECTOR, query).label("rank"),
+            ).where(*where)
+        )
+
+    matches = branches[0] if len(branches) == 1 else union_all(*branches)
+    # Fetch one extra row to know whether another page exists
+    page = (
+        matches.order_by(literal_column("rank").desc(), literal_column("date").desc())
+        .offset(skip)
+        .limit(limit + 1)
+        .subquery("page")
+    )
+
+    document = case(
+        (
+            page.c.kind == "receipt",
+            func.concat_ws(" ", Receipt.vendor, Receipt.raw_ocr_text),
+        ),
+        else_=func.concat_ws(" ", Transaction.description, Transaction.category),
+    )
+    stmt = (
+        select(
+            page,
+            func.ts_headline(SEARCH_CONFIG, document, query, HEADLINE_OPTIONS).label(
+                "snippet"
+            ),
+        )
+        .select_from(page)
+        .outerjoin(Receipt, and_(page.c.kind == "receipt", Receipt.id == page.c.id))
+        .outerjoin(
+            Transaction,
+            and_(page.c.kind == "transaction", Transaction.id == page.c.id),
+        )
+        .order_by(page.c.rank.desc(), page.c.date.desc())
+    )
+    rows = db.execute(stmt).all()
+
+    return SearchResults(
+        results=[
+            SearchResult(
+                kind=row.kind,
+                id=row.id,
+                title=row.title,
+                date=row.date,
+                amount=float(row.amount),
+                category=row.category,
+                rank=float(row.rank),
+                snippet=render_snippet(row.snippet),
+            )
+            for row in rows[:limit]
+        ],
+        has_more=len(rows) > limit,
+    )
@@ -0,0 +1,364 @@
+"""Sketch-backed vendor and amount analytics, maintained incrementally on ingest."""
+from sqlalchemy import delete, event, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from dateutil.relativedelta import relativedelta
+from app.config import settings
+from app.database import SessionLocal
+from app.models import AnalyticsSketch, Receipt, Transaction, User
+from app.schemas import AmountPercentiles, DistinctVendors, TopVendors, VendorCount
+from app.services.sketches import HyperLogLog, SpaceSaving, TDigest
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PLATFORM_SCOPE = "platform"
+KINDS = ("vendors", "distinct_vendors", "amounts")
+
+HLL_PRECISION = 12  # 1.6% relative standard error
+TDIGEST_COMPRESSION = 100.0
+
+# (scope, kind, bucket), the column order of the unique index
+SketchKey = Tuple[str, str, date]
+
+_PENDING = "sketch_pending_events"
+
+
+def _empty(kind: str, scope: str):
+    if kind == "vendors":
+        capacity = (
+            settings.SKETCH_TOP_K_PLATFORM
+            if scope == PLATFORM_SCOPE
+            else settings.SKETCH_TOP_K
+        )
+        return SpaceSaving(capacity)
+    if kind == "distinct_vendors":
+        return HyperLogLog(HLL_PRECISION)
+    return TDigest(TDIGEST_COMPRESSION)
+
+
+def _decode(kind: str, data: bytes):
+    if kind == "vendors":
+        return SpaceSaving.from_bytes(data)
+    if kind == "distinct_vendors":
+        return HyperLogLog.from_bytes(data)
+    return TDigest.from_bytes(data)
+
+
+def month_bucket(when: datetime) -> date:
+    """First day of the UTC month containing `when` (naive values are UTC)."""
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    return date(when.year, when.month, 1)
+
+
+def normalize_vendor(vendor: Optional[str]) -> str:
+    """Case- and whitespace-insensitive vendor key."""
+    return " ".join(vendor.split()).casefold() if vendor else ""
+
+
+class SketchBuffer:
+    """
+    Unflushed sketch deltas keyed by (scope, kind, bucket).
+
+    Every event updates both the user's scope and the platform scope.
+    Deltas are sketches themselves, so flushing is a merge into the
+    stored sketch and reads can merge pending deltas on top.
+    """
+
+    def __init__(self):
+        self._deltas: Dict[SketchKey, object] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    def _sketch(self, scope: str, kind: str, bucket: date):
+        key = (scope, kind, bucket)
+        sketch = self._deltas.get(key)
+        if sketch is None:
+            sketch = self._deltas[key] = _empty(kind, scope)
+        return sketch
+
+    def add_amount(self, user_id: uuid.UUID, when: datetime, amount: float) -> None:
+        bucket = month_bucket(when)
+        with self._lock:
+            for scope in (str(user_id), PLATFORM_SCOPE):
+                self._sketch(scope, "amounts", bucket).add(amount)
+
+    def add_vendor(self, user_id: uuid.UUID, when: datetime, vendor: str) -> None:
+        key = normalize_vendor(vendor)
+        if not key:
+            return
+        bucket = month_bucket(when)
+        with self._lock:
+            for scope in (str(user_id), PLATFORM_SCOPE):
+                self._sketch(scope, "vendors", bucket).add(key)
+                self._sketch(scope, "distinct_vendors", bucket).add(key)
+
+    def drain(self) -> Dict[SketchKey, object]:
+        """Take all pending deltas, leaving the buffer empty."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        return deltas
+
+    def restore(self, deltas: Dict[SketchKey, object]) -> None:
+        """Put back deltas whose flush failed, merging with newer ones."""
+        with self._lock:
+            for key, sketch in deltas.items():
+                current = self._deltas.get(key)
+                self._deltas[key] = sketch if current is None else sketch.merge(current)
+
+    def pending(self, scope: str, kind: str, start: date, end: date) -> List[object]:
+        """Copies of the unflushed deltas for a scope and month range."""
+        with self._lock:
+            return [
+                _decode(kind, sketch.to_bytes())
+                for (s, k, bucket), sketch in self._deltas.items()
+                if s == scope and k == kind and start <= bucket <= end
+            ]
+
+
+sketch_buffer = SketchBuffer()
+
+
+def record_transactions(
+    db: Session, user_id: uuid.UUID, rows: Iterable[Tuple[datetime, float]]
+) -> None:
+    """
+    Add (transaction_date, amount) rows to the sketches when `db` commits.
+
+    Needed only for bulk `insert()` statements; ORM flushes of
+    Transaction and Receipt are picked up automatically.
+    """
+    pending = db.info.setdefault(_PENDING, [])
+    pending.extend(("amount", user_id, when, amount) for when, amount in rows)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_events(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING, [])
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            pending.append(("amount", obj.user_id, obj.transaction_date, obj.amount))
+        elif isinstance(obj, Receipt) and obj.vendor:
+            pending.append(("vendor", obj.user_id, obj.purchase_date, obj.vendor))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _buffer_events(session: Session) -> None:
+    for kind, user_id, when, value in session.info.pop(_PENDING, ()):
+        if kind == "amount":
+            sketch_buffer.add_amount(user_id, when, value)
+        else:
+            sketch_buffer.add_vendor(user_id, when, value)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_events(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
+
+
+# Platform aggregates keep a deleted user's contribution (sketches cannot
+# subtract), but their own sketches go with them.
+@event.listens_for(User, "after_delete")
+def _delete_user_sketches(mapper, connection, target: User) -> None:
+    connection.execute(
+        delete(AnalyticsSketch).where(AnalyticsSketch.scope == str(target.id))
+    )
+
+
+def persist_sketches(db: Session, deltas: Dict[SketchKey, object]) -> None:
+    """
+    Merge deltas into the stored sketches and commit.
+
+    Missing rows are created empty first, then every affected row is
+    locked in index order, so concurrent flushes from several workers
+    serialize per row instead of overwriting each other.
+    """
+    keys = sorted(deltas)
+    for start in range(0, len(keys), settings.SKETCH_FLUSH_BATCH):
+        batch = keys[start : start + settings.SKETCH_FLUSH_BATCH]
+        db.execute(
+            pg_insert(AnalyticsSketch)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "scope": scope,
+                        "kind": kind,
+                        "bucket": bucket,
+                        "data": _empty(kind, scope).to_bytes(),
+                    }
+                    for scope, kind, bucket in batch
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["scope", "kind", "bucket"])
+        )
+        rows = db.execute(
+            select(
+                AnalyticsSketch.id,
+                AnalyticsSketch.scope,
+                AnalyticsSketch.kind,
+                AnalyticsSketch.bucket,
+                AnalyticsSketch.data,
+            )
+            .where(
+                tuple_(
+                    AnalyticsSketch.scope, AnalyticsSketch.kind, AnalyticsSketch.bucket
+                ).in_(batch)
+            )
+            .order_by(AnalyticsSketch.scope, AnalyticsSketch.kind, AnalyticsSketch.bucket)
+            .with_for_update()
+        )
+        updates = [
+            {
+                "id": row.id,
+                "data": _decode(row.kind, row.data)
+                .merge(deltas[(row.scope, row.kind, row.bucket)])
+                .to_bytes(),
+            }
+            for row in rows
+        ]
+        db.execute(update(AnalyticsSketch), updates)
+    db.commit()
+
+
+def flush_sketches(db: Session) -> int:
+    """Persist everything buffered in this process; returns sketches written."""
+    deltas = sketch_buffer.drain()
+    if not deltas:
+        return 0
+    try:
+        persist_sketches(db, deltas)
+    except Exception:
+        db.rollback()
+        sketch_buffer.restore(deltas)
+        raise
+    return len(deltas)
+
+
+_flusher: Optional[threading.Thread] = None
+_stop_flusher = threading.Event()
+
+
+def _flush_loop() -> None:
+    while not _stop_flusher.wait(settings.SKETCH_FLUSH_SECONDS):
+        try:
+            with SessionLocal() as db:
+                flush_sketches(db)
+        except Exception:
+            logger.exception("Sketch flush failed; deltas kept for the next run")
+
+
+def start_sketch_flusher() -> None:
+    """Start the background thread that persists buffered sketch deltas."""
+    global _flusher
+    _stop_flusher.clear()
+    _flusher = threading.Thread(target=_flush_loop, name="sketch-flush", daemon=True)
+    _flusher.start()
+
+
+def stop_sketch_flusher() -> None:
+    """Stop the flusher and persist whatever is still buffered."""
+    _stop_flusher.set()
+    if _flusher is not None:
+        _flusher.join(timeout=5)
+    try:
+        with SessionLocal() as db:
+            flush_sketches(db)
+    except Exception:
+        logger.exception("Final sketch flush failed; buffered deltas lost")
+
+
+def load_sketch(db: Session, scope: str, kind: str, months: int, as_of=None):
+    """Merge a scope's stored monthly sketches, plus unflushed deltas, over `months`."""
+    end = month_bucket(as_of or datetime.now(timezone.utc))
+    start = end - relativedelta(months=months - 1)
+    merged = _empty(kind, scope)
+    rows = db.execute(
+        select(AnalyticsSketch.data).where(
+            AnalyticsSketch.scope == scope,
+            AnalyticsSketch.kind == kind,
+            AnalyticsSketch.bucket >= start,
+            AnalyticsSketch.bucket <= end,
+        )
+    )
+    for (data,) in rows:
+        merged.merge(_decode(kind, data))
+    for delta in sketch_buffer.pending(scope, kind, start, end):
+        merged.merge(delta)
+    return merged
+
+
+def _scope(user_id: uuid.UUID, platform: bool) -> str:
+    return PLATFORM_SCOPE if platform else str(user_id)
+
+
+def get_top_vendors(
+    db: Session,
+    user_id: uuid.UUID,
+    months: int = 12,
+    limit: int = 10,
+    platform: bool = False,
+) -> TopVendors:
+    """
+    Most frequent receipt vendors (Space-Saving estimates).
+
+    Platform-wide, only vendors whose guaranteed count (count minus
+    overcount) reaches SKETCH_PLATFORM_MIN_VENDOR_COUNT are returned, so
+    a merchant seen on a handful of receipts is not exposed to every user.
+    """
+    sketch = load_sketch(db, _scope(user_id, platform), "vendors", months)
+    guaranteed_above = sketch.total / sketch.capacity
+    min_count = settings.SKETCH_PLATFORM_MIN_VENDOR_COUNT if platform else 0
+    vendors = [
+        VendorCount(vendor=vendor, count=int(count), max_overcount=int(error))
+        for vendor, count, error in sketch.top(limit)
+        if count - error >= min_count
+    ]
+    return TopVendors(
+        scope="platform" if platform else "user",
+        months=months,
+        total_receipts=int(sketch.total),
+        # A withheld vendor has a true count below min_count + the overcount bound
+        guaranteed_above=guaranteed_above + min_count,
+        vendors=vendors,
+    )
+
+
+def get_amount_percentiles(
+    db: Session,
+    user_id: uuid.UUID,
+    quantiles: List[float],
+    months: int = 12,
+    platform: bool = False,
+) -> AmountPercentiles:
+    """Transaction amount percentiles (t-digest estimates)."""
+    sketch = load_sketch(db, _scope(user_id, platform), "amounts", months)
+    count = int(sketch.count)
+    return AmountPercentiles(
+        scope="platform" if platform else "user",
+        months=months,
+        count=count,
+        min=sketch.min if count else None,
+        max=sketch.max if count else None,
+        percentiles={f"p{q * 100:g}": sketch.quantile(q) for q in quantiles},
+    )
+
+
+def get_distinct_vendors(
+    db: Session, user_id: uuid.UUID, months: int = 12, platform: bool = False
+) -> DistinctVendors:
+    """Distinct receipt vendors (HyperLogLog estimate)."""
+    sketch = load_sketch(db, _scope(user_id, platform), "distinct_vendors", months)
+    return DistinctVendors(
+        scope="platform" if platform else "user",
+        months=months,
+        estimate=round(sketch.estimate()),
+        relative_standard_error=sketch.relative_error,
+    )
@@ -0,0 +1,150 @@
+"""Spend time series over arbitrary ranges with dense, gap-filled buckets."""
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select
+from dateutil.relativedelta import relativedelta
+from app.models import Transaction
+from app.schemas import TimeSeries, TimeSeriesPeriod, TimeSeriesPoint
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+import uuid
+
+GRANULARITIES = ("day", "week", "month")
+
+# Upper bound on buckets per period, so a day-level request over decades
+# cannot produce an unbounded response.
+MAX_POINTS = 5000
+
+
+def truncate(day: date, granularity: str) -> date:
+    """Start of the bucket containing `day` (weeks start on Monday, as in Postgres)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _step(granularity: str):
+    if granularity == "month":
+        return relativedelta(months=1)
+    return timedelta(days=7 if granularity == "week" else 1)
+
+
+def bucket_starts(start: date, end: date, granularity: str) -> List[date]:
+    """Every bucket start from the bucket containing `start` through `end`."""
+    step = _step(granularity)
+    current = truncate(start, granularity)
+    buckets = []
+    while current <= end:
+        buckets.append(current)
+        current = current + step
+    return buckets
+
+
+def count_buckets(start: date, end: date, granularity: str) -> int:
+    """Number of buckets `bucket_starts` would return, without building them."""
+    first, last = truncate(start, granularity), truncate(end, granularity)
+    if granularity == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days // (7 if granularity == "week" else 1) + 1
+
+
+def _local_midnight(day: date, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=tz)
+
+
+def _period(
+    start: date,
+    end: date,
+    granularity: str,
+    totals: Dict[date, Tuple[float, int]],
+) -> TimeSeriesPeriod:
+    """Build a dense period from sparse bucket totals."""
+    points = [
+        TimeSeriesPoint(
+            period_start=bucket,
+            total_amount=totals.get(bucket, (0.0, 0))[0],
+            transaction_count=totals.get(bucket, (0.0, 0))[1],
+        )
+        for bucket in bucket_starts(start, end, granularity)
+    ]
+    return TimeSeriesPeriod(
+        start=start,
+        end=end,
+        total_amount=sum(point.total_amount for point in points),
+        points=points,
+    )
+
+
+def get_timeseries(
+    db: Session,
+    user_id: uuid.UUID,
+    start: date,
+    end: date,
+    granularity: str = "month",
+    timezone: str = "UTC",
+    category: Optional[str] = None,
+    compare: bool = False,
+) -> TimeSeries:
+    """
+    Aggregate spend into day/week/month buckets between two local dates.
+
+    Dates are inclusive and interpreted in `timezone`; transactions are
+    bucketed by their local date via `AT TIME ZONE`, aggregated in SQL,
+    and empty buckets are filled with zeros. With `compare`, the
+    same-length period ending the day before `start` is aggregated in the
+    same scan.
+    """
+    tz = ZoneInfo(timezone)
+    length = end - start + timedelta(days=1)
+    query_start = start - length if compare else start
+
+    start_at = _local_midnight(start, tz)
+    local_time = func.timezone(timezone, Transaction.transaction_date)
+    bucket = func.date_trunc(granularity, local_time).label("bucket")
+    # Buckets can straddle `start` (e.g. a month), so rows are also split
+    # by period and each period gets its own partial edge bucket.
+    in_current = case((Transaction.transaction_date >= start_at, True), else_=False)
+    stmt = (
+        select(
+            bucket,
+            in_current.label("in_current"),
+            func.sum(Transaction.amount).label("total_amount"),
+            func.count().label("transaction_count"),
+        )
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.transaction_date >= _local_midnight(query_start, tz),
+            Transaction.transaction_date
+            < _local_midnight(end + timedelta(days=1), tz),
+        )
+        .group_by(bucket, in_current)
+    )
+    if category:
+        stmt = stmt.where(Transaction.category == category)
+
+    current: Dict[date, Tuple[float, int]] = {}
+    previous: Dict[date, Tuple[float, int]] = {}
+    for row in db.execute(stmt):
+        target = current if row.in_current else previous
+        target[row.bucket.date()] = (float(row.total_amount), row.transaction_count)
+
+    result = TimeSeries(
+        granularity=granularity,
+        timezone=timezone,
+        category=category,
+        current=_period(start, end, granularity, current),
+    )
+    if compare:
+        result.previous = _period(
+            query_start, start - timedelta(days=1), granularity, previous
+        )
+        result.change_amount = (
+            result.current.total_amount - result.previous.total_amount
+        )
+        if result.previous.total_amount:
+            result.change_pct = (
+                result.change_amount / result.previous.total_amount * 100
+            )
+    return result
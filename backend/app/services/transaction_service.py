@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.models import Transaction
 from app.schemas import TransactionCreate
-from typing import Optional, List
+from app.services.recurring_service import detect_recurring
+from typing import Any, Optional, List, Sequence
 from datetime import datetime
 import uuid
 
@@ -14,7 +15,14 @@ def create_transaction(
     transaction_create: TransactionCreate,
     receipt_id: Optional[uuid.UUID] = None,
 ) -> Transaction:
-    """Create a new transaction."""
+    """
+    Create a new transaction.
+
+    Only flushes: the caller owns the unit of work and commits. The INSERT
+    uses RETURNING for server defaults, so no refresh SELECT is needed.
+    The transaction is matched against the user's recurring series first,
+    which may set `is_recurring`.
+    """
     db_transaction = Transaction(
         id=uuid.uuid4(),
         user_id=user_id,
@@ -25,9 +33,9 @@ def create_transaction(
         transaction_date=transaction_create.transaction_date,
         is_recurring=transaction_create.is_recurring,
     )
+    detect_recurring(db, db_transaction)
     db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
+    db.flush()
     return db_transaction
 
 
@@ -39,9 +47,16 @@ def get_transactions(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     category: Optional[str] = None,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Transaction]:
-    """Get transactions for a user with optional filters."""
-    query = db.query(Transaction).filter(Transaction.user_id == user_id)
+    """
+    Get transactions for a user with optional filters.
+
+    If `columns` is given, only those columns are selected and plain rows
+    are returned instead of Transaction objects.
+    """
+    entities = columns if columns else (Transaction,)
+    query = db.query(*entities).filter(Transaction.user_id == user_id)
 
     if start_date:
         query = query.filter(Transaction.transaction_date >= start_date)
@@ -72,11 +87,11 @@ def get_transaction_by_id(
 def delete_transaction(
     db: Session, transaction_id: uuid.UUID, user_id: uuid.UUID
 ) -> bool:
-    """Delete a transaction."""
+    """Delete a transaction (flushes; the caller commits)."""
     transaction = get_transaction_by_id(db, transaction_id, user_id)
     if transaction:
         db.delete(transaction)
-        db.commit()
+        db.flush()
         return True
     return False
 
@@ -1,16 +1,39 @@
 """User service for authentication and user management."""
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from app.models import User
 from app.schemas import UserCreate
-from typing import Optional
+from app.config import settings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+import asyncio
+import threading
 import uuid
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+T = TypeVar("T")
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# Argon2 releases the GIL, so a small dedicated thread pool keeps hashing
+# off the event loop. The pool size caps CPU and memory (workers x
+# ARGON2_MEMORY_COST); the slot count caps how many hashes may wait.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="argon2"
+)
+_hash_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
+    """Hash a password using Argon2id."""
     return pwd_context.hash(password)
 
 
@@ -19,17 +42,58 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_user(db: Session, user_create: UserCreate) -> User:
-    """Create a new user."""
-    hashed_password = hash_password(user_create.password)
+async def _run_hashing(fn: Callable[..., T], *args) -> T:
+    """Run a hashing call on the bounded pool, or fail fast when it is full."""
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests; please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _hash_executor, fn, *args
+        )
+    finally:
+        _hash_slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _run_hashing(pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash uses
+    outdated Argon2 parameters and should be replaced.
+    """
+    return await _run_hashing(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+def create_user(
+    db: Session, user_create: UserCreate, password_hash: Optional[str] = None
+) -> User:
+    """
+    Create a new user (flushes; the caller commits).
+
+    Async callers should pass a `password_hash` computed with
+    `hash_password_async` rather than hashing inline.
+    """
+    hashed_password = password_hash or hash_password(user_create.password)
     db_user = User(
         id=uuid.uuid4(),
         email=user_create.email,
         password_hash=hashed_password,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
     return db_user
 
 
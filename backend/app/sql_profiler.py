@@ -0,0 +1,163 @@
+"""Opt-in per-request SQL profiling: counts, timings, slowest statements and N+1 hints."""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import heapq
+import re
+import time
+
+_PARAM = re.compile(r"%\(\w+\)s|%s|\?")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """
+    Statement text with parameters and parameter lists collapsed.
+
+    `IN (?, ?, ?)` and multi-row `VALUES (?, ?), (?, ?)` reduce to one
+    placeholder, so statements differing only in list length share a shape.
+    """
+    shape = _PARAM.sub("?", statement)
+    shape = _PARAM_LIST.sub("?", shape)
+    shape = _ROW_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Statements executed while serving one request."""
+
+    __slots__ = ("count", "seconds", "shapes", "slowest", "keep", "repeat_threshold")
+
+    def __init__(self, keep: int = 3, repeat_threshold: int = 5):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+        # Min-heap of (seconds, shape) holding the `keep` slowest statements
+        self.slowest: List[Tuple[float, str]] = []
+        self.keep = keep
+        self.repeat_threshold = repeat_threshold
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, (seconds, shape))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, shape))
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Shapes executed at least `repeat_threshold` times: likely N+1 queries."""
+        return sorted(
+            (
+                (shape, n)
+                for shape, n in self.shapes.items()
+                if n >= self.repeat_threshold
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def server_timing(self) -> str:
+        value = f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+        suspects = len(self.repeated())
+        if suspects:
+            value += f', db-repeats;desc="{suspects} repeated statements"'
+        return value
+
+    def log_fields(self) -> dict:
+        fields = {
+            "db_queries": self.count,
+            "db_ms": round(self.seconds * 1000, 2),
+            "db_slowest": [
+                {"ms": round(seconds * 1000, 2), "statement": shape}
+                for seconds, shape in sorted(self.slowest, reverse=True)
+            ],
+        }
+        repeated = self.repeated()
+        if repeated:
+            fields["db_n_plus_one"] = [
+                {"count": n, "statement": shape} for shape, n in repeated
+            ]
+        return fields
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar(
+    "current_sql_profile", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, time.perf_counter() - context._profile_started)
+
+
+def profile_engine(engine: Engine) -> None:
+    """Attach the profiler's cursor events to `engine`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def profile_from_scope(scope: Scope) -> Optional[QueryProfile]:
+    """The profile SQLProfilerMiddleware attached to this request, if any."""
+    state = scope.get("state")
+    return state.get("sql_profile") if state else None
+
+
+class SQLProfilerMiddleware:
+    """
+    Profile the SQL each request runs.
+
+    Adds a `Server-Timing` header (statements run after the response
+    starts, e.g. in a streamed body, are only in the log) and stores the
+    profile in the request state for the access log. Only installed when
+    SQL_PROFILER_ENABLED is set, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        keep: Optional[int] = None,
+        repeat_threshold: Optional[int] = None,
+    ):
+        self.app = app
+        self.keep = settings.SQL_PROFILER_SLOWEST if keep is None else keep
+        self.repeat_threshold = (
+            settings.SQL_PROFILER_REPEAT_THRESHOLD
+            if repeat_threshold is None
+            else repeat_threshold
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(self.keep, self.repeat_threshold)
+        scope.setdefault("state", {})["sql_profile"] = profile
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
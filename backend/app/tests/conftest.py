@@ -0,0 +1,29 @@
+"""Shared database fixtures for the test suite."""
+import pytest
+from sqlalchemy.orm import Session
+from app.database import get_db, Base, engine
+from app.services.user_service import create_user
+from app.schemas import UserCreate
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a test database session."""
+    Base.metadata.create_all(bind=engine)
+    db = next(get_db())
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user_email() -> str:
+    """Email for `test_user`; override or parametrize to use another."""
+    return "test@example.com"
+
+
+@pytest.fixture
+def test_user(db_session: Session, user_email: str):
+    """Create a test user."""
+    user_create = UserCreate(email=user_email, password="testpass123")
+    return create_user(db_session, user_create)
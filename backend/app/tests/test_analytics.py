@@ -1,37 +1,22 @@
 """Tests for analytics service."""
-import pytest
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from app.database import get_db, Base, engine
 from app.models import User, Budget
 from app.services.analytics_service import (
     get_monthly_spend,
     get_category_breakdown,
     get_budget_alerts,
+    get_current_month_spend,
+    get_dashboard,
 )
+from app.services.budget_service import iter_all_budget_alerts
 from app.services.user_service import create_user
 from app.services.transaction_service import create_transaction
 from app.schemas import UserCreate, TransactionCreate
 import uuid
 
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a test database session."""
-    Base.metadata.create_all(bind=engine)
-    db = next(get_db())
-    yield db
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture
-def test_user(db_session: Session):
-    """Create a test user."""
-    user_create = UserCreate(email="analytics@example.com", password="testpass123")
-    return create_user(db_session, user_create)
-
-
 def test_monthly_spend(db_session: Session, test_user: User):
     """Test monthly spend aggregation."""
     # Create transactions across multiple months
@@ -98,3 +83,83 @@ def test_budget_alerts(db_session: Session, test_user: User):
     groceries_alert = next((a for a in alerts if a.category == "groceries"), None)
     assert groceries_alert is not None
     assert groceries_alert.spent > groceries_alert.limit
+
+
+def test_all_budget_alerts_in_batches(db_session: Session, test_user: User):
+    """Test the batch run evaluates every user's budgets across batches."""
+    as_of = datetime(2024, 3, 20)
+    spends = {"a@example.com": 90.0, "b@example.com": 10.0, "c@example.com": 150.0}
+    for email, amount in spends.items():
+        user = create_user(db_session, UserCreate(email=email, password="testpass123"))
+        db_session.add(
+            Budget(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                category="groceries",
+                monthly_limit=100.0,
+            )
+        )
+        create_transaction(
+            db_session,
+            user.id,
+            TransactionCreate(
+                amount=amount, category="groceries", transaction_date=datetime(2024, 3, 5)
+            ),
+        )
+        # Outside the month window
+        create_transaction(
+            db_session,
+            user.id,
+            TransactionCreate(
+                amount=500.0, category="groceries", transaction_date=datetime(2024, 2, 5)
+            ),
+        )
+    db_session.commit()
+
+    alerts = list(
+        iter_all_budget_alerts(db_session, alert_threshold=0.8, batch_users=1, as_of=as_of)
+    )
+    assert sorted((email, alert.spent) for _, email, alert in alerts) == [
+        ("a@example.com", 90.0),
+        ("c@example.com", 150.0),
+    ]
+
+
+def test_dashboard_matches_individual_endpoints(db_session: Session, test_user: User):
+    """Test the combined dashboard agrees with the separate analytics calls."""
+    db_session.add(
+        Budget(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            category="groceries",
+            monthly_limit=60.0,
+        )
+    )
+    now = datetime.now()
+    for months_ago, category, amount in [
+        (0, "groceries", 55.0),
+        (0, "gas", 20.0),
+        (1, "groceries", 80.0),
+        (3, "restaurant", 35.0),
+    ]:
+        create_transaction(
+            db_session,
+            test_user.id,
+            TransactionCreate(
+                amount=amount,
+                category=category,
+                transaction_date=now - relativedelta(months=months_ago),
+            ),
+        )
+    db_session.commit()
+
+    dashboard = get_dashboard(db_session, test_user.id, months=12)
+    assert dashboard.current_month_spend == get_current_month_spend(
+        db_session, test_user.id
+    )
+    assert dashboard.monthly_spend == get_monthly_spend(db_session, test_user.id, 12)
+    assert {c.category: c.total_amount for c in dashboard.category_breakdown} == {
+        c.category: c.total_amount
+        for c in get_category_breakdown(db_session, test_user.id, 12)
+    }
+    assert dashboard.budget_alerts == get_budget_alerts(db_session, test_user.id)
@@ -0,0 +1,131 @@
+"""Tests for analytics backend routing and the DuckDB columnar backend."""
+import json
+import os
+import time
+import uuid
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from app.models import Transaction
+from app.services import analytics_backends
+from app.services.analytics_backends import (
+    ColumnarStore,
+    DuckDBAnalyticsBackend,
+    run_aggregation,
+)
+
+duckdb = pytest.importorskip("duckdb")
+
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def columnar_backend(tmp_path):
+    """A DuckDB backend over a hand-written one-file snapshot."""
+    store = ColumnarStore(str(tmp_path), engine=None)
+    con = duckdb.connect()
+    con.execute(
+        f"""
+        COPY (
+            SELECT * FROM (VALUES
+                ('{USER_ID}', TIMESTAMP '2024-01-05', 10.0, 'gas', TIMESTAMP '2024-01-05'),
+                ('{USER_ID}', TIMESTAMP '2024-01-20', 15.0, 'groceries', TIMESTAMP '2024-01-20'),
+                ('{USER_ID}', TIMESTAMP '2024-02-02', 40.0, 'groceries', TIMESTAMP '2024-02-02'),
+                ('{uuid.uuid4()}', TIMESTAMP '2024-01-10', 99.0, 'gas', TIMESTAMP '2024-01-10')
+            ) AS t(user_id, transaction_date, amount, category, created_at)
+        ) TO '{tmp_path / "part-1.parquet"}' (FORMAT parquet)
+        """
+    )
+    con.close()
+    with open(store.manifest_path, "w") as f:
+        json.dump(
+            {
+                "files": ["part-1.parquet"],
+                "watermark": "2024-02-02 00:00:00",
+                "refreshed_at": time.time(),
+                "full_refreshed_at": time.time(),
+            },
+            f,
+        )
+    return DuckDBAnalyticsBackend(store, max_staleness_seconds=60)
+
+
+def test_duckdb_monthly_totals(columnar_backend):
+    """Test monthly totals are computed per user from the snapshot."""
+    totals = columnar_backend.monthly_totals(
+        None, USER_ID, datetime(2023, 12, 1), datetime(2024, 3, 1)
+    )
+    assert totals == [(datetime(2024, 1, 1), 25.0), (datetime(2024, 2, 1), 40.0)]
+
+
+def test_duckdb_category_totals(columnar_backend):
+    """Test category totals are ordered by spend."""
+    totals = columnar_backend.category_totals(
+        None, USER_ID, datetime(2023, 12, 1), datetime(2024, 3, 1)
+    )
+    assert totals == [("groceries", 55.0), ("gas", 10.0)]
+
+
+def test_stale_snapshot_is_not_used(columnar_backend):
+    """Test freshness check against the manifest refresh time."""
+    assert columnar_backend.is_fresh()
+    columnar_backend.max_staleness_seconds = 0
+    assert not columnar_backend.is_fresh()
+
+
+def test_run_aggregation_falls_back_to_postgres(monkeypatch, columnar_backend):
+    """Test failures in the columnar backend fall back to Postgres."""
+
+    def broken(*args):
+        raise RuntimeError("snapshot unreadable")
+
+    monkeypatch.setattr(columnar_backend, "monthly_totals", broken)
+    monkeypatch.setattr(analytics_backends, "_columnar_backend", columnar_backend)
+    monkeypatch.setattr(
+        analytics_backends.postgres_backend,
+        "monthly_totals",
+        lambda db, *args: [("postgres", 1.0)],
+    )
+
+    assert run_aggregation("monthly_totals", None, 60, USER_ID, None, None) == [
+        ("postgres", 1.0)
+    ]
+    # Short windows never touch the columnar store
+    assert analytics_backends.get_backend(1) is analytics_backends.postgres_backend
+
+
+def test_deleted_transaction_routes_user_to_postgres(monkeypatch, columnar_backend):
+    """Test a delete keeps long windows off the snapshot until a full rebuild."""
+    monkeypatch.setattr(analytics_backends, "_columnar_backend", columnar_backend)
+    monkeypatch.setattr(
+        analytics_backends.postgres_backend,
+        "monthly_totals",
+        lambda db, user_id, start, end: [(datetime(2024, 1, 1), 15.0)],
+    )
+    window = (USER_ID, datetime(2023, 12, 1), datetime(2024, 3, 1))
+    assert run_aggregation("monthly_totals", None, 24, *window)[0][1] == 25.0
+
+    # The $10 January transaction is deleted (flush, then commit)
+    session = SimpleNamespace(
+        info={}, dirty=(), deleted=[Transaction(user_id=USER_ID, amount=10.0)]
+    )
+    analytics_backends._collect_stale_users(session, None)
+    analytics_backends._mark_stale_users(session)
+    assert run_aggregation("monthly_totals", None, 24, *window) == [
+        (datetime(2024, 1, 1), 15.0)
+    ]
+    # Other users keep using the snapshot
+    assert analytics_backends.get_backend(24, uuid.uuid4()) is columnar_backend
+
+    # The next refresh is a full one, after which the user is served again
+    store = columnar_backend.store
+    exports = []
+    rebuilt = ("part-1.parquet", 3, "2024-02-02 00:00:00")
+    monkeypatch.setattr(
+        store, "_export_part", lambda since: exports.append(since) or rebuilt
+    )
+    time.sleep(0.01)
+    assert store.refresh(min_interval=3600)
+    assert exports == [None]
+    assert not list(os.scandir(store.stale_dir))
+    assert analytics_backends.get_backend(24, USER_ID) is columnar_backend
@@ -0,0 +1,106 @@
+"""Tests for the per-user analytics response cache."""
+from starlette.requests import Request
+from app.database import SessionLocal
+from app.services.analytics_cache import (
+    AnalyticsCache,
+    UserVersions,
+    cached_json_response,
+    mark_analytics_dirty,
+    user_versions,
+)
+import uuid
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(if_none_match: str = None) -> Request:
+    headers = []
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_entries_invalidate_on_version_bump_and_ttl():
+    """Test an entry is served until the user writes or its TTL passes."""
+    clock = FakeClock()
+    versions = UserVersions(maxsize=10)
+    cache = AnalyticsCache(versions, maxsize=10, ttl_seconds=60, clock=clock)
+    user_id = uuid.uuid4()
+
+    cache.put(user_id, "monthly", (12,), versions.get(user_id), b"[]")
+    assert cache.get(user_id, "monthly", (12,)).body == b"[]"
+    assert cache.get(user_id, "monthly", (6,)) is None
+
+    versions.bump(user_id)
+    assert cache.get(user_id, "monthly", (12,)) is None
+
+    cache.put(user_id, "monthly", (12,), versions.get(user_id), b"[]")
+    clock.now += 61
+    assert cache.get(user_id, "monthly", (12,)) is None
+
+
+def test_evicted_versions_never_match_old_entries():
+    """Test dropping a user's version raises the floor past their entries."""
+    versions = UserVersions(maxsize=1)
+    cache = AnalyticsCache(versions, maxsize=10, ttl_seconds=60)
+    quiet_user, busy_user = uuid.uuid4(), uuid.uuid4()
+
+    cache.put(quiet_user, "monthly", (), versions.get(quiet_user), b"old")
+    versions.bump(quiet_user)
+    versions.bump(busy_user)  # evicts quiet_user's version
+    assert cache.get(quiet_user, "monthly", ()) is None
+
+
+def test_cache_is_lru_bounded():
+    """Test the least recently used entry is evicted first."""
+    versions = UserVersions(maxsize=10)
+    cache = AnalyticsCache(versions, maxsize=2, ttl_seconds=60)
+    user_id = uuid.uuid4()
+    for name in ("a", "b"):
+        cache.put(user_id, name, (), 0, b"{}")
+    cache.get(user_id, "a", ())
+    cache.put(user_id, "c", (), 0, b"{}")
+    assert cache.get(user_id, "a", ()) is not None
+    assert cache.get(user_id, "b", ()) is None
+
+
+def test_cached_json_response_etag_and_304():
+    """Test repeat calls skip compute and If-None-Match returns 304."""
+    user_id = uuid.uuid4()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total_spend": 12.5}
+
+    first = cached_json_response(_request(), user_id, "spend", (), compute)
+    assert first.status_code == 200
+    assert first.body == b'{"total_spend":12.5}'
+    etag = first.headers["etag"]
+
+    second = cached_json_response(_request(etag), user_id, "spend", (), compute)
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert len(calls) == 1
+
+    third = cached_json_response(_request(f'"other", W/{etag}'), user_id, "spend", (), compute)
+    assert third.status_code == 304
+
+
+def test_commit_bumps_marked_users():
+    """Test explicitly marked writes bump the version on commit."""
+    user_id = uuid.uuid4()
+    before = user_versions.get(user_id)
+
+    db = SessionLocal()
+    mark_analytics_dirty(db, user_id)
+    assert user_versions.get(user_id) == before
+    db.commit()
+    db.close()
+    assert user_versions.get(user_id) > before
@@ -0,0 +1,137 @@
+"""Tests for server-pushed analytics changes."""
+import asyncio
+import threading
+import uuid
+from app.services.analytics_events import (
+    AnalyticsEventBus,
+    diff_state,
+    event_bus,
+    format_event,
+    stream_changes,
+)
+from app.routers.analytics import stream_analytics
+from app.services.analytics_cache import _change_listeners
+from app.services.auth_cache import Principal
+
+
+def _alert(category: str, spent: float, limit: float = 100.0) -> dict:
+    return {
+        "category": category,
+        "spent": spent,
+        "limit": limit,
+        "percentage": spent / limit * 100,
+        "over_by": spent - limit,
+    }
+
+
+def test_diff_state():
+    """Test totals and alert changes become delta events, and no-ops don't."""
+    before = {"current_month_spend": 50.0, "budget_alerts": {"gas": _alert("gas", 85)}}
+    assert diff_state(before, before) == []
+
+    after = {
+        "current_month_spend": 70.0,
+        "budget_alerts": {"food": _alert("food", 90)},
+    }
+    assert diff_state(before, after) == [
+        ("month-total", {"current_month_spend": 70.0, "delta": 20.0}),
+        ("budget-alerts", {"changed": [_alert("food", 90)], "cleared": ["gas"]}),
+    ]
+
+
+def test_format_event():
+    """Test SSE wire format."""
+    assert format_event("snapshot", {"a": 1}, 3) == (
+        'event: snapshot\nid: 3\ndata: {"a":1}\n\n'
+    )
+
+
+def test_bus_limits_streams_and_publishes_across_threads():
+    """Test per-user stream limits and thread-safe wake-ups."""
+    bus = AnalyticsEventBus(max_per_user=2)
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        first = bus.subscribe(user_id)
+        second = bus.subscribe(user_id)
+        assert bus.subscribe(user_id) is None
+        assert bus.publish(uuid.uuid4()) == 0
+
+        publisher = threading.Thread(target=bus.publish, args=(user_id,))
+        publisher.start()
+        await asyncio.wait_for(first.wakeup.wait(), 1)
+        await asyncio.wait_for(second.wakeup.wait(), 1)
+        publisher.join()
+        assert first.changed and second.changed
+
+        bus.unsubscribe(first)
+        bus.unsubscribe(second)
+        assert len(bus) == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_sends_snapshot_then_coalesced_deltas():
+    """Test the stream pushes one delta per wake-up, however many writes."""
+    user_id = uuid.uuid4()
+    states = iter(
+        [
+            {"current_month_spend": 10.0, "budget_alerts": {}},
+            {"current_month_spend": 35.0, "budget_alerts": {}},
+        ]
+    )
+    calls = []
+
+    def compute(uid, threshold):
+        calls.append((uid, threshold))
+        return next(states)
+
+    async def scenario():
+        stream = stream_changes(user_id, 0.8, compute=compute)
+        assert (await stream.__anext__()).startswith("retry:")
+        assert (await stream.__anext__()).startswith("event: snapshot")
+
+        # Commits notify through the analytics cache's change listeners
+        for _ in range(3):
+            for listener in _change_listeners:
+                listener(user_id)
+        delta = await asyncio.wait_for(stream.__anext__(), 1)
+        assert delta.startswith("event: month-total\nid: 1\n")
+        assert '"delta":25.0' in delta
+
+        await stream.aclose()
+        assert event_bus.publish(user_id) == 0
+
+    asyncio.run(scenario())
+    assert calls == [(user_id, 0.8), (user_id, 0.8)]
+
+
+def test_unsent_stream_response_holds_no_subscription():
+    """Test a stream response that is never iterated leaves the bus empty."""
+    principal = Principal(id=uuid.uuid4(), email="sse@example.com")
+
+    async def scenario():
+        for _ in range(event_bus.max_per_user + 1):
+            response = await stream_analytics(
+                alert_threshold=0.8, current_user=principal
+            )
+            del response
+        assert len(event_bus) == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_that_loses_the_last_slot_ends_with_an_error_event():
+    """Test a stream started after the user's slots filled up ends at once."""
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        held = [event_bus.subscribe(user_id) for _ in range(event_bus.max_per_user)]
+        stream = stream_changes(user_id, 0.8, compute=lambda uid, t: {})
+        assert (await stream.__anext__()).startswith("event: error\n")
+        assert [chunk async for chunk in stream] == []
+        for subscription in held:
+            event_bus.unsubscribe(subscription)
+        assert len(event_bus) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,86 @@
+"""Tests for the authenticated principal cache."""
+import asyncio
+import pytest
+from datetime import timedelta
+from sqlalchemy.orm import Session
+from app.models import User
+from app.routers.auth import create_access_token, get_current_principal
+from app.services.auth_cache import Principal, PrincipalCache, principal_cache
+from app.services.user_service import hash_password
+import uuid
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _principal() -> Principal:
+    return Principal(id=uuid.uuid4(), email="cache@example.com")
+
+
+def test_cache_expires_at_ttl_or_token_expiry():
+    """Test entries expire at the earlier of the TTL and the token's exp."""
+    clock = FakeClock()
+    cache = PrincipalCache(maxsize=10, ttl_seconds=60, clock=clock)
+    principal = _principal()
+
+    cache.put("long-lived", principal, token_expires_at=clock.now + 3600)
+    cache.put("short-lived", principal, token_expires_at=clock.now + 5)
+    clock.now += 10
+    assert cache.get("long-lived") == principal
+    assert cache.get("short-lived") is None
+
+    clock.now += 60
+    assert cache.get("long-lived") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the cache stays bounded and evicts the LRU entry."""
+    cache = PrincipalCache(maxsize=2, ttl_seconds=60, clock=FakeClock())
+    cache.put("a", _principal(), token_expires_at=float("inf"))
+    cache.put("b", _principal(), token_expires_at=float("inf"))
+    cache.get("a")
+    cache.put("c", _principal(), token_expires_at=float("inf"))
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_invalidate_user_drops_all_tokens():
+    """Test invalidation removes every token for the user only."""
+    cache = PrincipalCache(maxsize=10, ttl_seconds=60, clock=FakeClock())
+    alice, bob = _principal(), _principal()
+    cache.put("alice-phone", alice, token_expires_at=float("inf"))
+    cache.put("alice-web", alice, token_expires_at=float("inf"))
+    cache.put("bob", bob, token_expires_at=float("inf"))
+
+    cache.invalidate_user(alice.id)
+    assert cache.get("alice-phone") is None
+    assert cache.get("alice-web") is None
+    assert cache.get("bob") == bob
+
+
+@pytest.fixture
+def db_session(db_session: Session):
+    """Shared session; also empties the process-wide principal cache afterwards."""
+    yield db_session
+    principal_cache.clear()
+
+
+def test_password_change_invalidates_cached_tokens(
+    db_session: Session, test_user: User
+):
+    """Test a cached token is re-verified after the password changes."""
+    token = create_access_token({"sub": str(test_user.id)}, timedelta(minutes=5))
+    principal = asyncio.run(get_current_principal(token, db_session))
+    assert principal == Principal(id=test_user.id, email=test_user.email)
+    assert principal_cache.get(token) == principal
+
+    test_user.password_hash = hash_password("newpass456")
+    db_session.flush()
+    assert principal_cache.get(token) is None
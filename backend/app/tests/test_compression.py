@@ -0,0 +1,92 @@
+"""Tests for response compression."""
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from app.compression import BROTLI_AVAILABLE, CompressionMiddleware, choose_encoding
+
+PAYLOAD = '{"rows":[' + ",".join(['{"amount":12.5,"category":"food"}'] * 200) + "]}"
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+
+    @app.get("/large")
+    def large():
+        return Response(PAYLOAD, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return Response('{"ok":true}', media_type="application/json")
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded():
+        body = gzip.compress(PAYLOAD.encode())
+        return Response(
+            body, media_type="application/json", headers={"Content-Encoding": "gzip"}
+        )
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter(["data: x\n\n"] * 500), media_type="text/event-stream")
+
+    @app.get("/export")
+    def export():
+        return StreamingResponse(
+            (f"{i},food,12.50\n" for i in range(5000)), media_type="text/csv"
+        )
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    """Test brotli preference, gzip fallback and q=0 exclusion."""
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("br, gzip") == ("br" if BROTLI_AVAILABLE else "gzip")
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+
+
+def test_large_json_is_gzipped(client):
+    """Test large JSON is compressed, with Vary and a weakened ETag."""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) < len(PAYLOAD)
+    assert response.text == PAYLOAD  # Decoded by the client
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli not installed")
+def test_brotli_preferred(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+
+
+def test_skipped_responses(client):
+    """Test small bodies, binary types, pre-encoded bodies and SSE pass through."""
+    headers = {"Accept-Encoding": "gzip"}
+    assert "content-encoding" not in client.get("/small", headers=headers).headers
+    assert "content-encoding" not in client.get("/image", headers=headers).headers
+    assert "content-encoding" not in client.get("/events", headers=headers).headers
+    response = client.get("/encoded", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == PAYLOAD  # Compressed exactly once
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_body_compressed_incrementally(client):
+    """Test a streamed export is compressed and decodes to the full body."""
+    response = client.get("/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"{i},food,12.50\n" for i in range(5000))
@@ -0,0 +1,47 @@
+"""Tests for streaming export serialization."""
+import gzip
+import json
+import uuid
+from datetime import datetime, timezone
+from app.services.export_service import (
+    TRANSACTION_EXPORT_COLUMNS,
+    column_names,
+    gzip_stream,
+    serialize_csv,
+    serialize_ndjson,
+)
+
+NAMES = column_names(TRANSACTION_EXPORT_COLUMNS)
+
+
+def _batches():
+    """Two batches of transaction export rows."""
+    when = datetime(2024, 1, 15, 12, 0, tzinfo=timezone.utc)
+    row = (uuid.uuid4(), None, 12.5, "groceries", 'Milk, "whole"', when, False, when)
+    return [[row, row], [row]]
+
+
+def test_serialize_csv_streams_one_chunk_per_batch():
+    """Test CSV output has a header chunk plus one chunk per batch."""
+    chunks = list(serialize_csv(NAMES, _batches()))
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0].startswith("id,receipt_id,amount")
+    assert len(lines) == 4
+    assert '"Milk, ""whole"""' in lines[1]
+
+
+def test_serialize_ndjson():
+    """Test NDJSON output is one JSON object per line."""
+    body = b"".join(serialize_ndjson(NAMES, _batches())).decode()
+    records = [json.loads(line) for line in body.splitlines()]
+    assert len(records) == 3
+    assert records[0]["transaction_date"] == "2024-01-15T12:00:00+00:00"
+    assert records[0]["receipt_id"] is None
+
+
+def test_gzip_stream_round_trip():
+    """Test incremental gzip output decompresses to the original stream."""
+    chunks = list(serialize_csv(NAMES, _batches()))
+    compressed = b"".join(gzip_stream(iter(chunks)))
+    assert gzip.decompress(compressed) == b"".join(chunks)
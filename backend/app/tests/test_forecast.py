@@ -0,0 +1,122 @@
+"""Tests for spend forecasting and anomaly detection."""
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from app.models import User
+from app.services.forecast_service import (
+    _row_medians,
+    get_anomalies,
+    get_forecast,
+    project_month_end,
+    rolling_robust_scores,
+    score_by_category,
+)
+from app.services.transaction_service import create_transaction
+from app.schemas import TransactionCreate
+
+
+def test_row_medians_ignore_nan_padding():
+    """Test medians match np.nanmedian for partially filled rows."""
+    rows = np.array(
+        [
+            [np.nan, np.nan, np.nan, np.nan],
+            [np.nan, np.nan, np.nan, 4.0],
+            [np.nan, np.nan, 4.0, 1.0],
+            [np.nan, 4.0, 1.0, 9.0],
+            [3.0, 4.0, 1.0, 9.0],
+        ]
+    )
+    counts = np.array([0, 1, 2, 3, 4])
+    medians = _row_medians(rows, counts)
+    assert np.isnan(medians[0])
+    np.testing.assert_allclose(medians[1:], [4.0, 2.5, 4.0, 3.5])
+
+
+def test_project_month_end_blends_run_rate_and_baseline():
+    """Test projections lean on the baseline early and the run rate late."""
+    spent = np.array([100.0, 0.0])
+    baseline = np.array([300.0, 60.0])
+    # Day 1 of 30: mostly baseline
+    early = project_month_end(spent, baseline, 1.0, 30)
+    assert early[0] == pytest.approx(100.0 + (1 / 30) * 2900 + (29 / 30) * 290)
+    # Month over: nothing left to project
+    late = project_month_end(spent, baseline, 30.0, 30)
+    np.testing.assert_allclose(late, spent)
+
+
+def test_rolling_scores_flag_spike_not_history():
+    """Test a spike scores high while routine amounts do not."""
+    rng = np.random.default_rng(0)
+    amounts = np.concatenate(
+        [rng.normal(40.0, 5.0, 60), [400.0], rng.normal(40.0, 5.0, 5)]
+    )
+    scores, medians = rolling_robust_scores(amounts, window=50, min_history=8)
+    assert np.isnan(scores[:8]).all()
+    assert scores[60] > 10
+    assert np.nanmax(np.abs(np.delete(scores, 60))) < 5
+    # The spike does not move later medians much
+    assert medians[-1] == pytest.approx(40.0, abs=3.0)
+
+
+def test_rolling_scores_constant_history():
+    """Test identical history flags any increase and nothing else."""
+    amounts = np.array([10.0] * 10 + [10.0, 11.0])
+    scores, _ = rolling_robust_scores(amounts, window=50, min_history=8)
+    assert scores[10] == 0.0
+    assert np.isinf(scores[11])
+
+
+def test_score_by_category_keeps_categories_apart():
+    """Test each category is scored against its own history only."""
+    codes = np.array([0] * 12 + [1] * 12)
+    amounts = np.concatenate([np.full(12, 5.0), np.full(11, 500.0), [5.0]])
+    scores, medians = score_by_category(codes, amounts)
+    assert np.nanmax(scores[:12]) == 0.0
+    assert medians[-1] == 500.0
+    # A drop against constant history is not flagged
+    assert scores[-1] == 0.0
+
+    # Scoring only the tail of each category gives the same scores there
+    targets = np.zeros(len(codes), dtype=bool)
+    targets[[10, 11, 23]] = True
+    tail_scores, _ = score_by_category(codes, amounts, targets)
+    assert np.isnan(tail_scores[~targets]).all()
+    np.testing.assert_array_equal(tail_scores[targets], scores[targets])
+
+
+def test_forecast_and_anomalies(db_session: Session, test_user: User):
+    """Test forecast totals and anomaly detection against stored history."""
+    as_of = datetime(2024, 3, 16, 12, 0)
+    start = datetime(2023, 9, 1, 12, 0)
+    days = [start + timedelta(days=3 * i) for i in range((as_of - start).days // 3 + 1)]
+    for day in days:
+        create_transaction(
+            db_session,
+            test_user.id,
+            TransactionCreate(amount=10.0, category="coffee", transaction_date=day),
+        )
+    spike = create_transaction(
+        db_session,
+        test_user.id,
+        TransactionCreate(
+            amount=250.0,
+            category="coffee",
+            description="Espresso machine",
+            transaction_date=as_of - timedelta(hours=1),
+        ),
+    )
+
+    forecast = get_forecast(db_session, test_user.id, baseline_months=6, as_of=as_of)
+    assert forecast.month == "2024-03"
+    assert forecast.days_in_month == 31
+    [coffee] = forecast.categories
+    in_march = [day for day in days if day >= datetime(2024, 3, 1)]
+    assert coffee.spent_to_date == pytest.approx(250.0 + 10.0 * len(in_march))
+    assert coffee.projected_total > coffee.spent_to_date
+
+    anomalies = get_anomalies(db_session, test_user.id, days=30, as_of=as_of)
+    assert [a.transaction_id for a in anomalies] == [spike.id]
+    assert anomalies[0].description == "Espresso machine"
+    assert anomalies[0].typical_amount == 10.0
+
@@ -0,0 +1,112 @@
+"""Tests for Idempotency-Key handling."""
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.config import settings
+from app.models import IdempotencyKey, User
+from app.services import idempotency_service
+from app.services.idempotency_service import StoredResponse, request_fingerprint
+
+
+def test_request_fingerprint():
+    """Test the fingerprint depends on every part and their boundaries."""
+    assert request_fingerprint(b"POST /a", b"{}") == request_fingerprint(
+        b"POST /a", b"{}"
+    )
+    assert request_fingerprint(b"POST /a", b"{}") != request_fingerprint(
+        b"POST /b", b"{}"
+    )
+    assert request_fingerprint(b"ab", b"c") != request_fingerprint(b"a", b"bc")
+
+
+def test_stored_response_replay():
+    """Test a stored response is replayed verbatim."""
+    response = StoredResponse(201, '{"id":"1"}').to_response()
+    assert response.status_code == 201
+    assert response.body == b'{"id":"1"}'
+    assert response.headers["idempotent-replayed"] == "true"
+
+
+@pytest.fixture
+def test_user(db_session: Session, test_user: User):
+    """Commit the test user (keys are claimed in their own session)."""
+    db_session.commit()
+    return test_user
+
+
+def test_completed_key_replays(db_session: Session, test_user: User):
+    """Test a completed key returns the stored response."""
+    request_hash = request_fingerprint(b"body")
+    assert asyncio.run(idempotency_service.begin(test_user.id, "k1", request_hash)) is None
+
+    idempotency_service.complete(db_session, test_user.id, "k1", 201, '{"ok":true}')
+    db_session.commit()
+    asyncio.run(idempotency_service.release(test_user.id, "k1", failed=False))
+
+    stored = asyncio.run(idempotency_service.begin(test_user.id, "k1", request_hash))
+    assert stored == StoredResponse(201, '{"ok":true}')
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            idempotency_service.begin(test_user.id, "k1", request_fingerprint(b"other"))
+        )
+    assert exc.value.status_code == 422
+
+
+def test_duplicate_waits_for_in_flight_request(test_user: User):
+    """Test a concurrent duplicate waits and then receives the original result."""
+
+    async def scenario():
+        request_hash = request_fingerprint(b"body")
+        assert await idempotency_service.begin(test_user.id, "k2", request_hash) is None
+        waiter = asyncio.create_task(
+            idempotency_service.begin(test_user.id, "k2", request_hash)
+        )
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+
+        db = next(get_db())
+        idempotency_service.complete(db, test_user.id, "k2", 201, "{}")
+        db.commit()
+        db.close()
+        await idempotency_service.release(test_user.id, "k2", failed=False)
+        return await waiter
+
+    assert asyncio.run(scenario()) == StoredResponse(201, "{}")
+
+
+def test_failed_request_releases_key(test_user: User):
+    """Test a failed request frees the key for a retry."""
+    request_hash = request_fingerprint(b"body")
+    assert asyncio.run(idempotency_service.begin(test_user.id, "k3", request_hash)) is None
+    asyncio.run(idempotency_service.release(test_user.id, "k3", failed=True))
+    assert asyncio.run(idempotency_service.begin(test_user.id, "k3", request_hash)) is None
+    asyncio.run(idempotency_service.release(test_user.id, "k3", failed=True))
+
+
+def test_abandoned_claim_is_taken_over_after_lease(
+    db_session: Session, test_user: User
+):
+    """Test an in-progress key left by a dead worker expires with its lease."""
+    request_hash = request_fingerprint(b"body")
+    assert asyncio.run(idempotency_service.begin(test_user.id, "k4", request_hash)) is None
+    record = db_session.query(IdempotencyKey).filter_by(key="k4").one()
+    lease = record.expires_at - record.created_at
+    assert lease.total_seconds() <= settings.IDEMPOTENCY_LEASE_SECONDS + 5
+
+    # The worker dies without complete() or release(); the lease runs out
+    idempotency_service._inflight.pop((test_user.id, "k4"))
+    record.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    assert asyncio.run(idempotency_service.begin(test_user.id, "k4", request_hash)) is None
+
+    idempotency_service.complete(db_session, test_user.id, "k4", 201, "{}")
+    db_session.commit()
+    asyncio.run(idempotency_service.release(test_user.id, "k4", failed=False))
+    db_session.refresh(record)
+    assert record.expires_at - record.created_at > timedelta(
+        seconds=settings.IDEMPOTENCY_LEASE_SECONDS
+    )
@@ -0,0 +1,167 @@
+"""Tests for bulk transaction import."""
+import io
+import uuid
+import pytest
+from sqlalchemy.orm import Session
+from datetime import datetime
+from app.models import User
+from app.services.import_service import (
+    CreditRow,
+    detect_format,
+    import_transactions,
+    normalize_row,
+    parse_csv,
+    parse_ofx,
+    parse_qif,
+)
+from app.services.transaction_service import get_transactions
+
+CSV_EXPORT = """Date,Description,Amount,Category
+01/15/2024,STARBUCKS #123,-4.50,restaurant
+01/16/2024,SHELL OIL,"-1,045.20",
+not a date,BROKEN ROW,-3.00,other
+01/17/2024,ZERO ROW,0.00,other
+"""
+
+OFX_EXPORT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240115120000.000[-5:EST]
+<TRNAMT>-42.10
+<NAME>KROGER
+<MEMO>Groceries
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240116</DTPOSTED><TRNAMT>-9.99</TRNAMT><NAME>NETFLIX</NAME></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_EXPORT = """!Type:Bank
+D01/15'24
+T-25.00
+PUBER TRIP
+Ltransportation:rides
+^
+D1/20/2024
+U-60.00
+PCVS
+^
+"""
+
+
+def test_detect_format():
+    """Test format detection from file extension."""
+    assert detect_format("export.CSV") == "csv"
+    assert detect_format("statement.qfx") == "ofx"
+    assert detect_format("money.qif") == "qif"
+    assert detect_format("notes.txt") is None
+    assert detect_format(None) is None
+
+
+def test_parse_csv():
+    """Test CSV parsing with header aliases."""
+    rows = list(parse_csv(io.StringIO(CSV_EXPORT)))
+    assert len(rows) == 4
+    row_number, raw = rows[0]
+    assert row_number == 1
+    assert raw["description"] == "STARBUCKS #123"
+    assert raw["amount"] == "-4.50"
+
+
+def test_parse_ofx_sgml_and_xml():
+    """Test OFX parsing handles unclosed and closed tags."""
+    rows = list(parse_ofx(io.StringIO(OFX_EXPORT)))
+    assert len(rows) == 2
+    assert rows[0][1]["date"] == "20240115120000"
+    assert rows[0][1]["description"] == "KROGER Groceries"
+    assert rows[1][1]["amount"] == "-9.99"
+
+
+def test_parse_qif():
+    """Test QIF record parsing."""
+    rows = list(parse_qif(io.StringIO(QIF_EXPORT)))
+    assert len(rows) == 2
+    assert rows[0][1]["category"] == "transportation"
+    assert rows[1][1]["description"] == "CVS"
+
+
+def test_normalize_row():
+    """Test raw field normalization."""
+    data = normalize_row(
+        {"date": "20240115", "amount": "-$1,234.50", "description": "RENT"},
+        default_category="Other",
+    )
+    assert data["amount"] == 1234.50
+    assert data["category"] == "other"
+    assert data["transaction_date"] == datetime(2024, 1, 15)
+
+    with pytest.raises(ValueError):
+        normalize_row({"date": "20240115", "amount": "abc"}, "other")
+
+
+def test_normalize_row_rejects_credits():
+    """Test refunds and deposits are never turned into expenses."""
+    refund = {"date": "20240115", "amount": "25.00", "description": "REFUND"}
+    with pytest.raises(CreditRow, match="credit of 25.00"):
+        normalize_row(refund, "other")
+    assert normalize_row(refund, "other", expense_sign="positive")["amount"] == 25.0
+
+    with pytest.raises(CreditRow):
+        normalize_row({**refund, "amount": "-25.00"}, "other", expense_sign="positive")
+    with pytest.raises(CreditRow):
+        normalize_row({**refund, "amount": "(25.00)"}, "other", expense_sign="positive")
+    assert normalize_row({**refund, "amount": "(25.00)"}, "other")["amount"] == 25.0
+
+    # OFX credit types are skipped even when the bank signs them negative
+    with pytest.raises(CreditRow, match="CREDIT transaction"):
+        normalize_row({**refund, "amount": "-25.00", "type": "CREDIT"}, "other")
+
+
+def test_import_skips_and_reports_credits():
+    """Test OFX deposits are counted as skipped and listed, not imported."""
+    ofx = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20240115</DTPOSTED><TRNAMT>1200.00</TRNAMT><NAME>PAYROLL</NAME></STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240116</DTPOSTED><TRNAMT>9.99</TRNAMT><NAME>REVERSAL</NAME></STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+    # Nothing to insert, so no database is needed
+    result = import_transactions(None, uuid.uuid4(), io.StringIO(ofx), "ofx")
+    assert (result.total_rows, result.imported, result.failed) == (2, 0, 0)
+    assert result.skipped == 2
+    assert [error.row for error in result.errors] == [1, 2]
+    assert not result.errors_truncated
+
+
+def test_import_transactions_reports_row_errors(db_session: Session, test_user: User):
+    """Test a CSV import inserts valid rows and reports the rest."""
+    result = import_transactions(
+        db_session, test_user.id, io.StringIO(CSV_EXPORT), "csv", chunk_size=2
+    )
+    assert result.total_rows == 4
+    assert result.imported == 2
+    assert result.failed == 2
+    assert sorted(error.row for error in result.errors) == [3, 4]
+
+    transactions = get_transactions(db_session, test_user.id)
+    assert len(transactions) == 2
+    assert {t.category for t in transactions} == {"restaurant", "other"}
+
+
+def test_import_positive_csv_skips_negative_rows(db_session: Session, test_user: User):
+    """Test a CSV that lists expenses as positive skips its refunds."""
+    csv_export = """Date,Description,Amount
+01/15/2024,GROCERY STORE,54.20
+01/16/2024,GROCERY STORE REFUND,-12.00
+"""
+    result = import_transactions(
+        db_session,
+        test_user.id,
+        io.StringIO(csv_export),
+        "csv",
+        expense_sign="positive",
+    )
+    assert (result.imported, result.failed, result.skipped) == (1, 0, 1)
+    assert result.errors[0].row == 2
+
+    transactions = get_transactions(db_session, test_user.id)
+    assert [t.amount for t in transactions] == [54.20]
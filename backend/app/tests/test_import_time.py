@@ -0,0 +1,52 @@
+"""Cold-start budget: importing app.main must stay fast and skip optional heavy modules."""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cumulative `python -X importtime` for app.main, which itself adds some
+# overhead. Override with IMPORT_TIME_BUDGET_MS on slow CI machines.
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 3000))
+
+# Imported on first use (OCR upload, Parquet export, DuckDB backend, Rich
+# dev logging), never at start-up
+LAZY_MODULES = ("pytesseract", "PIL", "transformers", "torch", "duckdb", "pyarrow", "rich")
+
+
+def import_app_main():
+    """Import app.main in a fresh interpreter; returns (import time ms, loaded lazy modules)."""
+    script = (
+        "import sys, app.main; "
+        f"print('loaded:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "LOG_FORMAT": "json"},
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.rsplit("|", 1)[1].strip() == "app.main":
+            cumulative_us = int(line.split("|")[1])
+            break
+    else:
+        raise AssertionError("app.main missing from -X importtime output")
+    (report,) = [
+        line for line in result.stdout.splitlines() if line.startswith("loaded:")
+    ]
+    loaded = [m for m in report[len("loaded:") :].split(",") if m]
+    return cumulative_us / 1000, loaded
+
+
+def test_app_import_within_budget():
+    """Test app.main imports under budget without loading OCR/ML/optional modules."""
+    elapsed_ms, loaded = import_app_main()
+    assert loaded == [], f"imported at start-up: {loaded}"
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS, (
+        f"app.main took {elapsed_ms:.0f} ms to import "
+        f"(budget {IMPORT_TIME_BUDGET_MS:.0f} ms); see python -X importtime -c 'import app.main'"
+    )
@@ -0,0 +1,146 @@
+"""Tests for structured logging and the sampled access log."""
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.logging_config import (
+    AccessLogMiddleware,
+    DroppingQueueHandler,
+    JsonFormatter,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_client(sample_rate: float, slow_ms: float = 1000.0):
+    app = FastAPI()
+
+    @app.get("/ok")
+    def ok():
+        return {"ok": True}
+
+    @app.get("/missing")
+    def missing():
+        raise HTTPException(status_code=404)
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(AccessLogMiddleware, sample_rate=sample_rate, slow_ms=slow_ms)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def capture_access_log():
+    handler = ListHandler()
+    logger = logging.getLogger("app.access")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+
+def test_successes_are_sampled_errors_always_logged():
+    """Test 2xx requests follow the sample rate while 4xx/5xx are always kept."""
+    logger, handler = capture_access_log()
+    try:
+        client = make_client(sample_rate=0.0)
+        for _ in range(20):
+            assert client.get("/ok").status_code == 200
+        assert handler.records == []
+
+        client.get("/missing")
+        client.get("/boom")
+        statuses = [r.status for r in handler.records]
+        assert statuses == [404, 500]
+        assert handler.records[0].levelno == logging.INFO
+        assert handler.records[1].levelno == logging.ERROR
+        assert handler.records[1].exc_info is not None
+
+        handler.records.clear()
+        client = make_client(sample_rate=1.0)
+        client.get("/ok")
+        (record,) = handler.records
+        assert (record.method, record.path, record.status) == ("GET", "/ok", 200)
+        assert record.sampled is True
+        assert record.duration_ms >= 0
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_slow_requests_always_logged():
+    """Test requests over the slow threshold bypass sampling."""
+    logger, handler = capture_access_log()
+    try:
+        make_client(sample_rate=0.0, slow_ms=0.0).get("/ok")
+        (record,) = handler.records
+        assert record.status == 200
+        assert record.sampled is False
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test records become one JSON object with `extra` fields at top level."""
+    record = logging.getLogger("app.access").makeRecord(
+        "app.access",
+        logging.INFO,
+        __file__,
+        1,
+        "%s %s",
+        ("GET", "/ok"),
+        None,
+        extra={"status": 200, "duration_ms": 1.5, "errors": [ValueError("x")]},
+    )
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "GET /ok"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.access"
+    assert entry["status"] == 200
+    assert entry["duration_ms"] == 1.5
+    assert entry["errors"] == ["x"]
+    assert "args" not in entry and "msg" not in entry
+
+
+def test_queue_handler_drops_when_full():
+    """Test a full queue drops records instead of blocking the caller."""
+    handler = DroppingQueueHandler(queue.Queue(1))
+    logger = logging.getLogger("test.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("first %d", 1)
+        logger.warning("second")
+        assert handler.dropped == 1
+        record = handler.queue.get_nowait()
+        assert record.msg == "first 1" and record.args is None
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_importing_app_does_not_configure_logging():
+    """Test handlers and the queue listener are installed at start-up, not import."""
+    script = (
+        "import logging, threading, app.main; "
+        "print(len(logging.getLogger().handlers), threading.active_count())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        capture_output=True,
+        text=True,
+        env={**os.environ, "LOG_FORMAT": "json"},
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.split() == ["0", "1"]
@@ -0,0 +1,88 @@
+"""Tests for Prometheus request, database and OCR metrics."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.metrics import (
+    MetricsMiddleware,
+    UNMATCHED_ROUTE,
+    instrument_engine,
+    ocr_stage,
+    render_metrics,
+)
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+
+def sample(name, **labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture(scope="module")
+def client():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "test")
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app)
+
+
+def test_requests_labelled_by_route_template(client):
+    """Test counts use the path template and unmatched paths share one label."""
+    route = "/items/{item_id}"
+    before = sample("http_requests_total", method="GET", route=route, status="200")
+    client.get("/items/1")
+    client.get("/items/2")
+    assert (
+        sample("http_requests_total", method="GET", route=route, status="200")
+        == before + 2
+    )
+    assert sample("http_request_duration_seconds_count", method="GET", route=route) >= 2
+
+    before = sample(
+        "http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404"
+    )
+    client.get("/nope/123")
+    assert (
+        sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404")
+        == before + 1
+    )
+    assert sample("http_requests_in_flight") == 0
+
+
+def test_db_queries_counted_per_request(client):
+    """Test statements run in the endpoint's threadpool count toward the request."""
+    route = "/items/{item_id}"
+    count_before = sample("http_request_db_queries_count", method="GET", route=route)
+    sum_before = sample("http_request_db_queries_sum", method="GET", route=route)
+    client.get("/items/3")
+    assert (
+        sample("http_request_db_queries_count", method="GET", route=route)
+        == count_before + 1
+    )
+    assert (
+        sample("http_request_db_queries_sum", method="GET", route=route)
+        == sum_before + 3
+    )
+    assert sample("db_pool_checkouts_total", engine="test") >= 1
+    assert sample("db_pool_connections_checked_out", engine="test") == 0
+
+
+def test_ocr_stage_and_exposition():
+    """Test stage timings are observed and rendered in exposition format."""
+    before = sample("ocr_stage_duration_seconds_count", stage="extract_fields")
+    with ocr_stage("extract_fields"):
+        pass
+    assert sample("ocr_stage_duration_seconds_count", stage="extract_fields") == before + 1
+
+    data, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b"ocr_stage_duration_seconds_bucket" in data
@@ -0,0 +1,52 @@
+"""Tests for password hashing."""
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.services import user_service
+from app.services.user_service import (
+    hash_password_async,
+    verify_and_update_password,
+    verify_password,
+)
+
+
+def test_hash_and_verify_off_loop():
+    """Test hashing and verification through the bounded pool."""
+
+    async def scenario():
+        password_hash = await hash_password_async("testpass123")
+        return password_hash, await verify_and_update_password(
+            "testpass123", password_hash
+        )
+
+    password_hash, (valid, new_hash) = asyncio.run(scenario())
+    assert valid
+    assert new_hash is None
+    assert verify_password("testpass123", password_hash)
+    assert not asyncio.run(verify_and_update_password("wrong", password_hash))[0]
+
+
+def test_outdated_parameters_are_rehashed():
+    """Test a hash made with other Argon2 parameters is upgraded on verify."""
+    weaker = CryptContext(
+        schemes=["argon2"], argon2__rounds=1, argon2__memory_cost=1024
+    )
+    old_hash = weaker.hash("testpass123")
+
+    valid, new_hash = asyncio.run(verify_and_update_password("testpass123", old_hash))
+    assert valid
+    assert new_hash is not None and new_hash != old_hash
+    assert verify_password("testpass123", new_hash)
+
+
+def test_full_queue_is_rejected(monkeypatch: pytest.MonkeyPatch):
+    """Test hashing fails fast with 503 when no slots are free."""
+    monkeypatch.setattr(user_service, "_hash_slots", threading.BoundedSemaphore(1))
+    user_service._hash_slots.acquire()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(hash_password_async("testpass123"))
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
@@ -0,0 +1,181 @@
+"""Tests for token-bucket rate limiting."""
+import asyncio
+import pytest
+from datetime import timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.rate_limit import (
+    BucketRule,
+    InMemoryRateLimiter,
+    RateLimitMiddleware,
+    route_cost,
+)
+from app.routers.auth import create_access_token
+import uuid
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+RULE = BucketRule(capacity=10, refill_rate=1.0)
+
+
+def test_route_cost():
+    """Test per-route weights and prefix matching."""
+    assert route_cost("POST", "/auth/login") == 10
+    assert route_cost("POST", "/receipts/upload") == 20
+    assert route_cost("GET", "/analytics/monthly-spend") == 2
+    assert route_cost("GET", "/analyticsfoo") == 1
+    assert route_cost("GET", "/health") == 0
+    assert route_cost("GET", "/transactions") == 1
+
+
+def test_bucket_denies_then_refills():
+    """Test a drained bucket reports the wait until it can serve the cost."""
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+    keys = [("ip:1", RULE)]
+
+    assert limiter.acquire(keys, 6) == 0
+    assert limiter.acquire(keys, 6) == pytest.approx(2.0)
+    clock.now += 2
+    assert limiter.acquire(keys, 6) == 0
+
+
+def test_all_buckets_or_none():
+    """Test a denial by one bucket does not debit the others."""
+    limiter = InMemoryRateLimiter(clock=FakeClock())
+    limiter.acquire([("user:a", RULE)], 10)
+
+    assert limiter.acquire([("ip:1", RULE), ("user:a", RULE)], 5) > 0
+    assert limiter.acquire([("ip:1", RULE)], 10) == 0
+
+
+def test_eviction():
+    """Test LRU eviction past max_buckets and sweeping of refilled buckets."""
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(max_buckets=2, sweep_interval=30, clock=clock)
+    for key in ("a", "b", "c"):
+        limiter.acquire([(key, RULE)], 1)
+    assert len(limiter) == 2
+
+    clock.now += 60
+    limiter.acquire([("d", RULE)], 1)
+    assert len(limiter) == 1
+
+
+def _client(limiter: InMemoryRateLimiter) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/auth/login")
+    async def login():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=limiter,
+        ip_rule=BucketRule(capacity=25, refill_rate=0.5),
+        user_rule=BucketRule(capacity=15, refill_rate=0.5),
+    )
+    return TestClient(app)
+
+
+def test_middleware_returns_429_with_retry_after():
+    """Test requests over the IP limit get 429 and Retry-After."""
+    client = _client(InMemoryRateLimiter(clock=FakeClock()))
+    assert client.post("/auth/login").status_code == 200
+    assert client.post("/auth/login").status_code == 200
+
+    response = client.post("/auth/login")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+
+
+def test_middleware_limits_per_user():
+    """Test a verified token is charged to its user's bucket; forged ones are not."""
+    limiter = InMemoryRateLimiter(clock=FakeClock())
+    client = _client(limiter)
+    user_id = str(uuid.uuid4())
+    token = create_access_token({"sub": user_id}, timedelta(minutes=5))
+
+    response = client.post("/auth/login", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert f"user:{user_id}" in limiter._buckets
+
+    client.post("/auth/login", headers={"Authorization": "Bearer forged"})
+    assert not any(key.startswith("user:forged") for key in limiter._buckets)
+    assert len(limiter) == 2
+
+
+def test_redis_backend():
+    """Test the shared backend against a Redis-protocol stand-in."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    from app.rate_limit import RedisRateLimiter
+
+    limiter = RedisRateLimiter(
+        None,
+        fallback=InMemoryRateLimiter(),
+        prefix="test:",
+        client=fakeredis.FakeAsyncRedis(),
+    )
+    keys = [("ip:1", RULE)]
+    assert asyncio.run(limiter.acquire(keys, 6)) == 0
+    assert asyncio.run(limiter.acquire(keys, 6)) > 0
+    assert _client(limiter).post("/auth/login").status_code == 200  # Awaited
+
+
+class FlakyRedis:
+    """Client whose script calls fail while `down` is set."""
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    def register_script(self, script):
+        import redis
+
+        async def call(keys, args):
+            self.calls += 1
+            if self.down:
+                raise redis.ConnectionError("unreachable")
+            return "0"
+
+        return call
+
+
+def test_redis_outage_backs_off_to_fallback(caplog):
+    """Test a Redis failure switches to local buckets for the retry window, logged once."""
+    pytest.importorskip("redis")
+    from app.rate_limit import RedisRateLimiter
+
+    clock = FakeClock()
+    client = FlakyRedis()
+    fallback = InMemoryRateLimiter(clock=clock)
+    limiter = RedisRateLimiter(
+        None, fallback=fallback, retry_seconds=30, client=client, clock=clock
+    )
+    keys = [("ip:1", RULE)]
+
+    with caplog.at_level("WARNING", logger="app.rate_limit"):
+        for _ in range(3):
+            asyncio.run(limiter.acquire(keys, 1))
+    assert client.calls == 1
+    assert len(caplog.records) == 1
+    assert "ip:1" in fallback._buckets
+
+    clock.now += 31
+    asyncio.run(limiter.acquire(keys, 1))  # Probe fails; back off again
+    assert client.calls == 2
+    assert len(caplog.records) == 1
+
+    client.down = False
+    clock.now += 31
+    assert asyncio.run(limiter.acquire(keys, 1)) == 0
+    assert asyncio.run(limiter.acquire(keys, 1)) == 0
+    assert client.calls == 4
@@ -0,0 +1,135 @@
+"""Tests for recurring-transaction detection."""
+import pytest
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from dateutil.relativedelta import relativedelta
+from app.models import RecurringSeries, Transaction, User
+from app.services.recurring_service import (
+    amount_matches,
+    backfill_user,
+    classify_interval,
+    get_recurring_series,
+    normalize_merchant,
+    observe,
+)
+from app.services.transaction_service import create_transaction
+from app.schemas import TransactionCreate
+
+
+def test_normalize_merchant():
+    """Test varying reference numbers and noise words don't split a merchant."""
+    assert normalize_merchant("POS DEBIT NETFLIX.COM #4821") == "netflix com"
+    assert normalize_merchant("Netflix.com 0917") == "netflix com"
+    assert normalize_merchant("1234 #") == ""
+    assert normalize_merchant(None) == ""
+
+
+def test_classify_interval_and_amounts():
+    """Test cadence ranges and amount tolerance."""
+    assert classify_interval(7) == "weekly"
+    assert classify_interval(28) == "monthly"
+    assert classify_interval(31) == "monthly"
+    assert classify_interval(365) == "annual"
+    assert classify_interval(15) is None
+    assert amount_matches(15.49, 15.99)
+    assert not amount_matches(15.49, 25.00)
+    assert amount_matches(2.00, 2.90)  # Absolute floor for small amounts
+
+
+def _series(when: datetime) -> RecurringSeries:
+    return RecurringSeries(
+        merchant_key="spotify",
+        category="entertainment",
+        amount=9.99,
+        cadence=None,
+        cadence_streak=0,
+        occurrence_count=1,
+        is_recurring=False,
+        last_date=when,
+    )
+
+
+def test_observe_marks_recurring_after_two_intervals():
+    """Test a series becomes recurring on its third on-cadence occurrence."""
+    start = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    series = _series(start)
+    assert observe(series, 9.99, start + relativedelta(months=1)) is False
+    assert observe(series, 10.99, start + relativedelta(months=2)) is True
+    assert series.cadence == "monthly"
+    assert series.next_expected_date == start + relativedelta(months=3)
+    assert series.amount == pytest.approx((9.99 + 9.99 + 10.99) / 3)
+
+    # A back-dated duplicate joins the series without moving its schedule
+    assert observe(series, 9.99, start + timedelta(days=3)) is False
+    assert series.last_date == start + relativedelta(months=2)
+    assert series.occurrence_count == 4
+
+
+def test_observe_irregular_intervals_do_not_qualify():
+    """Test merchants visited at irregular intervals are not recurring."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    series = _series(start)
+    for days in (3, 12, 40, 45, 47):
+        observe(series, 9.99, start + timedelta(days=days))
+    assert not series.is_recurring
+
+
+def _create(db: Session, user: User, description: str, amount: float, when: datetime):
+    return create_transaction(
+        db,
+        user.id,
+        TransactionCreate(
+            amount=amount,
+            category="utilities",
+            description=description,
+            transaction_date=when,
+        ),
+    )
+
+
+def test_incremental_detection_flags_earlier_rows(db_session: Session, test_user: User):
+    """Test the third monthly charge marks the whole series recurring."""
+    start = datetime(2024, 1, 5, tzinfo=timezone.utc)
+    first = _create(db_session, test_user, "CITY POWER #001", 80.0, start)
+    _create(db_session, test_user, "Grocer", 35.0, start + timedelta(days=2))
+    _create(
+        db_session, test_user, "CITY POWER #002", 84.0, start + relativedelta(months=1)
+    )
+    assert not first.is_recurring
+    third = _create(
+        db_session, test_user, "CITY POWER #003", 78.0, start + relativedelta(months=2)
+    )
+    db_session.commit()
+
+    assert third.is_recurring
+    db_session.refresh(first)
+    assert first.is_recurring
+    [series] = get_recurring_series(db_session, test_user.id)
+    assert series.cadence == "monthly"
+    assert series.occurrence_count == 3
+    assert series.next_expected_date == start + relativedelta(months=3)
+
+
+def test_backfill_matches_incremental(db_session: Session, test_user: User):
+    """Test the batch backfill rebuilds the same series from history."""
+    start = datetime(2023, 1, 2, tzinfo=timezone.utc)
+    for week in range(6):
+        _create(db_session, test_user, "Gym", 12.0, start + timedelta(weeks=week))
+    db_session.commit()
+    incremental = [
+        (s.merchant_key, s.cadence, s.occurrence_count)
+        for s in get_recurring_series(db_session, test_user.id)
+    ]
+
+    assert backfill_user(db_session, test_user.id) == 1
+    db_session.commit()
+    rebuilt = get_recurring_series(db_session, test_user.id)
+    assert [(s.merchant_key, s.cadence, s.occurrence_count) for s in rebuilt] == (
+        incremental
+    )
+    linked = (
+        db_session.query(Transaction)
+        .filter(Transaction.recurring_series_id == rebuilt[0].id)
+        .count()
+    )
+    assert linked == 6
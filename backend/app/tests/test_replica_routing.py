@@ -0,0 +1,75 @@
+"""Tests for read-replica routing decisions."""
+import pytest
+from app.database import ReplicaRouter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_router(clock, lags):
+    """Router whose probe returns successive values from `lags` (or raises)."""
+    lags = iter(lags)
+
+    def probe():
+        lag = next(lags)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    return ReplicaRouter(
+        probe=probe,
+        max_lag_seconds=5,
+        sticky_seconds=10,
+        check_interval=2,
+        clock=clock,
+    )
+
+
+def test_reads_use_healthy_replica(clock):
+    """Test reads go to a caught-up replica."""
+    router = make_router(clock, [0.0])
+    assert router.use_replica("user-1")
+
+
+def test_read_your_writes_stickiness(clock):
+    """Test a user's reads stay on the primary right after their write."""
+    router = make_router(clock, [0.0, 0.0])
+    router.record_write("user-1")
+    assert not router.use_replica("user-1")
+    assert router.use_replica("user-2")
+
+    clock.now += 11
+    assert router.use_replica("user-1")
+
+
+def test_lagging_replica_falls_back(clock):
+    """Test a lagging replica is skipped until it catches up."""
+    router = make_router(clock, [30.0, 1.0])
+    assert not router.use_replica("user-1")
+
+    # Verdict is cached within the check interval
+    clock.now += 1
+    assert not router.use_replica("user-1")
+
+    clock.now += 2
+    assert router.use_replica("user-1")
+
+
+def test_unreachable_replica_falls_back(clock):
+    """Test probe failures route reads to the primary."""
+    router = make_router(clock, [ConnectionError("down"), 0.0])
+    assert not router.use_replica("user-1")
+    clock.now += 3
+    assert router.use_replica("user-1")
@@ -0,0 +1,51 @@
+"""Tests for the fast JSON response helpers."""
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List
+from app.responses import dump_json, model_response, rows_response, type_adapter
+from app.schemas import TransactionRead
+import uuid
+
+Row = namedtuple("Row", list(TransactionRead.model_fields))
+
+
+def make_row(**overrides) -> Row:
+    values = dict(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        receipt_id=None,
+        amount=12.0,
+        category="food",
+        description="Lunch",
+        transaction_date=datetime(2024, 1, 15, 12, 30, tzinfo=timezone.utc),
+        is_recurring=False,
+        created_at=datetime(2024, 1, 15, 14, 30, tzinfo=timezone(timedelta(hours=2))),
+    )
+    values.update(overrides)
+    return Row(**values)
+
+
+def test_rows_response_matches_response_model_output():
+    """Test direct row serialization produces the same JSON as TransactionRead."""
+    rows = [make_row(), make_row(receipt_id=uuid.uuid4(), amount=3.25)]
+    body = rows_response(rows).body
+    expected = type_adapter(List[TransactionRead]).dump_json(
+        [TransactionRead(**row._asdict()) for row in rows]
+    )
+    assert json.loads(body) == json.loads(expected)
+    assert b'"2024-01-15T12:30:00Z"' in body
+
+
+def test_model_response_from_attributes():
+    """Test ORM-style objects are validated from attributes and serialized."""
+    row = make_row()
+    response = model_response(List[TransactionRead], [row])
+    assert response.media_type == "application/json"
+    assert json.loads(response.body)[0]["id"] == str(row.id)
+
+
+def test_type_adapter_cached_and_dump_json():
+    assert type_adapter(List[TransactionRead]) is type_adapter(List[TransactionRead])
+    model = TransactionRead(**make_row()._asdict())
+    assert json.loads(dump_json({"items": [model]}))["items"][0]["category"] == "food"
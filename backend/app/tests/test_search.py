@@ -0,0 +1,64 @@
+"""Tests for full-text search."""
+from sqlalchemy.orm import Session
+from datetime import datetime
+from app.models import User, Receipt
+from app.services.search_service import (
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    render_snippet,
+    search,
+)
+from app.services.transaction_service import create_transaction
+from app.schemas import TransactionCreate
+import uuid
+
+
+def test_search_ranks_and_filters(db_session: Session, test_user: User):
+    """Test search matches OCR text and combines with amount filters."""
+    db_session.add(
+        Receipt(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            image_path="receipts/test.jpg",
+            vendor="THE HOME DEPOT",
+            purchase_date=datetime(2024, 4, 12),
+            total_amount=86.40,
+            category="retail",
+            raw_ocr_text="THE HOME DEPOT\n<img src=x onerror=alert(1)>\n"
+            "PAINT ROLLER 12.99\nDRYWALL SCREWS 8.49",
+        )
+    )
+    db_session.commit()
+    create_transaction(
+        db_session,
+        test_user.id,
+        TransactionCreate(
+            amount=4.50,
+            category="restaurant",
+            description="Coffee near home",
+            transaction_date=datetime(2024, 4, 13),
+        ),
+    )
+
+    results = search(db_session, test_user.id, "drywall screws")
+    assert len(results.results) == 1
+    assert results.results[0].kind == "receipt"
+    assert "<b>" in results.results[0].snippet
+    assert "<img" not in results.results[0].snippet
+
+    results = search(db_session, test_user.id, "home")
+    assert {r.kind for r in results.results} == {"receipt", "transaction"}
+
+    results = search(db_session, test_user.id, "home", max_amount=10)
+    assert [r.kind for r in results.results] == ["transaction"]
+
+
+def test_render_snippet_escapes_text_but_keeps_highlights():
+    """Test stored text cannot inject markup into snippets."""
+    headline = (
+        f"<script>alert('x')</script> {HIGHLIGHT_START}Drywall{HIGHLIGHT_STOP} & <b>"
+    )
+    assert render_snippet(headline) == (
+        "&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt; <b>Drywall</b> &amp; &lt;b&gt;"
+    )
+    assert render_snippet(None) is None
@@ -0,0 +1,170 @@
+"""Tests for streaming sketches and sketch-backed analytics."""
+import bisect
+import random
+import uuid
+import pytest
+from collections import Counter
+from datetime import date, datetime, timezone
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import User
+from app.routers.analytics import platform_scope
+from app.services.sketches import HyperLogLog, SpaceSaving, TDigest
+from app.services.sketch_service import (
+    PLATFORM_SCOPE,
+    SketchBuffer,
+    flush_sketches,
+    get_amount_percentiles,
+    get_distinct_vendors,
+    get_top_vendors,
+    month_bucket,
+    sketch_buffer,
+)
+from app.services.transaction_service import create_transaction
+from app.schemas import TransactionCreate
+
+
+def _zipf_stream(n: int, vendors: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = [f"v{i}" for i in range(vendors)]
+    return rng.choices(names, [1 / (r + 1) for r in range(vendors)], k=n)
+
+
+def test_space_saving_bounds_and_merge():
+    """Test heavy hitters are found and counts respect the documented bound."""
+    stream = _zipf_stream(20000, 2000)
+    exact = Counter(stream)
+    halves = SpaceSaving(50), SpaceSaving(50)
+    for i, item in enumerate(stream):
+        halves[i % 2].add(item)
+    merged = SpaceSaving.from_bytes(halves[0].to_bytes()).merge(halves[1])
+
+    assert merged.total == len(stream)
+    bound = len(stream) / 50  # N/k
+    for item, count, error in merged.top(50):
+        assert count >= exact[item]
+        assert count - error <= exact[item]
+        assert error <= bound
+    reported = {item for item, _, _ in merged.top(50)}
+    assert {item for item, n in exact.items() if n > bound} <= reported
+
+
+def test_tdigest_quantiles_and_merge():
+    """Test percentile rank error stays well under 1% after merging."""
+    rng = random.Random(1)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    parts = [TDigest() for _ in range(4)]
+    for i, value in enumerate(values):
+        parts[i % 4].add(value)
+    merged = TDigest()
+    for part in parts:
+        merged.merge(TDigest.from_bytes(part.to_bytes()))
+
+    ordered = sorted(values)
+    assert merged.count == len(values)
+    assert (merged.min, merged.max) == (ordered[0], ordered[-1])
+    for q in (0.01, 0.5, 0.9, 0.99):
+        rank = bisect.bisect_left(ordered, merged.quantile(q)) / len(ordered)
+        assert abs(rank - q) < 0.005
+    assert TDigest().quantile(0.5) is None
+
+
+def test_hyperloglog_estimate_and_merge():
+    """Test distinct estimates within a few standard errors, small and large."""
+    small = HyperLogLog()
+    small.add_all(f"v{i}" for i in range(10))
+    assert round(small.estimate()) == 10
+
+    a, b = HyperLogLog(), HyperLogLog()
+    a.add_all(f"v{i}" for i in range(30000))
+    b.add_all(f"v{i}" for i in range(20000, 50000))  # Overlaps a
+    merged = HyperLogLog.from_bytes(a.to_bytes()).merge(b)
+    assert abs(merged.estimate() - 50000) / 50000 < 4 * merged.relative_error
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(10))
+
+
+def test_buffer_scopes_drain_and_restore():
+    """Test events land in user and platform scopes and survive a failed flush."""
+    buffer = SketchBuffer()
+    user_id = uuid.uuid4()
+    when = datetime(2024, 3, 31, 23, 0, tzinfo=timezone.utc)
+    buffer.add_amount(user_id, when, 12.5)
+    buffer.add_vendor(user_id, when, "  Blue  Bottle ")
+    buffer.add_vendor(user_id, when, "")  # Ignored
+
+    bucket = month_bucket(when)
+    assert bucket == date(2024, 3, 1)
+    [vendors] = buffer.pending(PLATFORM_SCOPE, "vendors", bucket, bucket)
+    assert vendors.top(1) == [("blue bottle", 1.0, 0.0)]
+    assert len(buffer) == 6  # 3 kinds x 2 scopes
+
+    deltas = buffer.drain()
+    assert len(buffer) == 0
+    buffer.add_amount(user_id, when, 7.5)
+    buffer.restore(deltas)
+    [amounts] = buffer.pending(str(user_id), "amounts", bucket, bucket)
+    assert amounts.count == 2
+
+
+def test_platform_scope_requires_opt_in(monkeypatch):
+    """Test scope=platform is refused unless the operator enables it."""
+    assert platform_scope("user") is False
+    with pytest.raises(HTTPException) as exc:
+        platform_scope("platform")
+    assert exc.value.status_code == 403
+
+    monkeypatch.setattr(settings, "SKETCH_PLATFORM_SCOPE_ENABLED", True)
+    assert platform_scope("platform") is True
+
+
+@pytest.fixture
+def db_session(db_session: Session):
+    """Shared session; also drops sketch deltas the test left buffered."""
+    yield db_session
+    sketch_buffer.drain()
+
+
+def test_committed_transactions_reach_persisted_sketches(
+    db_session: Session, test_user: User
+):
+    """Test ingest -> buffer -> flush -> merged read across months."""
+    now = datetime.now(timezone.utc)
+    for amount in (10.0, 20.0, 30.0):
+        create_transaction(
+            db_session,
+            test_user.id,
+            TransactionCreate(amount=amount, category="food", transaction_date=now),
+        )
+    db_session.commit()
+    # Rolled back writes never reach the sketches
+    create_transaction(
+        db_session,
+        test_user.id,
+        TransactionCreate(amount=999.0, category="food", transaction_date=now),
+    )
+    db_session.rollback()
+
+    assert flush_sketches(db_session) > 0
+    result = get_amount_percentiles(db_session, test_user.id, [0.5], months=2)
+    assert result.count == 3
+    assert result.max == 30.0
+    assert get_top_vendors(db_session, test_user.id).vendors == []
+    assert get_distinct_vendors(db_session, test_user.id).estimate == 0
+
+
+def test_platform_top_vendors_withhold_rare_vendors(
+    db_session: Session, test_user: User, monkeypatch
+):
+    """Test platform-wide vendors below the minimum count are not listed."""
+    monkeypatch.setattr(settings, "SKETCH_PLATFORM_MIN_VENDOR_COUNT", 5)
+    now = datetime.now(timezone.utc)
+    for vendor, receipts in (("whole foods", 8), ("dr. smith dental", 2)):
+        for _ in range(receipts):
+            sketch_buffer.add_vendor(uuid.uuid4(), now, vendor)
+
+    platform = get_top_vendors(db_session, test_user.id, platform=True)
+    assert [v.vendor for v in platform.vendors] == ["whole foods"]
+    assert platform.total_receipts == 10
+    assert platform.guaranteed_above >= 5
@@ -0,0 +1,89 @@
+"""Tests for the per-request SQL profiler."""
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.logging_config import AccessLogMiddleware
+from app.sql_profiler import (
+    QueryProfile,
+    SQLProfilerMiddleware,
+    profile_engine,
+    statement_shape,
+)
+
+
+def test_statement_shape_collapses_parameter_lists():
+    """Test IN lists and multi-row VALUES of any length share one shape."""
+    assert statement_shape(
+        "SELECT * FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND x = %(x)s"
+    ) == statement_shape("SELECT * FROM t WHERE id IN (%(id_1_1)s)  AND x = %(x)s")
+    assert (
+        statement_shape("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)")
+        == "INSERT INTO t (a, b) VALUES (?)"
+    )
+    assert statement_shape("SELECT x::date FROM t") == "SELECT x::date FROM t"
+
+
+def test_profile_keeps_slowest_and_flags_repeats():
+    """Test the slowest statements are kept and repeated shapes flagged."""
+    profile = QueryProfile(keep=2, repeat_threshold=3)
+    for i in range(4):
+        profile.record(f"SELECT * FROM budgets WHERE id = %(id_{i})s", 0.001)
+    profile.record("SELECT big", 0.5)
+    profile.record("SELECT medium", 0.1)
+
+    assert profile.count == 6
+    assert profile.repeated() == [("SELECT * FROM budgets WHERE id = ?", 4)]
+    fields = profile.log_fields()
+    assert [s["statement"] for s in fields["db_slowest"]] == [
+        "SELECT big",
+        "SELECT medium",
+    ]
+    assert fields["db_n_plus_one"][0]["count"] == 4
+    assert 'desc="6 queries"' in profile.server_timing()
+    assert "db-repeats" in profile.server_timing()
+
+
+def test_middleware_reports_header_and_access_log():
+    """Test the Server-Timing header and the forced access-log entry for N+1."""
+    engine = create_engine("sqlite://")
+    profile_engine(engine)
+    app = FastAPI()
+
+    @app.get("/budgets")
+    def budgets():
+        with engine.connect() as conn:
+            for i in range(6):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return []
+
+    @app.get("/single")
+    def single():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {}
+
+    app.add_middleware(SQLProfilerMiddleware, keep=3, repeat_threshold=5)
+    app.add_middleware(AccessLogMiddleware, sample_rate=0.0)
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("app.access")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        client = TestClient(app)
+        response = client.get("/single")
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert 'desc="1 queries"' in response.headers["server-timing"]
+        assert records == []  # Sampled out
+
+        response = client.get("/budgets")
+        assert "db-repeats" in response.headers["server-timing"]
+        (record,) = records
+        assert record.db_queries == 6
+        assert record.db_n_plus_one == [{"count": 6, "statement": "SELECT ?"}]
+        assert record.sampled is False
+    finally:
+        logger.removeHandler(handler)
@@ -0,0 +1,79 @@
+"""Tests for time-series analytics."""
+import pytest
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+from app.models import User
+from app.services.timeseries_service import (
+    bucket_starts,
+    count_buckets,
+    get_timeseries,
+    truncate,
+)
+from app.services.transaction_service import create_transaction
+from app.schemas import TransactionCreate
+
+
+def test_truncate():
+    """Test bucket starts match Postgres date_trunc (Monday weeks)."""
+    assert truncate(date(2024, 3, 14), "day") == date(2024, 3, 14)
+    assert truncate(date(2024, 3, 14), "week") == date(2024, 3, 11)
+    assert truncate(date(2024, 3, 14), "month") == date(2024, 3, 1)
+
+
+def test_bucket_starts_are_dense():
+    """Test buckets cover the range without gaps, across year boundaries."""
+    assert bucket_starts(date(2023, 11, 20), date(2024, 2, 1), "month") == [
+        date(2023, 11, 1),
+        date(2023, 12, 1),
+        date(2024, 1, 1),
+        date(2024, 2, 1),
+    ]
+    weeks = bucket_starts(date(2024, 1, 3), date(2024, 1, 29), "week")
+    assert weeks[0] == date(2024, 1, 1) and weeks[-1] == date(2024, 1, 29)
+    assert all(b - a == timedelta(days=7) for a, b in zip(weeks, weeks[1:]))
+
+
+def test_count_buckets_matches_bucket_starts():
+    """Test the cheap size check agrees with the generated buckets."""
+    start = date(2022, 12, 31)
+    for days in (0, 1, 6, 7, 30, 400):
+        end = start + timedelta(days=days)
+        for granularity in ("day", "week", "month"):
+            assert count_buckets(start, end, granularity) == len(
+                bucket_starts(start, end, granularity)
+            )
+
+
+def test_timeseries_gap_fill_timezone_and_compare(db_session: Session, test_user: User):
+    """Test dense daily buckets in the caller's timezone with a comparison."""
+    for when, amount in [
+        # 2024-03-02 03:00 UTC is still March 1st in New York
+        (datetime(2024, 3, 2, 3, 0, tzinfo=timezone.utc), 10.0),
+        (datetime(2024, 3, 3, 15, 0, tzinfo=timezone.utc), 5.0),
+        # Previous period (Feb 27 - Feb 29)
+        (datetime(2024, 2, 28, 15, 0, tzinfo=timezone.utc), 30.0),
+    ]:
+        create_transaction(
+            db_session,
+            test_user.id,
+            TransactionCreate(amount=amount, category="gas", transaction_date=when),
+        )
+
+    series = get_timeseries(
+        db_session,
+        test_user.id,
+        date(2024, 3, 1),
+        date(2024, 3, 3),
+        granularity="day",
+        timezone="America/New_York",
+        compare=True,
+    )
+    assert [(p.period_start.day, p.total_amount) for p in series.current.points] == [
+        (1, 10.0),
+        (2, 0.0),
+        (3, 5.0),
+    ]
+    assert series.previous.start == date(2024, 2, 27)
+    assert series.previous.total_amount == 30.0
+    assert series.change_amount == -15.0
+    assert series.change_pct == pytest.approx(-50.0)
@@ -4,31 +4,14 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.main import app
-from app.database import get_db, Base, engine
+from app.database import get_db, get_db_readonly
 from app.models import User
 from app.services.transaction_service import (
     create_transaction,
     get_transactions,
     delete_transaction,
 )
-from app.services.user_service import create_user
-from app.schemas import TransactionCreate, UserCreate
-
-
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a test database session."""
-    Base.metadata.create_all(bind=engine)
-    db = next(get_db())
-    yield db
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture
-def test_user(db_session: Session):
-    """Create a test user."""
-    user_create = UserCreate(email="test@example.com", password="testpass123")
-    return create_user(db_session, user_create)
+from app.schemas import TransactionCreate
 
 
 @pytest.fixture
@@ -39,6 +22,7 @@ def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_readonly] = override_get_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -89,3 +73,22 @@ def test_delete_transaction(db_session: Session, test_user: User):
     # Verify deletion
     transactions = get_transactions(db_session, test_user.id)
     assert len(transactions) == 0
+
+
+def test_list_transactions_field_selection(client, db_session: Session, test_user: User):
+    """Test the fields= parameter returns only the requested columns."""
+    from app.routers.auth import get_current_principal
+
+    create_transaction(
+        db_session,
+        test_user.id,
+        TransactionCreate(amount=12.0, category="gas", transaction_date=datetime.now()),
+    )
+    app.dependency_overrides[get_current_principal] = lambda: test_user
+
+    response = client.get("/transactions", params={"fields": "amount,category"})
+    assert response.status_code == 200
+    assert response.json()[0].keys() == {"id", "amount", "category"}
+
+    response = client.get("/transactions", params={"fields": "password_hash"})
+    assert response.status_code == 400
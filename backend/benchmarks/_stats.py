@@ -0,0 +1,7 @@
+"""Summary statistics shared by the benchmarks."""
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Return the pct-th percentile of samples (seconds), in milliseconds."""
+    ordered = sorted(samples)
+    return round(ordered[max(0, int(len(ordered) * pct) - 1)] * 1000, 2)
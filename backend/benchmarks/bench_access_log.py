@@ -0,0 +1,145 @@
+"""
+Benchmark per-request overhead of request logging middleware.
+
+Drives a one-route Starlette app directly over ASGI (no server, no
+socket) and reports mean microseconds per request for: no logging
+middleware; the previous Rich console middleware (two `console.print`
+calls per request inside BaseHTTPMiddleware); and AccessLogMiddleware
+with JSON records handed to a QueueListener, at several sample rates.
+Console and JSON output both go to /dev/null, so terminal rendering
+speed is not part of the numbers and Rich's cost is a lower bound.
+
+Usage (from backend/):
+    python -m benchmarks.bench_access_log --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from rich.console import Console
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app.logging_config import AccessLogMiddleware, DroppingQueueHandler, JsonFormatter
+
+
+def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def make_app() -> Starlette:
+    return Starlette(routes=[Route("/ok", endpoint)])
+
+
+def rich_console_app(console: Console) -> Starlette:
+    """The request logging main.py used before structured logs."""
+    app = make_app()
+
+    async def log_requests(request, call_next):
+        start_time = time.time()
+        console.print(f"[cyan]→ {request.method} {request.url.path}[/cyan]")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        console.print(
+            f"[green]← {response.status_code} {request.method} {request.url.path}[/green] "
+            f"[dim]({process_time:.3f}s)[/dim]"
+        )
+        return response
+
+    app.add_middleware(BaseHTTPMiddleware, dispatch=log_requests)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    """Mean seconds per request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ok",
+        "raw_path": b"/ok",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        # Yield like a real server: BaseHTTPMiddleware polls receive() for a
+        # disconnect concurrently, which would otherwise spin the loop
+        await asyncio.sleep(0)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(requests, 500)):  # Warm-up
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def run(requests: int) -> dict:
+    devnull = open(os.devnull, "w")
+    output = logging.StreamHandler(devnull)
+    output.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(1_000_000)
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    root = logging.getLogger()
+    handler = DroppingQueueHandler(log_queue)
+    root.handlers[:] = [handler]
+    root.setLevel(logging.INFO)
+
+    variants = {
+        "none": make_app(),
+        "rich_console": rich_console_app(Console(file=devnull, force_terminal=True)),
+    }
+    for rate in (0.0, 0.1, 1.0):
+        variants[f"json_sampled_{rate:g}"] = AccessLogMiddleware(
+            make_app(), sample_rate=rate, slow_ms=float("inf")
+        )
+
+    try:
+        timings = {
+            name: asyncio.run(drive(app, requests)) for name, app in variants.items()
+        }
+    finally:
+        listener.stop()
+        devnull.close()
+    baseline = timings["none"]
+    return {
+        "requests": requests,
+        "us_per_request": {k: round(v * 1e6, 1) for k, v in timings.items()},
+        "overhead_us": {
+            k: round((v - baseline) * 1e6, 1) for k, v in timings.items() if k != "none"
+        },
+        "dropped_records": handler.dropped,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.requests)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
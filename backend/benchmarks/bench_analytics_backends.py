@@ -0,0 +1,170 @@
+"""
+Benchmark Postgres vs the DuckDB columnar store for analytics aggregations.
+
+Seeds a synthetic dataset (10M transactions by default) directly in
+Postgres with generate_series, builds the Parquet snapshot, then times
+monthly and category aggregations over 12/24/60-month windows on both
+backends for a sample of users.
+
+Usage (from backend/):
+    python -m benchmarks.bench_analytics_backends --rows 10000000 --users 5000
+    python -m benchmarks.bench_analytics_backends --skip-seed --output results.json
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.services.analytics_backends import (
+    ColumnarStore,
+    DuckDBAnalyticsBackend,
+    PostgresAnalyticsBackend,
+)
+
+CATEGORIES = [
+    "groceries",
+    "restaurant",
+    "gas",
+    "pharmacy",
+    "retail",
+    "utilities",
+    "transportation",
+    "other",
+]
+
+SEED_USERS = """
+INSERT INTO users (id, email, password_hash)
+SELECT md5('bench-user-' || g)::uuid, 'bench-' || g || '@example.com', 'x'
+FROM generate_series(1, :users) AS g
+ON CONFLICT DO NOTHING
+"""
+
+# Amounts are log-normal-ish, dates uniform over five years
+SEED_TRANSACTIONS = """
+INSERT INTO transactions
+    (id, user_id, amount, category, description, transaction_date, is_recurring)
+SELECT
+    md5(random()::text || g)::uuid,
+    md5('bench-user-' || (1 + g % :users))::uuid,
+    round((exp(random() * 5))::numeric, 2),
+    (:categories)[1 + (g % :n_categories)],
+    'bench',
+    now() - random() * interval '1825 days',
+    false
+FROM generate_series(1, :rows) AS g
+"""
+
+
+def seed(engine, rows: int, users: int) -> None:
+    """Bulk-load synthetic users and transactions server-side."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(SEED_USERS), {"users": users})
+        conn.execute(
+            text(SEED_TRANSACTIONS),
+            {
+                "users": users,
+                "rows": rows,
+                "categories": CATEGORIES,
+                "n_categories": len(CATEGORIES),
+            },
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE transactions"))
+
+
+def time_calls(fn, repeat: int) -> dict:
+    """Time repeated calls of fn and summarize latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)], 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--sample-users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--store-dir", default=None)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(engine, args.rows, args.users)
+        print(f"Seeded {args.rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+    store = ColumnarStore(args.store_dir or tempfile.mkdtemp(), engine)
+    started = time.perf_counter()
+    store.refresh(full=True)
+    print(f"Built columnar snapshot in {time.perf_counter() - started:.1f}s")
+
+    backends = [
+        PostgresAnalyticsBackend(),
+        DuckDBAnalyticsBackend(store, max_staleness_seconds=float("inf")),
+    ]
+    db = sessionmaker(bind=engine)()
+    user_ids = [
+        row[0]
+        for row in db.execute(
+            text("SELECT id FROM users WHERE email LIKE 'bench-%' LIMIT :n"),
+            {"n": args.sample_users},
+        )
+    ]
+
+    results = []
+    end_date = datetime.now()
+    for months in (12, 24, 60):
+        start_date = end_date - relativedelta(months=months)
+        for backend in backends:
+            for method in ("monthly_totals", "category_totals"):
+
+                def run():
+                    for user_id in user_ids:
+                        getattr(backend, method)(db, user_id, start_date, end_date)
+
+                stats = time_calls(run, args.repeat)
+                per_user = {k: round(v / len(user_ids), 3) for k, v in stats.items()}
+                results.append(
+                    {
+                        "months": months,
+                        "backend": backend.name,
+                        "query": method,
+                        **per_user,
+                    }
+                )
+                print(
+                    f"{months:>3}mo  {backend.name:<8} {method:<16} "
+                    f"p50 {per_user['p50_ms']:>8.3f} ms/user  "
+                    f"p95 {per_user['p95_ms']:>8.3f} ms/user"
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"rows": args.rows, "users": args.users, "results": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark per-request authentication overhead.
+
+Creates (or reuses) a benchmark user, mints an access token and times the
+auth dependencies the way FastAPI calls them for each request:
+
+- uncached:  JWT decode + SELECT of the full ORM User on every call
+- principal: cached token -> Principal (no decode, no query)
+- user:      cached Principal + ORM User load (endpoints needing `User`)
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth --requests 20000
+    python -m benchmarks.bench_auth --output results.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import timedelta
+from app.database import Base, SessionLocal, engine
+from app.routers.auth import (
+    create_access_token,
+    get_current_principal,
+    get_current_user,
+)
+from app.schemas import UserCreate
+from app.services.auth_cache import principal_cache
+from app.services.user_service import create_user, get_user_by_email
+
+BENCH_EMAIL = "bench-auth@example.com"
+
+
+def summarize(samples: list) -> dict:
+    """Summarize latency samples (seconds) in microseconds."""
+    samples = sorted(s * 1_000_000 for s in samples)
+    return {
+        "p50_us": round(statistics.median(samples), 1),
+        "p99_us": round(samples[max(0, int(len(samples) * 0.99) - 1)], 1),
+        "mean_us": round(statistics.fmean(samples), 1),
+    }
+
+
+async def run_scenarios(token: str, n: int) -> dict:
+    """Time each auth scenario over n simulated requests."""
+
+    async def uncached(db):
+        principal_cache.clear()
+        principal = await get_current_principal(token, db)
+        return await get_current_user(principal, db)
+
+    async def principal(db):
+        return await get_current_principal(token, db)
+
+    async def user(db):
+        return await get_current_user(await get_current_principal(token, db), db)
+
+    results = {}
+    for name, fn in (("uncached", uncached), ("principal", principal), ("user", user)):
+        samples = []
+        for _ in range(n):
+            # Each request gets its own session, as with the get_db dependency
+            db = SessionLocal()
+            start = time.perf_counter()
+            await fn(db)
+            samples.append(time.perf_counter() - start)
+            db.close()
+        results[name] = summarize(samples)
+        stats = results[name]
+        print(
+            f"{name:<10} p50 {stats['p50_us']:>8.1f} us  "
+            f"p99 {stats['p99_us']:>8.1f} us  mean {stats['mean_us']:>8.1f} us"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = get_user_by_email(db, BENCH_EMAIL)
+        if user is None:
+            user = create_user(db, UserCreate(email=BENCH_EMAIL, password="benchpass123"))
+            db.commit()
+        token = create_access_token({"sub": str(user.id)}, timedelta(hours=1))
+
+    results = asyncio.run(run_scenarios(token, args.requests))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"requests": args.requests, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
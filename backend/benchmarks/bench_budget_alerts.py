@@ -0,0 +1,140 @@
+"""
+Benchmark the nightly budget alert run.
+
+Seeds synthetic users (100k by default), each with a few category budgets
+and a month of transactions, directly in Postgres with generate_series,
+then times the full batched evaluation and compares it with the old
+per-budget query loop on a sample of users.
+
+Usage (from backend/):
+    python -m benchmarks.bench_budget_alerts --users 100000
+    python -m benchmarks.bench_budget_alerts --skip-seed --output results.json
+"""
+import argparse
+import io
+import json
+import time
+from datetime import datetime
+from sqlalchemy import and_, create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.jobs.budget_alerts import run
+from app.models import Budget, Transaction
+from benchmarks.bench_analytics_backends import CATEGORIES, SEED_USERS
+
+BUDGETS_PER_USER = 4
+
+SEED_BUDGETS = """
+INSERT INTO budgets (id, user_id, category, monthly_limit)
+SELECT
+    md5('bench-budget-' || u || '-' || c)::uuid,
+    md5('bench-user-' || u)::uuid,
+    (:categories)[c],
+    50 + (u * 7 + c * 13) % 400
+FROM generate_series(1, :users) AS u, generate_series(1, :per_user) AS c
+ON CONFLICT DO NOTHING
+"""
+
+# About 20 transactions per user this month, spread over budgeted categories
+SEED_TRANSACTIONS = """
+INSERT INTO transactions
+    (id, user_id, amount, category, description, transaction_date, is_recurring)
+SELECT
+    md5(random()::text || g)::uuid,
+    md5('bench-user-' || (1 + g % :users))::uuid,
+    round((random() * 40)::numeric, 2),
+    (:categories)[1 + (g % :per_user)],
+    'bench',
+    date_trunc('month', now()) + random() * (now() - date_trunc('month', now())),
+    false
+FROM generate_series(1, :users * 20) AS g
+"""
+
+
+def seed(engine, users: int) -> None:
+    """Bulk-load users, budgets and this month's transactions server-side."""
+    Base.metadata.create_all(bind=engine)
+    params = {
+        "users": users,
+        "per_user": BUDGETS_PER_USER,
+        "categories": CATEGORIES,
+    }
+    with engine.begin() as conn:
+        conn.execute(text(SEED_USERS), params)
+        conn.execute(text(SEED_BUDGETS), params)
+        conn.execute(text(SEED_TRANSACTIONS), params)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def per_budget_loop(db, user_id) -> None:
+    """The previous N+1 evaluation, kept for comparison."""
+    now = datetime.now()
+    month_start = datetime(now.year, now.month, 1)
+    for budget in db.query(Budget).filter(Budget.user_id == user_id).all():
+        db.query(func.sum(Transaction.amount)).filter(
+            and_(
+                Transaction.user_id == user_id,
+                Transaction.category == budget.category,
+                Transaction.transaction_date >= month_start,
+                Transaction.transaction_date <= now,
+            )
+        ).scalar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--batch-users", type=int, default=1000)
+    parser.add_argument("--sample-users", type=int, default=1000)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(engine, args.users)
+        print(f"Seeded {args.users:,} users in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    alerts = run(io.StringIO(), 0.8, args.batch_users)
+    batched_s = time.perf_counter() - started
+    print(f"Batched run: {alerts:,} alerts in {batched_s:.1f}s")
+
+    db = sessionmaker(bind=engine)()
+    user_ids = [
+        row[0]
+        for row in db.execute(
+            text("SELECT DISTINCT user_id FROM budgets LIMIT :n"),
+            {"n": args.sample_users},
+        )
+    ]
+    started = time.perf_counter()
+    for user_id in user_ids:
+        per_budget_loop(db, user_id)
+    loop_s = time.perf_counter() - started
+    projected_s = loop_s / max(1, len(user_ids)) * args.users
+    print(
+        f"Per-budget loop: {len(user_ids):,} users in {loop_s:.1f}s "
+        f"(projected {projected_s:.0f}s for {args.users:,})"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "users": args.users,
+                    "alerts": alerts,
+                    "batched_seconds": round(batched_s, 2),
+                    "per_budget_projected_seconds": round(projected_s, 2),
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the combined dashboard query against the four separate calls.
+
+Uses the synthetic dataset from bench_analytics_backends (seed it first,
+or pass --seed-rows) and times, per user, the four analytics service
+calls the dashboard used to make versus a single get_dashboard call.
+Queries executed per view are counted as a proxy for database load.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dashboard --seed-rows 1000000
+    python -m benchmarks.bench_dashboard --output results.json
+"""
+import argparse
+import json
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.services.analytics_service import (
+    get_budget_alerts,
+    get_category_breakdown,
+    get_current_month_spend,
+    get_dashboard,
+    get_monthly_spend,
+)
+from benchmarks.bench_analytics_backends import seed, time_calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--seed-users", type=int, default=5_000)
+    parser.add_argument("--sample-users", type=int, default=50)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if args.seed_rows:
+        seed(engine, args.seed_rows, args.seed_users)
+
+    statements = [0]
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *_: statements.__setitem__(0, statements[0] + 1),
+    )
+
+    db = sessionmaker(bind=engine)()
+    user_ids = [
+        row[0]
+        for row in db.execute(
+            text("SELECT id FROM users WHERE email LIKE 'bench-%' LIMIT :n"),
+            {"n": args.sample_users},
+        )
+    ]
+
+    def separate():
+        for user_id in user_ids:
+            get_monthly_spend(db, user_id, args.months)
+            get_category_breakdown(db, user_id, args.months)
+            get_budget_alerts(db, user_id)
+            get_current_month_spend(db, user_id)
+
+    def combined():
+        for user_id in user_ids:
+            get_dashboard(db, user_id, months=args.months)
+
+    results = {}
+    for name, fn in (("separate", separate), ("combined", combined)):
+        statements[0] = 0
+        stats = time_calls(fn, args.repeat)
+        per_view = {k: round(v / len(user_ids), 3) for k, v in stats.items()}
+        per_view["queries"] = statements[0] / (args.repeat * len(user_ids))
+        results[name] = per_view
+        print(
+            f"{name:<9} p50 {per_view['p50_ms']:>8.3f} ms/view  "
+            f"p95 {per_view['p95_ms']:>8.3f} ms/view  "
+            f"{per_view['queries']:.0f} queries/view"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"months": args.months, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark spend forecasting and anomaly detection over five years of history.
+
+By default times the vectorized NumPy stages on synthetic in-memory arrays
+(no database needed), so the compute cost can be compared against the
+50 ms budget in isolation. With --database, also times get_forecast and
+get_anomalies end to end for a sample of seeded users (seed first, or pass
+--seed-rows).
+
+Usage (from backend/):
+    python -m benchmarks.bench_forecast --per-day 10
+    python -m benchmarks.bench_forecast --database --seed-rows 10000000
+"""
+import argparse
+import json
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.services.forecast_service import (
+    project_month_end,
+    score_by_category,
+)
+from benchmarks.bench_analytics_backends import CATEGORIES, seed, time_calls
+
+
+def synthetic_history(per_day: float, years: int = 5, seed_value: int = 0):
+    """Dates (int64 epoch), amounts (float64) and category codes for one user."""
+    rng = np.random.default_rng(seed_value)
+    n = int(per_day * 365 * years)
+    span = 365 * years * 86400
+    dates = np.sort(rng.integers(0, span, n)).astype(np.int64)
+    amounts = np.round(np.exp(rng.random(n) * 5), 2)
+    codes = rng.integers(0, len(CATEGORIES), n).astype(np.int64)
+    return dates, amounts, codes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--per-day", type=float, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", action="store_true")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--seed-users", type=int, default=5_000)
+    parser.add_argument("--sample-users", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for per_day in args.per_day:
+        dates, amounts, codes = synthetic_history(per_day)
+
+        def anomalies():
+            order = np.lexsort((dates, codes))
+            recent = dates[order] >= dates[-1] - 90 * 86400
+            score_by_category(codes[order], amounts[order], recent)
+
+        def forecast():
+            current = dates >= dates[-1] - 15 * 86400
+            spent = np.bincount(codes[current], amounts[current], len(CATEGORIES))
+            baseline = np.bincount(codes[~current], amounts[~current], len(CATEGORIES))
+            project_month_end(spent, baseline / 60, 15.0, 30)
+
+        for name, fn in (("anomalies", anomalies), ("forecast", forecast)):
+            stats = time_calls(fn, args.repeat)
+            results.append(
+                {"stage": name, "transactions": len(amounts), "source": "arrays", **stats}
+            )
+            print(
+                f"arrays  {name:<10} {len(amounts):>7} txns  "
+                f"p50 {stats['p50_ms']:>8.3f} ms  p95 {stats['p95_ms']:>8.3f} ms"
+            )
+
+    if args.database:
+        # Imported here so the array benchmark runs without the models' deps
+        from app.services.forecast_service import get_anomalies, get_forecast
+
+        engine = create_engine(args.database_url)
+        if args.seed_rows:
+            seed(engine, args.seed_rows, args.seed_users)
+        db = sessionmaker(bind=engine)()
+        user_ids = [
+            row[0]
+            for row in db.execute(
+                text("SELECT id FROM users WHERE email LIKE 'bench-%' LIMIT :n"),
+                {"n": args.sample_users},
+            )
+        ]
+        for name, fn in (("anomalies", get_anomalies), ("forecast", get_forecast)):
+
+            def run():
+                for user_id in user_ids:
+                    fn(db, user_id)
+
+            stats = time_calls(run, max(1, args.repeat // 4))
+            per_user = {k: round(v / len(user_ids), 3) for k, v in stats.items()}
+            results.append({"stage": name, "source": "database", **per_user})
+            print(
+                f"db      {name:<10} p50 {per_user['p50_ms']:>8.3f} ms/user  "
+                f"p95 {per_user['p95_ms']:>8.3f} ms/user"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
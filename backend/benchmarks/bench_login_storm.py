@@ -0,0 +1,110 @@
+"""
+Benchmark Argon2 verification during a login storm.
+
+Fires a burst of concurrent password verifications at the event loop and,
+alongside, a ticker that stands in for unrelated requests by measuring how
+late each 10 ms tick fires (event-loop lag). Runs the burst twice:
+
+- inline:    verify_password called directly in the coroutine (old behavior)
+- offloaded: verify_and_update_password on the bounded hashing pool
+
+No database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_storm --logins 200
+    python -m benchmarks.bench_login_storm --output results.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from fastapi import HTTPException
+from app.services.user_service import (
+    hash_password,
+    verify_and_update_password,
+    verify_password,
+)
+from benchmarks._stats import percentile
+
+TICK_SECONDS = 0.01
+
+
+async def ticker(stop: asyncio.Event, lags: list) -> None:
+    """Record how late each tick fires while the storm runs."""
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_storm(mode: str, stored_hash: str, logins: int) -> dict:
+    """Run one burst of concurrent logins and summarize latencies."""
+
+    # Login latency is measured from the start of the burst, so time spent
+    # queued behind other logins (or a blocked loop) is included.
+    async def login() -> float:
+        if mode == "inline":
+            verify_password("benchpass123", stored_hash)
+        else:
+            await verify_and_update_password("benchpass123", stored_hash)
+        return time.perf_counter() - started
+
+    async def guarded_login():
+        try:
+            return await login()
+        except HTTPException:
+            return None
+
+    stop = asyncio.Event()
+    lags: list = []
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(TICK_SECONDS)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(guarded_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick_task
+
+    latencies = [r for r in results if r is not None]
+    return {
+        "mode": mode,
+        "logins": logins,
+        "rejected": logins - len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "login_p50_ms": percentile(latencies, 0.5),
+        "login_p99_ms": percentile(latencies, 0.99),
+        "loop_lag_p50_ms": percentile(lags or [0.0], 0.5),
+        "loop_lag_p99_ms": percentile(lags or [0.0], 0.99),
+        "loop_lag_max_ms": round(max(lags or [0.0]) * 1000, 2),
+        "loop_lag_mean_ms": round(statistics.fmean(lags or [0.0]) * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    stored_hash = hash_password("benchpass123")
+    results = []
+    for mode in ("inline", "offloaded"):
+        result = asyncio.run(run_storm(mode, stored_hash, args.logins))
+        results.append(result)
+        print(
+            f"{mode:<10} login p50 {result['login_p50_ms']:>9.2f} ms  "
+            f"p99 {result['login_p99_ms']:>9.2f} ms  "
+            f"loop lag p99 {result['loop_lag_p99_ms']:>9.2f} ms  "
+            f"max {result['loop_lag_max_ms']:>9.2f} ms  "
+            f"rejected {result['rejected']}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark list-endpoint serialization time and bytes on the wire.
+
+For `GET /transactions` and `GET /receipts` payloads of N rows, compares:
+- orm_pydantic_stdlib: ORM objects validated into the response model,
+  dumped to JSON-able Python, rendered by stdlib json (the previous path)
+- orm_type_adapter: ORM objects through a cached TypeAdapter
+  (validate + dump_json, both in Rust)
+- rows_orjson: column-projected rows rendered directly by orjson (the
+  current read path; rows are namedtuples standing in for SQL rows)
+
+and reports body sizes uncompressed, gzip and brotli (if installed) at
+the middleware's settings. Database fetch time is not included.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --rows 1000
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List
+from app.compression import BROTLI_AVAILABLE
+from app.config import settings
+from app.models import Receipt, Transaction
+from app.responses import ORJSON_AVAILABLE, rows_response, type_adapter
+from app.schemas import ReceiptSummary, TransactionRead
+from benchmarks.bench_analytics_backends import CATEGORIES
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+VENDORS = ["Whole Foods", "Shell", "Amazon", "Target", "Starbucks", "Uber", "Netflix"]
+
+
+def make_transactions(n: int, user_id: uuid.UUID) -> list:
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    return [
+        Transaction(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            receipt_id=uuid.uuid4() if random.random() < 0.3 else None,
+            amount=round(random.lognormvariate(3, 1), 2),
+            category=random.choice(CATEGORIES),
+            description=f"Receipt from {random.choice(VENDORS)}",
+            transaction_date=start + timedelta(minutes=random.randrange(525600)),
+            is_recurring=random.random() < 0.1,
+            created_at=start + timedelta(minutes=random.randrange(525600)),
+        )
+        for _ in range(n)
+    ]
+
+
+def make_receipts(n: int, user_id: uuid.UUID) -> list:
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    return [
+        Receipt(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            image_path=f"receipts/{user_id}/{uuid.uuid4()}.jpg",
+            vendor=random.choice(VENDORS),
+            purchase_date=start + timedelta(minutes=random.randrange(525600)),
+            total_amount=round(random.lognormvariate(3, 1), 2),
+            tax_amount=round(random.uniform(0, 5), 2),
+            currency="USD",
+            category=random.choice(CATEGORIES),
+            created_at=start + timedelta(minutes=random.randrange(525600)),
+        )
+        for _ in range(n)
+    ]
+
+
+def as_rows(objects: list, schema) -> list:
+    Row = namedtuple("Row", list(schema.model_fields))
+    return [Row(*(getattr(o, f) for f in schema.model_fields)) for o in objects]
+
+
+def legacy(objects: list, schema) -> bytes:
+    """Response-model validation, JSON-able dump, then Starlette's JSONResponse rendering."""
+    adapter = type_adapter(List[schema])
+    content = adapter.dump_python(
+        adapter.validate_python(objects, from_attributes=True), mode="json"
+    )
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+
+
+def via_type_adapter(objects: list, schema) -> bytes:
+    adapter = type_adapter(List[schema])
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def wire_sizes(body: bytes) -> dict:
+    sizes = {"identity": len(body)}
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    started = time.perf_counter()
+    sizes["gzip"] = len(compressor.compress(body) + compressor.flush())
+    sizes["gzip_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    if BROTLI_AVAILABLE:
+        started = time.perf_counter()
+        sizes["br"] = len(brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY))
+        sizes["br_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return sizes
+
+
+def run(rows: int, repeat: int) -> dict:
+    random.seed(7)
+    user_id = uuid.uuid4()
+    endpoints = {
+        "GET /transactions": (make_transactions(rows, user_id), TransactionRead),
+        "GET /receipts": (make_receipts(rows, user_id), ReceiptSummary),
+    }
+    results = {"rows": rows, "orjson": ORJSON_AVAILABLE, "endpoints": {}}
+    for name, (objects, schema) in endpoints.items():
+        projected = as_rows(objects, schema)
+        body = rows_response(projected).body
+        assert json.loads(body) == json.loads(legacy(objects, schema))
+        results["endpoints"][name] = {
+            "serialize_ms": {
+                "orm_pydantic_stdlib": round(
+                    best_of(lambda: legacy(objects, schema), repeat) * 1000, 2
+                ),
+                "orm_type_adapter": round(
+                    best_of(lambda: via_type_adapter(objects, schema), repeat) * 1000, 2
+                ),
+                "rows_orjson": round(
+                    best_of(lambda: rows_response(projected), repeat) * 1000, 2
+                ),
+            },
+            "bytes": wire_sizes(body),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark the analytics sketches against exact computation.
+
+Generates a synthetic stream (Zipf-distributed vendors, log-normal
+amounts) split into monthly buckets, then reports for each sketch: update
+throughput, serialized size, merge time across the buckets, and the
+observed error against exact answers next to the documented bound.
+No database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sketches --items 1000000 --vendors 50000
+    python -m benchmarks.bench_sketches --output results.json
+"""
+import argparse
+import bisect
+import json
+import random
+import time
+from collections import Counter
+from app.services.sketch_service import HLL_PRECISION, TDIGEST_COMPRESSION
+from app.services.sketches import HyperLogLog, SpaceSaving, TDigest
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--vendors", type=int, default=20_000)
+    parser.add_argument("--buckets", type=int, default=12)
+    parser.add_argument("--top-k", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    weights = [1 / (rank**1.1) for rank in range(1, args.vendors + 1)]
+    vendors = rng.choices(
+        [f"vendor-{i}" for i in range(args.vendors)], weights, k=args.items
+    )
+    amounts = [round(rng.lognormvariate(3, 1.2), 2) for _ in range(args.items)]
+    per_bucket = -(-args.items // args.buckets)
+    results = {}
+
+    # Heavy hitters
+    buckets, update_ms = _timed(
+        lambda: [
+            _fill(SpaceSaving(args.top_k), vendors[i : i + per_bucket])
+            for i in range(0, args.items, per_bucket)
+        ]
+    )
+    merged, merge_ms = _timed(lambda: _merge(SpaceSaving(args.top_k), buckets))
+    exact = Counter(vendors)
+    top = merged.top(20)
+    true_top = {v for v, _ in exact.most_common(20)}
+    results["space_saving"] = {
+        "updates_per_s": round(args.items / update_ms * 1000),
+        "bytes_per_bucket": sum(len(b.to_bytes()) for b in buckets) // len(buckets),
+        "merge_ms": round(merge_ms, 3),
+        "top20_recall": len(true_top & {v for v, _, _ in top}) / 20,
+        "max_abs_error": max(abs(count - exact[v]) for v, count, _ in top),
+        "bound_n_over_k": args.items / args.top_k,
+    }
+
+    # Percentiles
+    buckets, update_ms = _timed(
+        lambda: [
+            _fill(TDigest(TDIGEST_COMPRESSION), amounts[i : i + per_bucket])
+            for i in range(0, args.items, per_bucket)
+        ]
+    )
+    merged, merge_ms = _timed(lambda: _merge(TDigest(TDIGEST_COMPRESSION), buckets))
+    ordered = sorted(amounts)
+    rank_errors = {
+        f"p{q * 100:g}": abs(
+            bisect.bisect_left(ordered, merged.quantile(q)) / len(ordered) - q
+        )
+        for q in (0.01, 0.5, 0.9, 0.99, 0.999)
+    }
+    results["t_digest"] = {
+        "updates_per_s": round(args.items / update_ms * 1000),
+        "bytes_per_bucket": sum(len(b.to_bytes()) for b in buckets) // len(buckets),
+        "merge_ms": round(merge_ms, 3),
+        "rank_error": {k: round(v, 5) for k, v in rank_errors.items()},
+    }
+
+    # Distinct count
+    buckets, update_ms = _timed(
+        lambda: [
+            _fill(HyperLogLog(HLL_PRECISION), vendors[i : i + per_bucket])
+            for i in range(0, args.items, per_bucket)
+        ]
+    )
+    merged, merge_ms = _timed(lambda: _merge(HyperLogLog(HLL_PRECISION), buckets))
+    distinct = len(exact)
+    results["hyperloglog"] = {
+        "updates_per_s": round(args.items / update_ms * 1000),
+        "bytes_per_bucket": sum(len(b.to_bytes()) for b in buckets) // len(buckets),
+        "merge_ms": round(merge_ms, 3),
+        "relative_error": round(abs(merged.estimate() - distinct) / distinct, 5),
+        "standard_error_bound": round(merged.relative_error, 5),
+    }
+
+    # Exact baseline for comparison (what the sketches avoid per request)
+    _, exact_ms = _timed(
+        lambda: (Counter(vendors).most_common(20), sorted(amounts), len(set(vendors)))
+    )
+    results["exact_ms"] = round(exact_ms, 3)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def _fill(sketch, values):
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def _merge(target, sketches):
+    for sketch in sketches:
+        target.merge(sketch)
+    return target
+
+
+if __name__ == "__main__":
+    main()
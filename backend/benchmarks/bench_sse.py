@@ -0,0 +1,85 @@
+"""
+Benchmark idle cost and fan-out latency of the analytics SSE streams.
+
+Opens N streams (the same generator `/analytics/stream` serves) for a set
+of users, parks them on their idle wait, and reports Python heap per idle
+stream (tracemalloc). It then publishes one change per user and times how
+long until every stream has yielded its delta. State computation is
+replaced by a constant-time function so the numbers isolate the pub/sub
+and streaming overhead; the per-change database cost is one budget query
+plus one sum, as for `/analytics/budget-alerts`. Socket and ASGI server
+buffers are not included.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sse --streams 10000 --users 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+import uuid
+from app.services.analytics_events import event_bus, stream_changes
+
+
+async def run(streams: int, users: int) -> dict:
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    versions = {user_id: 0 for user_id in user_ids}
+    event_bus.max_per_user = max(event_bus.max_per_user, -(-streams // users))
+
+    def compute(user_id, threshold):
+        return {"current_month_spend": float(versions[user_id]), "budget_alerts": {}}
+
+    delivered = asyncio.Queue()
+
+    async def consume(stream):
+        async for chunk in stream:
+            if chunk.startswith("event: month-total"):
+                await delivered.put(time.perf_counter())
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = []
+    for i in range(streams):
+        subscription = event_bus.subscribe(user_ids[i % users])
+        tasks.append(asyncio.create_task(consume(stream_changes(subscription, 0.8, compute))))
+    # Let every stream send its snapshot and park on the idle wait
+    await asyncio.sleep(1.0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    heap = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    started = time.perf_counter()
+    for user_id in user_ids:
+        versions[user_id] += 1
+        event_bus.publish(user_id)
+    latencies = sorted([(await delivered.get()) - started for _ in range(streams)])
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "streams": streams,
+        "users": users,
+        "bytes_per_idle_stream": round(heap / streams),
+        "fanout_p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "fanout_max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.streams, args.users))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark the time-series endpoint over multi-year ranges.
+
+Uses the synthetic dataset from bench_analytics_backends (seed it first,
+or pass --seed-rows) and times get_timeseries for 1/3/5-year ranges at
+day, week and month granularity, with and without the previous-period
+comparison, for a sample of users.
+
+Usage (from backend/):
+    python -m benchmarks.bench_timeseries --seed-rows 10000000
+    python -m benchmarks.bench_timeseries --tz America/New_York --output results.json
+"""
+import argparse
+import json
+from datetime import date, timedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.services.timeseries_service import get_timeseries
+from benchmarks.bench_analytics_backends import seed, time_calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--seed-users", type=int, default=5_000)
+    parser.add_argument("--sample-users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tz", default="UTC")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if args.seed_rows:
+        seed(engine, args.seed_rows, args.seed_users)
+
+    db = sessionmaker(bind=engine)()
+    user_ids = [
+        row[0]
+        for row in db.execute(
+            text("SELECT id FROM users WHERE email LIKE 'bench-%' LIMIT :n"),
+            {"n": args.sample_users},
+        )
+    ]
+
+    end = date.today()
+    results = []
+    for years in (1, 3, 5):
+        start = end - timedelta(days=365 * years)
+        for granularity in ("day", "week", "month"):
+            for compare in (False, True):
+
+                def run():
+                    for user_id in user_ids:
+                        get_timeseries(
+                            db,
+                            user_id,
+                            start,
+                            end,
+                            granularity=granularity,
+                            timezone=args.tz,
+                            compare=compare,
+                        )
+
+                stats = time_calls(run, args.repeat)
+                per_user = {k: round(v / len(user_ids), 3) for k, v in stats.items()}
+                results.append(
+                    {
+                        "years": years,
+                        "granularity": granularity,
+                        "compare": compare,
+                        **per_user,
+                    }
+                )
+                print(
+                    f"{years}y  {granularity:<5} compare={str(compare):<5} "
+                    f"p50 {per_user['p50_ms']:>8.3f} ms/user  "
+                    f"p95 {per_user['p95_ms']:>8.3f} ms/user"
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"timezone": args.tz, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Drive mixed HTTP traffic at a running API and report latency per endpoint.
+
+Each of --concurrency virtual users logs in as a user created by
+benchmarks.seed, then loops for --duration seconds picking requests
+from MIX: dashboard analytics, transaction lists and creates, receipt
+lists, uploads of small synthetic receipt images (which run OCR) and
+occasional re-logins. Requests that start during --warmup are not
+counted. Reports throughput, error counts and p50/p95/p99 per endpoint.
+--output saves the results as JSON along with the git commit, and
+--baseline prints each endpoint's change from an earlier run.
+
+Run the server with RATE_LIMIT_ENABLED=false, or most requests will be
+throttled with 429s.
+
+Usage (from backend/):
+    python -m benchmarks.seed --users 200 --transactions 500
+    RATE_LIMIT_ENABLED=false uvicorn app.main:app --workers 4
+    python -m benchmarks.loadgen --concurrency 50 --duration 60 --output before.json
+    python -m benchmarks.loadgen --concurrency 50 --duration 60 --baseline before.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import httpx
+from PIL import Image, ImageDraw
+from benchmarks._stats import percentile
+from benchmarks.seed import (
+    CATEGORIES,
+    CATEGORY_PROFILES,
+    CATEGORY_WEIGHTS,
+    DEFAULT_PASSWORD,
+    EMAIL_PATTERN,
+)
+
+# Relative request weights, roughly a dashboard-heavy session
+MIX = {
+    "POST /auth/login": 2,
+    "GET /analytics/dashboard": 25,
+    "GET /transactions": 30,
+    "POST /transactions": 20,
+    "GET /receipts": 15,
+    "POST /receipts/upload": 3,
+}
+
+
+def make_receipt_images(count: int, rng: random.Random) -> list:
+    """Render small PNG receipts (a vendor, a few items, a total) for uploads."""
+    images = []
+    for _ in range(count):
+        category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+        _, mu, sigma, vendors = CATEGORY_PROFILES[category]
+        items = [
+            round(rng.lognormvariate(mu - 1, sigma), 2)
+            for _ in range(rng.randint(2, 6))
+        ]
+        lines = [rng.choice(vendors).upper(), datetime.now().strftime("%m/%d/%Y"), ""]
+        lines += [f"ITEM {i + 1:<12} {amount:>8.2f}" for i, amount in enumerate(items)]
+        lines += ["", f"TOTAL {sum(items):>16.2f}"]
+
+        image = Image.new("L", (320, 24 + 16 * len(lines)), 255)
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines):
+            draw.text((16, 12 + 16 * i), line, fill=0)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        images.append(buffer.getvalue())
+    return images
+
+
+class VirtualUser:
+    """One logged-in client issuing requests from MIX back to back."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, email: str, password: str, rng, images
+    ):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.images = images
+        self.headers = {}
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/auth/login", data={"username": self.email, "password": self.password}
+        )
+        if response.status_code == 200:
+            token = response.json()["access_token"]
+            self.headers = {"Authorization": f"Bearer {token}"}
+        return response
+
+    async def request(self, name: str) -> httpx.Response:
+        rng = self.rng
+        if name == "POST /auth/login":
+            return await self.login()
+        if name == "GET /analytics/dashboard":
+            params = {"months": rng.choice([6, 12, 12, 12, 24])}
+            return await self.client.get(
+                "/analytics/dashboard", params=params, headers=self.headers
+            )
+        if name == "GET /transactions":
+            params = {"limit": rng.choice([20, 50, 100])}
+            if rng.random() < 0.3:
+                params["category"] = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+            return await self.client.get(
+                "/transactions", params=params, headers=self.headers
+            )
+        if name == "POST /transactions":
+            category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+            _, mu, sigma, vendors = CATEGORY_PROFILES[category]
+            date = datetime.now(timezone.utc) - timedelta(
+                minutes=rng.randrange(30 * 24 * 60)
+            )
+            body = {
+                "amount": round(rng.lognormvariate(mu, sigma), 2),
+                "category": category,
+                "description": rng.choice(vendors),
+                "transaction_date": date.isoformat(),
+            }
+            return await self.client.post(
+                "/transactions", json=body, headers=self.headers
+            )
+        if name == "GET /receipts":
+            params = {"limit": rng.choice([20, 50])}
+            return await self.client.get(
+                "/receipts", params=params, headers=self.headers
+            )
+        if name == "POST /receipts/upload":
+            files = {"file": ("receipt.png", rng.choice(self.images), "image/png")}
+            return await self.client.post(
+                "/receipts/upload", files=files, headers=self.headers
+            )
+        raise ValueError(f"Unknown request {name!r}")
+
+
+async def timed(user: VirtualUser, name: str, counted: bool, samples: dict) -> int:
+    """Issue one request and record (latency, status); status 0 is a client error."""
+    started = time.perf_counter()
+    try:
+        status = (await user.request(name)).status_code
+    except httpx.HTTPError:
+        status = 0
+    if counted:
+        samples[name].append((time.perf_counter() - started, status))
+    return status
+
+
+async def drive(
+    user: VirtualUser, samples: dict, warmup_until: float, deadline: float
+) -> bool:
+    """Log in, then issue weighted-random requests until the deadline."""
+    names, weights = list(MIX), list(MIX.values())
+    counted = time.perf_counter() >= warmup_until
+    if await timed(user, "POST /auth/login", counted, samples) != 200:
+        return False
+    while (now := time.perf_counter()) < deadline:
+        name = user.rng.choices(names, weights)[0]
+        await timed(user, name, now >= warmup_until, samples)
+    return True
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Throughput, latency percentiles and status counts per endpoint."""
+
+    def stats(recorded: list) -> dict:
+        latencies = [latency for latency, _ in recorded]
+        statuses = defaultdict(int)
+        for _, status in recorded:
+            statuses[str(status)] += 1
+        return {
+            "requests": len(recorded),
+            "errors": sum(1 for _, status in recorded if not 200 <= status < 300),
+            "rps": round(len(recorded) / elapsed, 2),
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": round(max(latencies) * 1000, 2),
+            "status": dict(sorted(statuses.items())),
+        }
+
+    endpoints = {name: stats(samples[name]) for name in MIX if samples.get(name)}
+    everything = [sample for recorded in samples.values() for sample in recorded]
+    return {
+        "endpoints": endpoints,
+        "total": stats(everything) if everything else {"requests": 0},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+async def run(args) -> dict:
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    rng = random.Random(args.seed)
+    images = make_receipt_images(8, rng)
+    samples = defaultdict(list)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        users = [
+            VirtualUser(
+                client,
+                EMAIL_PATTERN.format(n % args.users),
+                args.password,
+                random.Random(rng.getrandbits(64)),
+                images,
+            )
+            for n in range(args.concurrency)
+        ]
+        warmup_until = time.perf_counter() + args.warmup
+        deadline = warmup_until + args.duration
+        logged_in = await asyncio.gather(
+            *(drive(user, samples, warmup_until, deadline) for user in users)
+        )
+        elapsed = time.perf_counter() - warmup_until
+
+    return {
+        "commit": git_commit(),
+        "started_at": started_at,
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "logged_in": sum(logged_in),
+        "duration_s": round(elapsed, 2),
+        "mix": MIX,
+        **summarize(samples, elapsed),
+    }
+
+
+def print_report(results: dict, baseline: dict | None = None) -> None:
+    if results["logged_in"] < results["concurrency"]:
+        print(
+            f"Only {results['logged_in']} of {results['concurrency']} virtual users "
+            "logged in; seed users with benchmarks.seed and check --password"
+        )
+    rows = list(results["endpoints"].items()) + [("total", results["total"])]
+    for name, stats in rows:
+        if not stats["requests"]:
+            continue
+        line = (
+            f"{name:<26} {stats['rps']:>8.1f} req/s  p50 {stats['p50_ms']:>8.2f}  "
+            f"p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f} ms  "
+            f"errors {stats['errors']}"
+        )
+        before = (
+            (baseline["total"] if name == "total" else baseline["endpoints"].get(name))
+            if baseline
+            else None
+        )
+        if before and before.get("requests"):
+            change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            line += f"  (p95 {change:+.0f}% vs {baseline.get('commit') or 'baseline'})"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds")
+    parser.add_argument(
+        "--users", type=int, default=200, help="Seeded users to log in as"
+    )
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", help="Compare against results saved by --output")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
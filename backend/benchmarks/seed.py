@@ -0,0 +1,306 @@
+"""
+Seed a local Postgres with synthetic users, transactions, receipts and budgets.
+
+Rows are generated in Python with per-category amount distributions,
+weekday-weighted dates, monthly recurring bills and receipts attached to
+a share of transactions, then streamed in with COPY. Seeded users are
+`load-<n>@example.com` and all share one password, so benchmarks.loadgen
+can log in as any of them. Output is deterministic for a given --seed.
+
+Usage (from backend/):
+    python -m benchmarks.seed --users 1000 --transactions 500
+    python -m benchmarks.seed --users 1000 --transactions 500 --reset
+"""
+import argparse
+import csv
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, text
+from app.config import settings
+from app.database import Base
+from app.services.user_service import hash_password
+
+EMAIL_PATTERN = "load-{}@example.com"
+DEFAULT_PASSWORD = "loadtest123"
+
+# (weight, log-normal mu, sigma, vendors) per category; medians run from
+# about $8 (restaurant) to about $110 (utilities)
+CATEGORY_PROFILES = {
+    "groceries": (30, 3.6, 0.6, ["Whole Foods", "Trader Joe's", "Safeway", "Kroger"]),
+    "restaurant": (
+        25,
+        2.9,
+        0.7,
+        ["Starbucks", "Chipotle", "Sweetgreen", "Olive Garden"],
+    ),
+    "gas": (10, 3.7, 0.3, ["Shell", "Chevron", "Exxon", "BP"]),
+    "pharmacy": (5, 3.0, 0.8, ["CVS", "Walgreens", "Rite Aid"]),
+    "retail": (15, 3.8, 1.0, ["Amazon", "Target", "Best Buy", "IKEA"]),
+    "utilities": (3, 4.7, 0.4, ["PG&E", "Comcast", "Verizon"]),
+    "transportation": (10, 2.8, 0.6, ["Uber", "Lyft", "BART"]),
+    "other": (2, 3.5, 1.2, ["Etsy", "USPS", "Home Depot"]),
+}
+CATEGORIES = list(CATEGORY_PROFILES)
+CATEGORY_WEIGHTS = [profile[0] for profile in CATEGORY_PROFILES.values()]
+
+# Monthly bills: (category, vendor, amount)
+RECURRING_BILLS = [
+    ("utilities", "Comcast", 79.99),
+    ("utilities", "PG&E", 112.40),
+    ("other", "Netflix", 15.49),
+    ("other", "Spotify", 10.99),
+    ("transportation", "Clipper Monthly Pass", 98.00),
+]
+
+# Weekends see more discretionary spending
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.2, 1.5, 1.3]
+
+RECEIPT_SHARE = 0.3  # Transactions that came from an uploaded receipt
+TAX_RATE = 0.0825
+COPY_BATCH_ROWS = 100_000
+
+USER_COLUMNS = ("id", "email", "password_hash")
+RECEIPT_COLUMNS = (
+    "id",
+    "user_id",
+    "image_path",
+    "vendor",
+    "purchase_date",
+    "total_amount",
+    "tax_amount",
+    "currency",
+    "category",
+    "raw_ocr_text",
+)
+TRANSACTION_COLUMNS = (
+    "id",
+    "user_id",
+    "receipt_id",
+    "amount",
+    "category",
+    "description",
+    "transaction_date",
+    "is_recurring",
+)
+BUDGET_COLUMNS = ("id", "user_id", "category", "monthly_limit")
+
+# Children first; covers every table with a foreign key to users
+RESET_TABLES = (
+    "transactions",
+    "receipts",
+    "budgets",
+    "recurring_series",
+    "idempotency_keys",
+)
+
+
+def random_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def random_timestamp(rng: random.Random, start: datetime, days: int) -> datetime:
+    """Uniform day within the window, reweighted by weekday, at a daytime hour."""
+    while True:
+        day = start + timedelta(days=rng.randrange(days))
+        if rng.random() * max(WEEKDAY_WEIGHTS) <= WEEKDAY_WEIGHTS[day.weekday()]:
+            break
+    return day + timedelta(seconds=int(rng.triangular(7, 22, 18) * 3600))
+
+
+def user_rows(
+    rng: random.Random,
+    user_id: uuid.UUID,
+    transactions: int,
+    months: int,
+    now: datetime,
+):
+    """Yield ("receipts" | "transactions" | "budgets", row) for one user."""
+    days = months * 30
+    start = now - timedelta(days=days)
+    monthly_spend = dict.fromkeys(CATEGORIES, 0.0)
+
+    bills = rng.sample(RECURRING_BILLS, rng.randint(1, 3))
+    recurring = 0
+    for category, vendor, amount in bills:
+        billing_day = rng.randint(1, 28)
+        for month in range(months):
+            if recurring >= transactions // 2:
+                break
+            date = (start + timedelta(days=30 * month)).replace(day=billing_day)
+            recurring += 1
+            monthly_spend[category] += amount / months
+            yield "transactions", (
+                random_uuid(rng),
+                user_id,
+                None,
+                amount,
+                category,
+                vendor,
+                date,
+                True,
+            )
+
+    for _ in range(transactions - recurring):
+        category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+        _, mu, sigma, vendors = CATEGORY_PROFILES[category]
+        vendor = rng.choice(vendors)
+        amount = round(rng.lognormvariate(mu, sigma), 2)
+        date = random_timestamp(rng, start, days)
+        monthly_spend[category] += amount / months
+        receipt_id = None
+        if rng.random() < RECEIPT_SHARE:
+            receipt_id = random_uuid(rng)
+            tax = round(amount * TAX_RATE / (1 + TAX_RATE), 2)
+            yield "receipts", (
+                receipt_id,
+                user_id,
+                f"receipts/{user_id}/{receipt_id}.jpg",
+                vendor,
+                date,
+                amount,
+                tax,
+                "USD",
+                category,
+                f"{vendor.upper()}\nSUBTOTAL {amount - tax:.2f}\nTAX {tax:.2f}\nTOTAL {amount:.2f}",
+            )
+        description = f"Receipt from {vendor}" if receipt_id else vendor
+        yield "transactions", (
+            random_uuid(rng),
+            user_id,
+            receipt_id,
+            amount,
+            category,
+            description,
+            date,
+            False,
+        )
+
+    # Budgets on the user's biggest categories, set between 70% and 130% of
+    # their average month so some of them raise alerts
+    top = sorted(monthly_spend, key=monthly_spend.get, reverse=True)[
+        : rng.randint(2, 5)
+    ]
+    for category in top:
+        limit = max(10.0, round(monthly_spend[category] * rng.uniform(0.7, 1.3), -1))
+        yield "budgets", (random_uuid(rng), user_id, category, limit)
+
+
+def copy_rows(cursor, table: str, columns: tuple, rows: list) -> None:
+    """Stream rows into table with COPY ... FROM STDIN (CSV)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            r"\N"
+            if value is None
+            else value.isoformat()
+            if isinstance(value, datetime)
+            else value
+            for value in row
+        )
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer,
+    )
+
+
+def reset(engine) -> None:
+    """Delete previously seeded users and everything they own."""
+    seeded = "SELECT id FROM users WHERE email LIKE 'load-%@example.com'"
+    with engine.begin() as conn:
+        for table in RESET_TABLES:
+            conn.execute(text(f"DELETE FROM {table} WHERE user_id IN ({seeded})"))
+        conn.execute(
+            text(
+                f"DELETE FROM analytics_sketches WHERE scope IN (SELECT id::text FROM ({seeded}) s)"
+            )
+        )
+        conn.execute(text(f"DELETE FROM users WHERE id IN ({seeded})"))
+
+
+def seed(
+    engine,
+    users: int,
+    transactions: int,
+    months: int = 24,
+    password: str = DEFAULT_PASSWORD,
+    rng_seed: int = 42,
+) -> dict:
+    """Bulk-load users × transactions (plus receipts and budgets) with COPY."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(rng_seed)
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = hash_password(password)  # Argon2 once, shared by every user
+
+    counts = {"users": 0, "receipts": 0, "transactions": 0, "budgets": 0}
+    pending = {"users": [], "receipts": [], "transactions": [], "budgets": []}
+    columns = {
+        "users": USER_COLUMNS,
+        "receipts": RECEIPT_COLUMNS,
+        "transactions": TRANSACTION_COLUMNS,
+        "budgets": BUDGET_COLUMNS,
+    }
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+
+        def flush() -> None:
+            # Parents before children so foreign keys hold within the batch
+            for table in ("users", "receipts", "transactions", "budgets"):
+                if pending[table]:
+                    copy_rows(cursor, table, columns[table], pending[table])
+                    counts[table] += len(pending[table])
+                    pending[table].clear()
+
+        for n in range(users):
+            user_id = random_uuid(rng)
+            pending["users"].append((user_id, EMAIL_PATTERN.format(n), password_hash))
+            for table, row in user_rows(rng, user_id, transactions, months, now):
+                pending[table].append(row)
+            if len(pending["transactions"]) >= COPY_BATCH_ROWS:
+                flush()
+        flush()
+        raw.commit()
+    finally:
+        raw.close()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("users", "receipts", "transactions", "budgets"):
+            conn.execute(text(f"VACUUM ANALYZE {table}"))
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--transactions", type=int, default=500, help="Per user")
+    parser.add_argument("--months", type=int, default=24, help="History to spread over")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset", action="store_true", help="Delete seeded users first"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if args.reset:
+        reset(engine)
+    started = time.perf_counter()
+    counts = seed(
+        engine, args.users, args.transactions, args.months, args.password, args.seed
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        ", ".join(f"{count:,} {table}" for table, count in counts.items())
+        + f" in {elapsed:.1f}s ({counts['transactions'] / elapsed:,.0f} transactions/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
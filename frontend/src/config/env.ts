@@ -26,6 +26,7 @@ export const API_ENDPOINTS = {
     DELETE: (id: string) => `/budgets/${id}`,
   },
   ANALYTICS: {
+    DASHBOARD: "/analytics/dashboard",
     MONTHLY_SPEND: "/analytics/monthly-spend",
     CATEGORY_BREAKDOWN: "/analytics/category-breakdown",
     BUDGET_ALERTS: "/analytics/budget-alerts",
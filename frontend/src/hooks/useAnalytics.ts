@@ -2,7 +2,26 @@
 import { useQuery } from "@tanstack/react-query";
 import apiClient from "../api/client";
 import { API_ENDPOINTS } from "../config/env";
-import { MonthlySpendPoint, CategorySpend, BudgetAlert } from "../types";
+import {
+  MonthlySpendPoint,
+  CategorySpend,
+  BudgetAlert,
+  DashboardSummary,
+} from "../types";
+
+/** All dashboard analytics in a single request */
+export const useDashboard = (months: number = 12) => {
+  return useQuery({
+    queryKey: ["analytics", "dashboard", months],
+    queryFn: async (): Promise<DashboardSummary> => {
+      const response = await apiClient.axiosInstance.get<DashboardSummary>(
+        API_ENDPOINTS.ANALYTICS.DASHBOARD,
+        { params: { months } }
+      );
+      return response.data;
+    },
+  });
+};
 
 export const useMonthlySpend = (months: number = 12) => {
   return useQuery({
@@ -9,7 +9,7 @@ import {
   RefreshControl,
 } from "react-native";
 import { useNavigation } from "@react-navigation/native";
-import { useCurrentMonthSpend, useMonthlySpend } from "../hooks/useAnalytics";
+import { useDashboard } from "../hooks/useAnalytics";
 import { useTransactions } from "../hooks/useTransactions";
 import { TransactionList } from "../components/TransactionList";
 import { SpendChart } from "../components/SpendChart";
@@ -19,8 +19,9 @@ import Logger from "../utils/logger";
 export const DashboardScreen: React.FC = () => {
   const navigation = useNavigation();
   const { logout } = useLogout();
-  const { data: currentSpend, refetch: refetchSpend } = useCurrentMonthSpend();
-  const { data: monthlySpend, refetch: refetchMonthly } = useMonthlySpend(6);
+  const { data: dashboard, refetch: refetchDashboard } = useDashboard(6);
+  const currentSpend = dashboard?.current_month_spend;
+  const monthlySpend = dashboard?.monthly_spend;
   const {
     data: transactions,
     refetch: refetchTransactions,
@@ -37,8 +38,7 @@ export const DashboardScreen: React.FC = () => {
 
   const handleRefresh = () => {
     Logger.info("Dashboard refreshing...");
-    refetchSpend();
-    refetchMonthly();
+    refetchDashboard();
     refetchTransactions();
   };
 
@@ -59,6 +59,13 @@ export interface BudgetAlert {
   over_by: number;
 }
 
+export interface DashboardSummary {
+  current_month_spend: number;
+  monthly_spend: MonthlySpendPoint[];
+  category_breakdown: CategorySpend[];
+  budget_alerts: BudgetAlert[];
+}
+
 export interface UserCreate {
   email: string;
   password: string;